@@ -344,28 +344,70 @@ function createErrorWidget(widget, errorMessage) {
 // ========================================
 
 async function fetchSchedule(queue) {
-  const url = `${CONFIG.API_BASE_URL}/api/schedules/queue/${queue}`;
+  // Компактний формат: відключення як хвилини від початку доби, тіло в кілька разів менше
+  const url = `${CONFIG.API_BASE_URL}/api/schedules/queue/${queue}?format=compact`;
 
   console.log(`Fetching schedule from: ${url}`);
 
   const request = new Request(url);
   request.timeoutInterval = CONFIG.REQUEST_TIMEOUT;
 
+  // Умовний запит: якщо дані не змінились, API відповість 304 без тіла
+  const cached = readCacheEntry(queue);
+  if (cached && cached.etag) {
+    request.headers = { "If-None-Match": cached.etag };
+  }
+
   try {
-    const response = await request.loadJSON();
+    const raw = await request.load();
+    const status = request.response.statusCode;
 
-    // Зберегти в кеш
-    if (response.success && response.queue_data) {
-      saveToCache(queue, response.queue_data);
+    if (status === 304 && cached) {
+      console.log(`Schedule not modified: ${queue}`);
+      saveToCache(queue, cached.data, cached.etag);
+      return { success: true, queue_data: cached.data };
     }
 
-    return response;
+    const response = JSON.parse(raw.toRawString());
+    if (status !== 200 || !response.queue) {
+      return { success: false };
+    }
+
+    // Зберегти в кеш
+    const queueData = decodeCompactQueue(response);
+    const headers = request.response.headers || {};
+    saveToCache(queue, queueData, headers["etag"] || headers["ETag"] || null);
+
+    return { success: true, queue_data: queueData };
   } catch (error) {
     console.error(`API request failed: ${error.message}`);
     throw new Error("Не вдалось з'єднатися з API");
   }
 }
 
+function formatMinutes(minutes) {
+  const hours = String(Math.floor(minutes / 60)).padStart(2, '0');
+  const mins = String(minutes % 60).padStart(2, '0');
+  return `${hours}:${mins}`;
+}
+
+// [180, 480, 720, 1020] -> [{start: "03:00", end: "08:00"}, {start: "12:00", end: "17:00"}]
+function decodeCompactQueue(compact) {
+  const outages = [];
+  for (let i = 0; i + 1 < compact.outages.length; i += 2) {
+    outages.push({
+      start: formatMinutes(compact.outages[i]),
+      end: formatMinutes(compact.outages[i + 1])
+    });
+  }
+
+  return {
+    queue: compact.queue,
+    status: compact.status,
+    outages: outages
+  };
+}
+
 // ========================================
 // ЛОГІКА ВИЗНАЧЕННЯ СТАТУСУ
 // ========================================
@@ -445,13 +487,14 @@ function parseOutageMinutes(outage) {
 // КЕШУВАННЯ
 // ========================================
 
-function saveToCache(queue, data) {
+function saveToCache(queue, data, etag) {
   try {
     const fm = FileManager.local();
     const cachePath = fm.joinPath(fm.documentsDirectory(), `zoe_cache_${queue}.json`);
 
     const cacheData = {
       data: data,
+      etag: etag || null,
       timestamp: Date.now()
     };
 
@@ -462,7 +505,7 @@ function saveToCache(queue, data) {
   }
 }
 
-function loadFromCache(queue) {
+function readCacheEntry(queue) {
   try {
     const fm = FileManager.local();
     const cachePath = fm.joinPath(fm.documentsDirectory(), `zoe_cache_${queue}.json`);
@@ -471,23 +514,29 @@ function loadFromCache(queue) {
       return null;
     }
 
-    const cacheContent = fm.readString(cachePath);
-    const cacheData = JSON.parse(cacheContent);
+    return JSON.parse(fm.readString(cachePath));
+  } catch (error) {
+    console.error(`Cache read error: ${error.message}`);
+    return null;
+  }
+}
 
-    // Перевірити чи не застарів кеш
-    const cacheAge = (Date.now() - cacheData.timestamp) / 1000 / 60; // в хвилинах
+function loadFromCache(queue) {
+  const cacheData = readCacheEntry(queue);
+  if (!cacheData) {
+    return null;
+  }
 
-    if (cacheAge > CONFIG.CACHE_DURATION) {
-      console.log(`Cache expired for ${queue} (${Math.round(cacheAge)} minutes old)`);
-      return null;
-    }
+  // Перевірити чи не застарів кеш
+  const cacheAge = (Date.now() - cacheData.timestamp) / 1000 / 60; // в хвилинах
 
-    console.log(`Loaded from cache: ${queue}`);
-    return cacheData.data;
-  } catch (error) {
-    console.error(`Cache load error: ${error.message}`);
+  if (cacheAge > CONFIG.CACHE_DURATION) {
+    console.log(`Cache expired for ${queue} (${Math.round(cacheAge)} minutes old)`);
     return null;
   }
+
+  console.log(`Loaded from cache: ${queue}`);
+  return cacheData.data;
 }
 
 // ========================================
@@ -0,0 +1,108 @@
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple, Type, get_args
+
+from pydantic import BaseModel
+
+from services.timeline import to_minutes
+
+from .rendering import RenderedResponse
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+RESPONSE_FORMATS = ('json', 'compact', 'msgpack')
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+
+# Top-level keys of the compact queue representation
+COMPACT_FIELDS = ('queue', 'status', 'outages', 'message', 'updated_at')
+
+
+def _nested_model(annotation: Any) -> Optional[Type[BaseModel]]:
+    """Модель pydantic всередині анотації поля (Optional[QueueSchedule] -> QueueSchedule)"""
+    for candidate in (annotation, *get_args(annotation)):
+        if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+            return candidate
+    return None
+
+
+def parse_fields(fields: str, model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    'queue_data.outages,updated_at' -> {'queue_data': {'outages': True}, 'updated_at': True}
+    (include для model_dump). Дозволені поля моделі та поля вкладених моделей;
+    невідоме поле - ValueError.
+    """
+    include: Dict[str, Any] = {}
+    for path in fields.split(','):
+        path = path.strip()
+        if not path:
+            continue
+
+        name, _, sub = path.partition('.')
+        if name not in model.model_fields:
+            raise ValueError(f"Невідоме поле: {path}")
+        if not sub:
+            include[name] = True
+            continue
+
+        nested = _nested_model(model.model_fields[name].annotation)
+        if nested is None or sub not in nested.model_fields:
+            raise ValueError(f"Невідоме поле: {path}")
+        if include.get(name) is not True:
+            include.setdefault(name, {})[sub] = True
+
+    if not include:
+        raise ValueError("Порожній список полів")
+    return include
+
+
+def fields_key(include: Dict[str, Any]) -> str:
+    """Канонічний запис набору полів для ключа мемоізації (порядок у запиті не важливий)"""
+    parts = []
+    for name, sub in sorted(include.items()):
+        if sub is True:
+            parts.append(name)
+        else:
+            parts.extend(f"{name}.{s}" for s in sorted(sub))
+    return ','.join(parts)
+
+
+def compact_queue(queue_data: dict, updated_at: datetime) -> Dict[str, Any]:
+    """
+    Компактний графік черги для віджетів: відключення - плаский масив хвилин від початку доби
+    [початок, кінець, початок, кінець, ...], час оновлення - Unix timestamp
+    """
+    outages = []
+    for outage in queue_data.get('outages', []):
+        outages.append(to_minutes(outage['start']))
+        outages.append(to_minutes(outage['end']))
+
+    compact = {
+        'queue': queue_data['queue'],
+        'status': queue_data.get('status', 'active'),
+        'outages': outages,
+        'updated_at': int(updated_at.timestamp())
+    }
+    if queue_data.get('message'):
+        compact['message'] = queue_data['message']
+    return compact
+
+
+def parse_compact_fields(fields: str) -> Tuple[str, ...]:
+    """Поля компактного формату (лише верхній рівень)"""
+    names = tuple(sorted({name.strip() for name in fields.split(',') if name.strip()}))
+    for name in names:
+        if name not in COMPACT_FIELDS:
+            raise ValueError(f"Невідоме поле: {name}")
+    if not names:
+        raise ValueError("Порожній список полів")
+    return names
+
+
+def render_compact(compact: Dict[str, Any], response_format: str) -> RenderedResponse:
+    """Компактний графік як мінімальний JSON або MessagePack"""
+    if response_format == 'msgpack':
+        return RenderedResponse.from_bytes(msgpack.packb(compact), media_type=MSGPACK_MEDIA_TYPE)
+    return RenderedResponse.from_content(compact)
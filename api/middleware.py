@@ -0,0 +1,51 @@
+import time
+
+from services.metrics import REGISTRY
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    'zoe_http_request_duration_seconds',
+    'Time from request to response headers, by route template',
+    ['method', 'route']
+)
+REQUESTS = REGISTRY.counter(
+    'zoe_http_requests', 'HTTP responses by route template and status', ['method', 'route', 'status']
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware: латентність та кількість відповідей по шаблону маршруту.
+    Час рахується до заголовків відповіді, тож SSE потоки не розтягують гістограму на час підписки.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        responded = False
+
+        def observe(status: int) -> None:
+            # The router stores the matched route in the shared scope
+            route = scope.get('route')
+            path = getattr(route, 'path', None) or 'unmatched'
+            REQUEST_SECONDS.observe(time.perf_counter() - started, scope['method'], path)
+            REQUESTS.inc(scope['method'], path, str(status))
+
+        async def send_with_metrics(message):
+            nonlocal responded
+            if message['type'] == 'http.response.start' and not responded:
+                responded = True
+                observe(message['status'])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        except Exception:
+            if not responded:
+                observe(500)
+            raise
@@ -0,0 +1,148 @@
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Smaller bodies gain less from compression than the extra header costs
+MIN_COMPRESS_BYTES = 256
+
+# Server preference when the client accepts several encodings with the same q
+ENCODINGS = ('br', 'gzip') if BROTLI_AVAILABLE else ('gzip',)
+
+# Brotli 5 already beats gzip 9 in size; 11 is ~100x slower and would hurt uncached responses
+BROTLI_QUALITY = 5
+GZIP_LEVEL = 9
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Стиснути тіло gzip або br"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    # mtime=0 keeps gzip output deterministic for identical bodies
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+@dataclass(frozen=True)
+class RenderedResponse:
+    """Готове тіло відповіді, його ETag та стиснуті варіанти (створюються при першому запиті)"""
+
+    body: bytes
+    etag: str
+    media_type: str = 'application/json'
+    _encoded: Dict[str, bytes] = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def from_bytes(cls, body: bytes, media_type: str = 'application/json') -> "RenderedResponse":
+        # Strong validator: identical bytes <=> identical ETag
+        return cls(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"', media_type=media_type)
+
+    @classmethod
+    def from_model(cls, model: BaseModel, include: Optional[Dict[str, Any]] = None) -> "RenderedResponse":
+        """JSON моделі; include - лише обрані поля (?fields=)"""
+        return cls.from_bytes(model.model_dump_json(include=include).encode('utf-8'))
+
+    @classmethod
+    def from_content(cls, content: Any) -> "RenderedResponse":
+        return cls.from_bytes(
+            json.dumps(content, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        )
+
+    def encoded(self, encoding: str) -> bytes:
+        """Тіло, стиснуте gzip або br; стискається один раз на відрендерену відповідь"""
+        body = self._encoded.get(encoding)
+        if body is None:
+            body = self._encoded[encoding] = compress(self.body, encoding)
+        return body
+
+    def variant_etag(self, encoding: Optional[str]) -> str:
+        """ETag стиснутого варіанту: інші байти - інший сильний валідатор"""
+        return self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Найкраще підтримуване кодування з Accept-Encoding (з урахуванням q), None - без стиснення"""
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                continue
+        weights[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Чи відповідає заголовок If-None-Match поточному ETag (RFC 9110, слабке порівняння).
+    ETag стиснутого варіанту теж підходить: дані ті самі, змінилось лише кодування.
+    """
+    if if_none_match.strip() == '*':
+        return True
+
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        for encoding in ('br', 'gzip'):
+            suffix = f'-{encoding}"'
+            if candidate.endswith(suffix):
+                candidate = candidate[:-len(suffix)] + '"'
+                break
+        if candidate == etag:
+            return True
+    return False
+
+
+def conditional_response(
+    request: Request,
+    rendered: RenderedResponse,
+    extra_headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Відповідь 304 Not Modified, якщо клієнт вже має цю версію, інакше готове тіло -
+    стиснуте gzip / br, якщо клієнт це підтримує (Accept-Encoding)
+    """
+    encoding = None
+    if len(rendered.body) >= MIN_COMPRESS_BYTES:
+        encoding = negotiate_encoding(request.headers.get('accept-encoding', ''))
+
+    headers = {
+        'ETag': rendered.variant_etag(encoding),
+        # Clients may keep the body but must revalidate it with us
+        'Cache-Control': 'no-cache',
+        'Vary': 'Accept-Encoding',
+        **(extra_headers or {})
+    }
+
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match and etag_matches(if_none_match, rendered.etag):
+        return Response(status_code=304, headers=headers)
+
+    if encoding is None:
+        return Response(content=rendered.body, media_type=rendered.media_type, headers=headers)
+
+    headers['Content-Encoding'] = encoding
+    return Response(content=rendered.encoded(encoding), media_type=rendered.media_type, headers=headers)
@@ -1,6 +1,12 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse
+import asyncio
+import json
+import os
+import re
+from typing import List, Optional, Tuple
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
 import logging
 
 from models.schedule import (
@@ -8,18 +14,205 @@ from models.schedule import (
     Schedule,
     QueueSchedule,
     OutageTime,
-    HealthResponse
+    BulkQueueResponse,
+    QueueStatusResponse,
+    HealthResponse,
+    ReadinessResponse,
+    CacheBackendStatus,
+    HistoryEntry,
+    HistoryResponse,
+    ScheduleChange,
+    ChangesResponse,
+    AnalyticsResponse
 )
-from services.scraper import ScraperService
+from services.scraper import AsyncScraperService
+from services.analytics import NUMPY_AVAILABLE, SLOT_SIZES, ScheduleMatrix
 from services.cache import CacheService
+from services.broadcaster import ScheduleBroadcaster
+from services.cache_backends import get_cache_backend
+from services.history import HistoryService
+from services.leader import leader_election_for
+from services.metrics import REGISTRY
+from services.polling import AdaptivePollScheduler, HostRateLimiter, RateLimitedError
+from services.resilience import CircuitBreaker, CircuitOpenError, RetryBudget
+from services.timeline import MINUTES_PER_DAY, format_minutes, to_minutes
+from services.refresher import RefreshService, ScheduleSnapshot
+
+from .formats import (
+    MSGPACK_AVAILABLE,
+    RESPONSE_FORMATS,
+    compact_queue,
+    fields_key,
+    parse_compact_fields,
+    parse_fields,
+    render_compact
+)
+from .rendering import RenderedResponse, conditional_response
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+
+def create_cache_backend():
+    """Спільне сховище кешу з оточення: CACHE_BACKEND=file|shm|redis, REDIS_URL для redis"""
+    name = os.environ.get("CACHE_BACKEND", "file")
+    if name == "file":
+        return get_cache_backend(name, cache_dir="cache")
+    if name == "redis":
+        return get_cache_backend(name, url=os.environ.get("REDIS_URL"))
+    return get_cache_backend(name)
+
+
+# Data older than this is served as stale while it is refreshed
+CACHE_TTL_MINUTES = 30
+# How long stale data may still be served when ZOE is unreachable
+MAX_STALE_MINUTES = int(os.environ.get("MAX_STALE_MINUTES", 24 * 60))
+# How often expired entries are removed from the cache backend
+CACHE_SWEEP_SECONDS = int(os.environ.get("CACHE_SWEEP_SECONDS", 300))
+
+# Bounds of the adaptive poll interval and the politeness cap towards zoe.com.ua
+POLL_MIN_MINUTES = int(os.environ.get("POLL_MIN_MINUTES", 3))
+POLL_MAX_MINUTES = int(os.environ.get("POLL_MAX_MINUTES", 25))
+UPSTREAM_MAX_RPM = int(os.environ.get("UPSTREAM_MAX_RPM", 20))
+# History backfill crawls under its own, lower cap, so it never queues ahead of the live poll
+UPSTREAM_CRAWL_MAX_RPM = int(os.environ.get(
+    "UPSTREAM_CRAWL_MAX_RPM", max(UPSTREAM_MAX_RPM // 2, 1) if UPSTREAM_MAX_RPM > 0 else 0
+))
+
+# Extra ZOE listings with the same article markup, comma separated (the outage page is the default)
+SOURCE_URLS = [url.strip() for url in os.environ.get("ZOE_SOURCE_URLS", "").split(",") if url.strip()]
+# Pagination pages crawled into an empty history on first start
+HISTORY_BACKFILL_PAGES = int(os.environ.get("HISTORY_BACKFILL_PAGES", 5))
+MAX_BACKFILL_PAGES = 50
+
+# Upstream failure handling: the circuit opens after BREAKER_FAILURES failed requests in a row
+BREAKER_FAILURES = int(os.environ.get("BREAKER_FAILURES", 5))
+BREAKER_RECOVERY_SECONDS = int(os.environ.get("BREAKER_RECOVERY_SECONDS", 60))
+# Retries may add at most this share on top of the requests of the last minute
+RETRY_BUDGET_RATIO = float(os.environ.get("RETRY_BUDGET_RATIO", 0.2))
+UPSTREAM_CONNECT_TIMEOUT = float(os.environ.get("UPSTREAM_CONNECT_TIMEOUT", 5))
+UPSTREAM_READ_TIMEOUT = float(os.environ.get("UPSTREAM_READ_TIMEOUT", 15))
+# Off by default - the ZOE certificate has been failing verification; set to 1 once it validates
+UPSTREAM_VERIFY_TLS = os.environ.get("UPSTREAM_VERIFY_TLS", "0") == "1"
+
 # Initialize services
-scraper = ScraperService()
-cache = CacheService(ttl_minutes=30)
+scraper = AsyncScraperService(
+    rate_limiter=HostRateLimiter(UPSTREAM_MAX_RPM),
+    crawl_rate_limiter=HostRateLimiter(UPSTREAM_CRAWL_MAX_RPM),
+    sources=SOURCE_URLS,
+    breaker=CircuitBreaker(failure_threshold=BREAKER_FAILURES, recovery_seconds=BREAKER_RECOVERY_SECONDS),
+    retry_budget=RetryBudget(ratio=RETRY_BUDGET_RATIO),
+    connect_timeout=UPSTREAM_CONNECT_TIMEOUT,
+    read_timeout=UPSTREAM_READ_TIMEOUT,
+    verify_tls=UPSTREAM_VERIFY_TLS
+)
+cache = CacheService(
+    ttl_minutes=CACHE_TTL_MINUTES,
+    backend=create_cache_backend(),
+    max_stale_minutes=MAX_STALE_MINUTES,
+    sweep_interval_seconds=CACHE_SWEEP_SECONDS
+)
+history = HistoryService()
+refresher = RefreshService(
+    scraper,
+    cache,
+    interval_minutes=10,
+    history=history,
+    # With several uvicorn workers only the leader scrapes ZOE
+    leader=leader_election_for(cache.backend),
+    stale_after_minutes=CACHE_TTL_MINUTES,
+    max_stale_minutes=MAX_STALE_MINUTES,
+    poller=AdaptivePollScheduler(
+        base_interval_seconds=10 * 60,
+        min_interval_seconds=POLL_MIN_MINUTES * 60,
+        max_interval_seconds=POLL_MAX_MINUTES * 60
+    ),
+    backfill_pages=HISTORY_BACKFILL_PAGES
+)
+broadcaster = ScheduleBroadcaster()
+
+REGISTRY.gauge(
+    'zoe_snapshot_age_seconds', 'Age of the schedule snapshot served by this worker',
+    callback=lambda: refresher.snapshot.age_seconds if refresher.snapshot else None
+)
+REGISTRY.gauge(
+    'zoe_snapshot_queues', 'Queues in the current snapshot',
+    callback=lambda: len(refresher.snapshot.queues) if refresher.snapshot else None
+)
+REGISTRY.gauge(
+    'zoe_leader', 'Whether this worker fetches from ZOE (1) or follows the shared cache (0)',
+    callback=lambda: 0 if refresher.is_follower else 1
+)
+REGISTRY.gauge(
+    'zoe_upstream_consecutive_failures', 'Failed fetches from ZOE since the last successful one',
+    callback=lambda: refresher.consecutive_failures
+)
+REGISTRY.gauge(
+    'zoe_upstream_circuit_open', 'Whether requests to ZOE are currently blocked by the circuit breaker',
+    callback=lambda: 1 if scraper.breaker.state == CircuitBreaker.OPEN else 0
+)
+REGISTRY.gauge(
+    'zoe_push_subscribers', 'Open SSE and WebSocket subscriptions',
+    callback=lambda: broadcaster.subscriber_count
+)
+
+
+async def get_snapshot(force_refresh: bool = False) -> Tuple[ScheduleSnapshot, bool]:
+    """
+    Поточний знімок даних та ознака того, що він взятий з пам'яті.
+    Мережа використовується лише при force_refresh, до першого оновлення або коли дані старші за max-stale;
+    застарілі дані віддаються одразу, а оновлюються у фоні.
+    Поки автомат запитів до ZOE розімкнений (або вичерпано ліміт запитів до хоста), відповідь
+    одразу береться з останніх даних, а без них - 503 з Retry-After.
+    """
+    try:
+        return await refresher.current(force_refresh)
+    except (CircuitOpenError, RateLimitedError) as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Сайт ZOE тимчасово недоступний, а збережених даних немає. Спробуйте пізніше",
+            headers={"Retry-After": str(max(int(e.retry_after), 1))}
+        )
+
+
+def freshness_headers() -> dict:
+    """Вік даних (Age) та попередження, якщо вони застарілі"""
+    age = refresher.data_age_seconds
+    if age is None:
+        return {}
+
+    headers = {'Age': str(int(age))}
+    if refresher.is_stale():
+        headers['Warning'] = '110 - "Response is Stale"'
+    return headers
+
+
+def response_headers(cache_hit: bool) -> dict:
+    """
+    Заголовки свіжості та X-Cache: HIT - знімок з пам'яті, MISS - щойно завантажений.
+    Ознака не входить у тіло, тож тіло та ETag однакові для обох випадків.
+    """
+    return {**freshness_headers(), 'X-Cache': 'HIT' if cache_hit else 'MISS'}
+
+
+def queue_model(queue_data: dict) -> QueueSchedule:
+    return QueueSchedule(
+        queue=queue_data['queue'],
+        outages=[OutageTime(**o) for o in queue_data.get('outages', [])],
+        status=queue_data.get('status', 'active')
+    )
+
+
+def projection(fields: Optional[str]) -> Tuple[Optional[dict], str]:
+    """include для ?fields= та його канонічний запис для ключа мемоізації"""
+    if not fields:
+        return None, ""
+    try:
+        include = parse_fields(fields, ScheduleResponse)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return include, fields_key(include)
 
 
 @router.get("/", tags=["Info"])
@@ -31,8 +224,19 @@ async def root():
         "description": "API для отримання графіків відключень електроенергії",
         "endpoints": {
             "health": "/health",
+            "liveness": "/health/live",
+            "readiness": "/health/ready",
+            "metrics": "/metrics",
+            "polling": "/api/polling",
             "latest_schedule": "/api/schedules/latest",
             "queue_schedule": "/api/schedules/queue/{queue_id}",
+            "queue_status": "/api/schedules/queue/{queue_id}/status?at=14:35",
+            "queue_next": "/api/schedules/queue/{queue_id}/next",
+            "queues_schedule": "/api/schedules/queues?ids=1.1,2.2 (або ids=all)",
+            "stream": "/api/schedules/stream?ids=1.1,2.2 (SSE), /api/schedules/ws?ids=1.1,2.2 (WebSocket)",
+            "history": "/api/schedules/history?queue={queue_id}&from=YYYY-MM-DD&to=YYYY-MM-DD",
+            "changes": "/api/schedules/changes?since={change_id або YYYY-MM-DDTHH:MM}",
+            "analytics": "/api/schedules/analytics?from=YYYY-MM-DD&to=YYYY-MM-DD&slot_minutes=15",
             "all_queues": "/api/queues",
             "cache_info": "/api/cache/info"
         },
@@ -49,35 +253,93 @@ async def health_check():
     )
 
 
+@router.get("/health/live", response_model=HealthResponse, tags=["Info"])
+async def liveness():
+    """
+    Чи живий процес (liveness probe)
+
+    Не звертається ні до мережі, ні до кешу: відповідь означає лише, що event loop обробляє запити.
+    """
+    return HealthResponse(status="alive")
+
+
+@router.get("/health/ready", response_model=ReadinessResponse, tags=["Info"])
+async def readiness(response: Response):
+    """
+    Чи може воркер обслуговувати запити (readiness probe)
+
+    Стан береться лише з пам'яті: вік знімку, останнє успішне завантаження, кількість невдач поспіль
+    та результат останніх операцій зі сховищем кешу. ZOE не опитується.
+
+    - ready - є свіжі дані;
+    - degraded (200) - дані віддаються, але застарілі, ZOE не відповідає або сховище кешу з помилками;
+    - not_ready (503) - даних немає або вони старші за MAX_STALE_MINUTES.
+    """
+    snapshot = refresher.snapshot
+    cache_status = cache.backend_status()
+    data_age = refresher.data_age_seconds
+
+    reasons = []
+    if snapshot is None:
+        reasons.append("no snapshot loaded yet")
+    elif not refresher.is_usable():
+        reasons.append(f"data older than {CACHE_TTL_MINUTES + MAX_STALE_MINUTES} minutes")
+    ready = not reasons
+
+    if ready and refresher.is_stale():
+        reasons.append(f"data not confirmed for {int(data_age // 60)} minutes")
+    if refresher.consecutive_failures:
+        reasons.append(f"{refresher.consecutive_failures} consecutive upstream failures")
+    if scraper.breaker.state != CircuitBreaker.CLOSED:
+        reasons.append(f"upstream circuit {scraper.breaker.state}")
+    if not cache_status['ok']:
+        reasons.append(f"cache backend {cache_status['backend']} failing")
+
+    if not ready:
+        response.status_code = 503
+
+    return ReadinessResponse(
+        status="not_ready" if not ready else "degraded" if reasons else "ready",
+        ready=ready,
+        reasons=reasons,
+        role="follower" if refresher.is_follower else "leader",
+        snapshot_age_seconds=round(snapshot.age_seconds, 1) if snapshot else None,
+        data_age_seconds=round(data_age, 1) if data_age is not None else None,
+        stale=refresher.is_stale(),
+        last_success_at=refresher.last_success_at,
+        last_failure_at=refresher.last_failure_at,
+        last_error=refresher.last_error,
+        consecutive_failures=refresher.consecutive_failures,
+        upstream_circuit=scraper.breaker.state,
+        cache=CacheBackendStatus(**cache_status)
+    )
+
+
+@router.get("/metrics", tags=["Info"])
+async def metrics():
+    """Метрики процесу у форматі Prometheus"""
+    return Response(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 @router.get("/api/schedules/latest", response_model=ScheduleResponse, tags=["Schedules"])
 async def get_latest_schedule(
-    force_refresh: bool = Query(False, description="Примусово оновити дані, ігноруючи кеш")
+    request: Request,
+    force_refresh: bool = Query(False, description="Примусово оновити дані, ігноруючи кеш"),
+    fields: Optional[str] = Query(None, description="Лише ці поля через кому (data.times,updated_at)")
 ):
     """
-    Отримати найсвіжіший актуальний графік відключень
+    Отримати найсвіжіший актуальний графік
+
+    Підтримує умовні запити: з заголовком If-None-Match повертає 304, якщо дані не змінились.
 
     Args:
         force_refresh: Якщо True, ігнорує кеш і завантажує свіжі дані
+        fields: Повернути лише перелічені поля
     """
     try:
-        cache_key = "latest_schedule"
-        cache_hit = False
-
-        # Try to get from cache first
-        if not force_refresh:
-            cached_data = cache.get(cache_key)
-            if cached_data:
-                cache_hit = True
-                return ScheduleResponse(
-                    success=True,
-                    data=Schedule(**cached_data),
-                    cache_hit=cache_hit,
-                    updated_at=datetime.now()
-                )
-
-        # Fetch fresh data
-        logger.info("Fetching latest schedule from ZOE website")
-        schedule_data = scraper.get_latest_schedule()
+        include, include_key = projection(fields)
+        snapshot, cache_hit = await get_snapshot(force_refresh)
+        schedule_data = snapshot.latest
 
         if not schedule_data:
             raise HTTPException(
@@ -85,15 +347,17 @@ async def get_latest_schedule(
                 detail="Не вдалося знайти актуальний графік"
             )
 
-        # Cache the result
-        cache.set(cache_key, schedule_data)
-
-        return ScheduleResponse(
-            success=True,
-            data=Schedule(**schedule_data),
-            cache_hit=cache_hit,
-            updated_at=datetime.now()
-        )
+        key = f"latest;{include_key}" if include else "latest"
+        rendered = snapshot.rendered(key, lambda: RenderedResponse.from_model(
+            ScheduleResponse(
+                success=True,
+                # Not render time - identical data must give identical bodies on every worker
+                data=Schedule(**{'created_at': snapshot.fetched_at, **schedule_data}),
+                updated_at=snapshot.fetched_at
+            ),
+            include
+        ))
+        return conditional_response(request, rendered, response_headers(cache_hit))
 
     except HTTPException:
         raise
@@ -107,15 +371,26 @@ async def get_latest_schedule(
 
 @router.get("/api/schedules/queue/{queue_id}", response_model=ScheduleResponse, tags=["Schedules"])
 async def get_queue_schedule(
+    request: Request,
     queue_id: str,
-    force_refresh: bool = Query(False, description="Примусово оновити дані")
+    force_refresh: bool = Query(False, description="Примусово оновити дані"),
+    fields: Optional[str] = Query(None, description="Лише ці поля через кому (queue_data.outages,updated_at)"),
+    response_format: str = Query(
+        "json",
+        alias="format",
+        description=f"Формат відповіді: {', '.join(RESPONSE_FORMATS)} (compact - хвилини від початку доби)"
+    )
 ):
     """
     Отримати графік для конкретної черги
 
+    Підтримує умовні запити: з заголовком If-None-Match повертає 304, якщо дані не змінились.
+
     Args:
         queue_id: Номер черги (наприклад, 1.1, 2.2, тощо)
         force_refresh: Якщо True, ігнорує кеш
+        fields: Повернути лише перелічені поля
+        response_format: json (повна модель), compact (мінімальний JSON) або msgpack
     """
     try:
         # Validate queue_id format
@@ -125,28 +400,25 @@ async def get_queue_schedule(
                 detail="Невірний формат черги. Приклад: 1.1, 2.2, тощо"
             )
 
-        cache_key = f"queue_{queue_id}"
-        cache_hit = False
-
-        # Try cache first
-        if not force_refresh:
-            cached_data = cache.get(cache_key)
-            if cached_data:
-                cache_hit = True
-                return ScheduleResponse(
-                    success=True,
-                    queue_data=QueueSchedule(
-                        queue=cached_data['queue'],
-                        outages=[OutageTime(**o) for o in cached_data.get('outages', [])],
-                        status=cached_data.get('status', 'unknown')
-                    ),
-                    cache_hit=cache_hit,
-                    updated_at=datetime.now()
-                )
-
-        # Fetch fresh data
-        logger.info(f"Fetching schedule for queue {queue_id}")
-        queue_data = scraper.get_queue_schedule(queue_id)
+        if response_format not in RESPONSE_FORMATS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Невідомий формат. Доступні: {', '.join(RESPONSE_FORMATS)}"
+            )
+        if response_format == "msgpack" and not MSGPACK_AVAILABLE:
+            raise HTTPException(status_code=503, detail="Формат msgpack потребує msgpack (pip install msgpack)")
+
+        if response_format == "json":
+            include, include_key = projection(fields)
+        else:
+            try:
+                compact_fields = parse_compact_fields(fields) if fields else None
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            include_key = ','.join(compact_fields or ())
+
+        snapshot, cache_hit = await get_snapshot(force_refresh)
+        queue_data = snapshot.get_queue(queue_id, scraper)
 
         if not queue_data:
             raise HTTPException(
@@ -154,22 +426,32 @@ async def get_queue_schedule(
                 detail=f"Графік для черги {queue_id} не знайдено"
             )
 
-        # Cache the result
-        cache.set(cache_key, queue_data)
+        def build() -> RenderedResponse:
+            if response_format != "json":
+                compact = compact_queue(queue_data, snapshot.fetched_at)
+                if compact_fields:
+                    compact = {name: compact[name] for name in compact_fields if name in compact}
+                return render_compact(compact, response_format)
 
-        outages = [OutageTime(**o) for o in queue_data.get('outages', [])]
+            return RenderedResponse.from_model(ScheduleResponse(
+                success=True,
+                queue_data=queue_model(queue_data),
+                message=queue_data.get('message'),
+                updated_at=snapshot.fetched_at
+            ), include)
 
-        return ScheduleResponse(
-            success=True,
-            queue_data=QueueSchedule(
-                queue=queue_data['queue'],
-                outages=outages,
-                status=queue_data.get('status', 'active')
-            ),
-            message=queue_data.get('message'),
-            cache_hit=cache_hit,
-            updated_at=datetime.now()
-        )
+        # Memo keys keep ':<queue>' last so unchanged queues carry over to the next snapshot
+        if response_format == "json" and not include_key:
+            key = f"queue:{queue_id}"
+        else:
+            key = f"queue;{response_format};{include_key}:{queue_id}"
+
+        # Only known queues are memoized, so arbitrary ids can't grow the snapshot
+        if queue_id in snapshot.queues:
+            rendered = snapshot.rendered(key, build)
+        else:
+            rendered = build()
+        return conditional_response(request, rendered, response_headers(cache_hit))
 
     except HTTPException:
         raise
@@ -181,33 +463,612 @@ async def get_queue_schedule(
         )
 
 
-@router.get("/api/queues", tags=["Queues"])
-async def get_all_queues():
+# Schedule times are local to Zaporizhzhia
+SCHEDULE_TZ = ZoneInfo("Europe/Kyiv")
+
+
+def parse_at(at: Optional[str]) -> int:
+    """Хвилина доби за київським часом: 'HH:MM', ISO дата-час або зараз"""
+    if at is None:
+        now = datetime.now(SCHEDULE_TZ)
+        return now.hour * 60 + now.minute
+
+    try:
+        if re.fullmatch(r'\d{1,2}:\d{2}', at.strip()):
+            minute = to_minutes(at.strip())
+            if minute >= MINUTES_PER_DAY or int(at.strip().split(':')[1]) >= 60:
+                raise ValueError(at)
+            return minute
+
+        moment = datetime.fromisoformat(at.strip())
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(SCHEDULE_TZ)
+        return moment.hour * 60 + moment.minute
+
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Невірний формат часу. Приклад: at=14:35 або at=2025-01-25T14:35:00+02:00"
+        )
+
+
+def queue_status(snapshot: ScheduleSnapshot, queue_id: str, at: Optional[str]) -> QueueStatusResponse:
+    """Стан черги з компактного представлення доби у знімку (без розбору рядків часу)"""
+    if not queue_id or not queue_id.replace('.', '').isdigit():
+        raise HTTPException(
+            status_code=400,
+            detail="Невірний формат черги. Приклад: 1.1, 2.2, тощо"
+        )
+
+    minute = parse_at(at)
+    day = snapshot.days.get(queue_id)
+    queue_data = snapshot.queues.get(queue_id)
+
+    if day is None or queue_data.get('status') == 'no_data':
+        return QueueStatusResponse(
+            queue=queue_id,
+            at=format_minutes(minute),
+            status='no_data',
+            updated_at=snapshot.fetched_at
+        )
+
+    def outage(interval) -> Optional[OutageTime]:
+        if interval is None:
+            return None
+        return OutageTime(start=format_minutes(interval[0]), end=format_minutes(interval[1]))
+
+    current = day.current_outage(minute)
+    upcoming = day.next_outage(minute)
+
+    if current is not None:
+        change = current[1]
+    else:
+        change = upcoming[0] if upcoming else None
+
+    return QueueStatusResponse(
+        queue=queue_id,
+        at=format_minutes(minute),
+        status='off' if current else 'on',
+        power_on=current is None,
+        current_outage=outage(current),
+        next_outage=outage(upcoming),
+        next_change_at=format_minutes(change) if change is not None else None,
+        minutes_until_change=change - minute if change is not None else None,
+        minutes_until_next_outage=upcoming[0] - minute if upcoming else None,
+        slots=day.slots,
+        updated_at=snapshot.fetched_at
+    )
+
+
+@router.get("/api/schedules/queue/{queue_id}/status", response_model=QueueStatusResponse, tags=["Schedules"])
+async def get_queue_status(
+    response: Response,
+    queue_id: str,
+    at: Optional[str] = Query(None, description="Момент перевірки: HH:MM або ISO дата-час (за замовчуванням - зараз)")
+):
     """
-    Отримати список всіх доступних черг
+    Чи є світло у черги в заданий момент і коли зміниться стан
+
+    Відповідь розраховується з маски півгодинних слотів / відсортованих меж відключень у знімку,
+    тож клієнту не потрібно самому розбирати проміжки часу.
+
+    Args:
+        queue_id: Номер черги (наприклад, 1.1)
+        at: Час (київський) у форматі HH:MM або ISO дата-час
     """
     try:
-        cache_key = "all_queues"
+        snapshot, _ = await get_snapshot()
+        response.headers.update(freshness_headers())
+        return queue_status(snapshot, queue_id, at)
 
-        # Try cache
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return {
-                "success": True,
-                "queues": cached_data,
-                "cache_hit": True
-            }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_queue_status: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Помилка отримання стану черги {queue_id}: {str(e)}"
+        )
 
-        # Fetch fresh data
-        queues = scraper.get_all_queues()
-        cache.set(cache_key, queues)
 
-        return {
-            "success": True,
-            "queues": queues,
-            "cache_hit": False
+@router.get("/api/schedules/queue/{queue_id}/next", response_model=QueueStatusResponse, tags=["Schedules"])
+async def get_queue_next(
+    response: Response,
+    queue_id: str,
+    at: Optional[str] = Query(None, description="Момент відліку: HH:MM або ISO дата-час (за замовчуванням - зараз)")
+):
+    """
+    Наступне відключення черги та відлік до нього
+
+    Та сама відповідь, що й /status: next_outage та minutes_until_next_outage - для зворотного відліку
+    у віджеті, next_change_at - коли увімкнуть світло, якщо його зараз немає.
+
+    Args:
+        queue_id: Номер черги (наприклад, 1.1)
+        at: Час (київський) у форматі HH:MM або ISO дата-час
+    """
+    try:
+        snapshot, _ = await get_snapshot()
+        response.headers.update(freshness_headers())
+        return queue_status(snapshot, queue_id, at)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_queue_next: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Помилка отримання наступного відключення для черги {queue_id}: {str(e)}"
+        )
+
+
+MAX_BULK_QUEUES = 50
+
+
+def parse_queue_ids(ids: str, snapshot: ScheduleSnapshot) -> List[str]:
+    """'1.1,2.2' -> ['1.1', '2.2'] без повторів; 'all' - всі черги знімку"""
+    if ids.strip().lower() == 'all':
+        return sorted(snapshot.queues, key=lambda q: tuple(int(part) for part in q.split('.')))
+
+    queue_ids = list(dict.fromkeys(q.strip() for q in ids.split(',') if q.strip()))
+    if not queue_ids or any(not q.replace('.', '').isdigit() for q in queue_ids):
+        raise HTTPException(
+            status_code=400,
+            detail="Невірний формат черг. Приклад: ids=1.1,2.2 або ids=all"
+        )
+    if len(queue_ids) > MAX_BULK_QUEUES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Забагато черг в одному запиті (максимум {MAX_BULK_QUEUES})"
+        )
+    return queue_ids
+
+
+def queue_fragment(snapshot: ScheduleSnapshot, queue_id: str) -> bytes:
+    """JSON QueueSchedule черги; для відомих черг серіалізується один раз на знімок"""
+    def build() -> bytes:
+        return queue_model(snapshot.get_queue(queue_id, scraper)).model_dump_json().encode('utf-8')
+
+    if queue_id in snapshot.queues:
+        return snapshot.rendered(f"queue-json:{queue_id}", build)
+    return build()
+
+
+def render_queues(snapshot: ScheduleSnapshot, queue_ids: List[str]) -> RenderedResponse:
+    """
+    Тіло BulkQueueResponse, складене з готових JSON фрагментів черг.
+    Фрагмент кожної відомої черги серіалізується один раз на знімок і спільний для всіх комбінацій ids.
+    """
+    fragments = [
+        json.dumps(queue_id).encode('utf-8') + b':' + queue_fragment(snapshot, queue_id)
+        for queue_id in queue_ids
+    ]
+
+    envelope = BulkQueueResponse(updated_at=snapshot.fetched_at).model_dump_json()
+    # Same field order as the model: success, queues, updated_at
+    head, tail = envelope.split('"queues":{}', 1)
+    return RenderedResponse.from_bytes(
+        head.encode('utf-8') + b'"queues":{' + b','.join(fragments) + b'}' + tail.encode('utf-8')
+    )
+
+
+@router.get("/api/schedules/queues", response_model=BulkQueueResponse, tags=["Schedules"])
+async def get_queues_schedule(
+    request: Request,
+    ids: str = Query("all", description="Черги через кому (1.1,2.2,5.1) або all"),
+    force_refresh: bool = Query(False, description="Примусово оновити дані")
+):
+    """
+    Отримати графіки кількох черг однією відповіддю
+
+    Всі черги беруться з одного знімку даних. Підтримує умовні запити (If-None-Match).
+
+    Args:
+        ids: Номери черг через кому або "all" для всіх черг
+        force_refresh: Якщо True, ігнорує кеш
+    """
+    try:
+        snapshot, cache_hit = await get_snapshot(force_refresh)
+
+        if not snapshot.latest:
+            raise HTTPException(
+                status_code=404,
+                detail="Не вдалося знайти актуальний графік"
+            )
+
+        queue_ids = parse_queue_ids(ids, snapshot)
+
+        # The whole body is memoized for "all" only; other combinations reuse per-queue fragments
+        if ids.strip().lower() == 'all':
+            rendered = snapshot.rendered("queues:all", lambda: render_queues(snapshot, queue_ids))
+        else:
+            rendered = render_queues(snapshot, queue_ids)
+        return conditional_response(request, rendered, response_headers(cache_hit))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_queues_schedule: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Помилка отримання графіків черг: {str(e)}"
+        )
+
+
+SSE_PING_SECONDS = 25
+
+
+def queue_event(snapshot: ScheduleSnapshot, queue_id: str) -> bytes:
+    """Тіло push події для черги: одне на чергу і знімок, спільне для всіх підписників"""
+    return snapshot.rendered(f"event:{queue_id}", lambda: (
+        b'{"queue":' + json.dumps(queue_id).encode('utf-8')
+        + b',"queue_data":' + queue_fragment(snapshot, queue_id)
+        + b',"updated_at":' + json.dumps(snapshot.fetched_at.isoformat()).encode('utf-8') + b'}'
+    ))
+
+
+def publish_changes(previous: Optional[ScheduleSnapshot], snapshot: ScheduleSnapshot) -> None:
+    """Надіслати підписникам лише черги, графік яких (те, що бачить клієнт) з'явився або змінився"""
+    changed = snapshot.queues if previous is None else snapshot.changes
+    broadcaster.publish({
+        queue_id: queue_event(snapshot, queue_id)
+        for queue_id in changed
+        if queue_id in snapshot.queues and broadcaster.has_subscribers(queue_id)
+    })
+
+
+refresher.add_listener(publish_changes)
+
+
+async def subscription_snapshot(ids: str) -> Tuple[ScheduleSnapshot, List[str]]:
+    """Поточний знімок та перевірений список черг для нової підписки"""
+    snapshot, _ = await get_snapshot()
+    if not snapshot.latest:
+        raise HTTPException(
+            status_code=404,
+            detail="Не вдалося знайти актуальний графік"
+        )
+    return snapshot, parse_queue_ids(ids, snapshot)
+
+
+def subscribe(queue_ids: List[str]):
+    try:
+        return broadcaster.subscribe(queue_ids)
+    except OverflowError:
+        raise HTTPException(
+            status_code=503,
+            detail="Забагато підписок, спробуйте пізніше"
+        )
+
+
+@router.get("/api/schedules/stream", tags=["Push"])
+async def stream_schedules(
+    ids: str = Query("all", description="Черги через кому (1.1,2.2,5.1) або all")
+):
+    """
+    Підписка на зміни графіків черг (Server-Sent Events)
+
+    Спершу надсилається поточний графік кожної черги, далі - подія лише тоді,
+    коли графік черги змінився. Кожні 25 секунд без змін надсилається коментар-ping.
+
+    Args:
+        ids: Номери черг через кому або "all" для всіх черг
+    """
+    snapshot, queue_ids = await subscription_snapshot(ids)
+    subscription = subscribe(queue_ids)
+
+    async def events():
+        try:
+            for queue_id in queue_ids:
+                yield b'event: schedule\ndata: ' + queue_event(snapshot, queue_id) + b'\n\n'
+
+            while True:
+                pending = await subscription.next(SSE_PING_SECONDS)
+                if not pending:
+                    yield b': ping\n\n'
+                for payload in pending.values():
+                    yield b'event: schedule\ndata: ' + payload + b'\n\n'
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            'Cache-Control': 'no-cache',
+            # Don't let nginx-style proxies buffer the stream
+            'X-Accel-Buffering': 'no'
         }
+    )
+
+
+@router.websocket("/api/schedules/ws")
+async def websocket_schedules(websocket: WebSocket, ids: str = "all"):
+    """
+    Підписка на зміни графіків черг (WebSocket)
+
+    Як і SSE: поточний графік кожної черги, далі лише зміни. Клієнт може змінити набір
+    черг повідомленням {"subscribe": ["1.1", "2.2"]} - графіки нових черг прийдуть одразу.
+    """
+    await websocket.accept()
+    try:
+        snapshot, queue_ids = await subscription_snapshot(ids)
+        subscription = subscribe(queue_ids)
+    except HTTPException as e:
+        await websocket.close(code=1013 if e.status_code == 503 else 1008, reason=e.detail)
+        return
+
+    for queue_id in queue_ids:
+        subscription.push(queue_id, queue_event(snapshot, queue_id))
+
+    async def receive():
+        try:
+            while True:
+                try:
+                    message = await websocket.receive_json()
+                    new_ids = parse_queue_ids(','.join(map(str, message['subscribe'])), refresher.snapshot)
+                except (ValueError, TypeError, KeyError):
+                    await websocket.send_json({"error": 'Очікується {"subscribe": ["1.1", "2.2"]}'})
+                    continue
+                except HTTPException as e:
+                    await websocket.send_json({"error": e.detail})
+                    continue
+
+                added = set(new_ids) - subscription.queues
+                broadcaster.update(subscription, new_ids)
+                for queue_id in new_ids:
+                    if queue_id in added:
+                        subscription.push(queue_id, queue_event(refresher.snapshot, queue_id))
+        except WebSocketDisconnect:
+            pass
+        finally:
+            # Wake up the sender so it notices the disconnect
+            subscription.event.set()
+
+    receiver = asyncio.create_task(receive())
+    try:
+        while not receiver.done():
+            for payload in (await subscription.next()).values():
+                await websocket.send_text(payload.decode('utf-8'))
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        receiver.cancel()
+        broadcaster.unsubscribe(subscription)
+
+
+@router.get("/api/schedules/history", response_model=HistoryResponse, tags=["Schedules"])
+async def get_schedule_history(
+    queue: Optional[str] = Query(None, description="Номер черги (наприклад, 1.1); без нього - всі черги"),
+    date_from: Optional[date] = Query(None, alias="from", description="Початкова дата (YYYY-MM-DD)"),
+    date_to: Optional[date] = Query(None, alias="to", description="Кінцева дата (YYYY-MM-DD)"),
+    all_versions: bool = Query(False, description="Всі версії графіку на дату, а не лише остання"),
+    limit: int = Query(1000, ge=1, le=10000, description="Максимальна кількість записів")
+):
+    """
+    Історія графіків відключень по датах
+
+    Дані беруться з локального сховища історії, без звернення до сайту ZOE.
+
+    Args:
+        queue: Опціонально - номер черги
+        from: Опціонально - початкова дата діапазону
+        to: Опціонально - кінцева дата діапазону
+        all_versions: Якщо True, повертає всі оновлення графіку на кожну дату
+    """
+    if queue is not None and not queue.replace('.', '').isdigit():
+        raise HTTPException(
+            status_code=400,
+            detail="Невірний формат черги. Приклад: 1.1, 2.2, тощо"
+        )
+
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(
+            status_code=400,
+            detail="Дата 'from' має бути не пізніше дати 'to'"
+        )
+
+    try:
+        entries = await asyncio.to_thread(history.query, queue, date_from, date_to, all_versions, limit)
+        return HistoryResponse(
+            success=True,
+            queue=queue,
+            date_from=date_from.isoformat() if date_from else None,
+            date_to=date_to.isoformat() if date_to else None,
+            count=len(entries),
+            entries=[HistoryEntry(**entry) for entry in entries]
+        )
 
+    except Exception as e:
+        logger.error(f"Error in get_schedule_history: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Помилка отримання історії графіків: {str(e)}"
+        )
+
+
+@router.post("/api/schedules/history/backfill", tags=["Schedules"])
+async def backfill_schedule_history(
+    pages: int = Query(HISTORY_BACKFILL_PAGES, ge=1, le=MAX_BACKFILL_PAGES, description="Скільки сторінок пагінації завантажити")
+):
+    """
+    Заповнити історію старішими публікаціями ZOE
+
+    Сторінки пагінації всіх джерел завантажуються паралельно (з окремим, нижчим лімітом запитів
+    до хоста), графіки без дублікатів додаються в історію; вже збережені версії пропускаються.
+    Виконується лише на воркері-лідері; одночасні запити чекають на вже запущене заповнення.
+
+    Args:
+        pages: Кількість сторінок пагінації кожного джерела
+    """
+    if refresher.is_follower:
+        # Other workers would each crawl ZOE under their own per-process rate cap
+        raise HTTPException(
+            status_code=503,
+            detail="Історію заповнює лише воркер-лідер, повторіть запит",
+            headers={"Retry-After": "1"}
+        )
+
+    try:
+        stats = await refresher.backfill_history(pages)
+        return {"success": True, **stats}
+
+    except Exception as e:
+        logger.error(f"Error in backfill_schedule_history: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Помилка завантаження історії: {str(e)}"
+        )
+
+
+def parse_since(since: Optional[str]) -> Tuple[Optional[int], Optional[datetime]]:
+    """since як номер зміни або ISO дата/час (з часовим поясом - переводиться в локальний час)"""
+    if not since:
+        return None, None
+    if since.isdigit():
+        return int(since), None
+    try:
+        moment = datetime.fromisoformat(since)
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Невірний формат since. Приклад: 42, 2025-01-25 або 2025-01-25T10:30"
+        )
+    if moment.tzinfo is not None:
+        moment = moment.astimezone().replace(tzinfo=None)
+    return None, moment
+
+
+@router.get("/api/schedules/changes", response_model=ChangesResponse, tags=["Schedules"])
+async def get_schedule_changes(
+    since: Optional[str] = Query(None, description="Номер останньої отриманої зміни або дата/час (ISO)"),
+    queue: Optional[str] = Query(None, description="Лише зміни цієї черги"),
+    limit: int = Query(100, ge=1, le=1000, description="Максимальна кількість змін")
+):
+    """
+    Зміни графіків між версіями: додані, прибрані та зсунуті відключення по чергах
+
+    Зміна записується щоразу, коли ZOE публікує нову версію графіку (в тому числі
+    уточнення графіку на той самий день). Без since повертаються останні зміни;
+    для опитування передавайте last_id попередньої відповіді як since.
+    """
+    if queue is not None and not queue.replace('.', '').isdigit():
+        raise HTTPException(
+            status_code=400,
+            detail="Невірний формат черги. Приклад: 1.1, 2.2, тощо"
+        )
+
+    since_id, since_time = parse_since(since)
+
+    try:
+        changes = await asyncio.to_thread(history.changes_since, since_id, since_time, queue, limit)
+        return ChangesResponse(
+            success=True,
+            since=since,
+            queue=queue,
+            count=len(changes),
+            last_id=changes[-1]['id'] if changes else since_id,
+            changes=[ScheduleChange(**change) for change in changes]
+        )
+
+    except Exception as e:
+        logger.error(f"Error in get_schedule_changes: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Помилка отримання змін графіків: {str(e)}"
+        )
+
+
+MAX_ANALYTICS_DAYS = 731
+
+
+@router.get("/api/schedules/analytics", response_model=AnalyticsResponse, tags=["Schedules"])
+async def get_schedule_analytics(
+    date_from: Optional[date] = Query(None, alias="from", description="Початкова дата (YYYY-MM-DD)"),
+    date_to: Optional[date] = Query(None, alias="to", description="Кінцева дата (YYYY-MM-DD)"),
+    ids: Optional[str] = Query(None, description="Номери черг через кому; без них - всі черги з історії"),
+    slot_minutes: int = Query(15, description=f"Розмір слоту в хвилинах: {', '.join(map(str, SLOT_SIZES))}"),
+    include_slots: bool = Query(False, description="Додати стан по слотах кожного дня")
+):
+    """
+    Агрегати історії графіків по чергах за період
+
+    Хвилини відключень по днях, одночасні відключення пар черг та найдовший
+    безперервний проміжок зі світлом. Рахується над матрицею черга × слот з історії,
+    без звернення до сайту ZOE. За замовчуванням - останні 7 днів історії.
+    """
+    if not NUMPY_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Аналітика потребує numpy (pip install numpy)")
+
+    if slot_minutes not in SLOT_SIZES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"slot_minutes має бути одним з: {', '.join(map(str, SLOT_SIZES))}"
+        )
+
+    queues = None
+    if ids:
+        queues = [queue_id.strip() for queue_id in ids.split(',') if queue_id.strip()]
+        if not queues or not all(queue_id.replace('.', '').isdigit() for queue_id in queues):
+            raise HTTPException(
+                status_code=400,
+                detail="Невірний формат черги. Приклад: 1.1, 2.2, тощо"
+            )
+
+    if date_to is None:
+        last_date = (await asyncio.to_thread(history.get_stats)).get('last_date')
+        date_to = date.fromisoformat(last_date) if last_date else date.today()
+    if date_from is None:
+        date_from = date_to - timedelta(days=6)
+
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=400,
+            detail="Дата 'from' має бути не пізніше дати 'to'"
+        )
+    if (date_to - date_from).days >= MAX_ANALYTICS_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Період не може перевищувати {MAX_ANALYTICS_DAYS} днів"
+        )
+
+    try:
+        matrix = await asyncio.to_thread(
+            ScheduleMatrix.from_history, history, date_from, date_to, slot_minutes, queues
+        )
+        summary = await asyncio.to_thread(matrix.summary, include_slots)
+        return AnalyticsResponse(
+            success=True,
+            date_from=date_from.isoformat(),
+            date_to=date_to.isoformat(),
+            slot_minutes=slot_minutes,
+            **summary
+        )
+
+    except Exception as e:
+        logger.error(f"Error in get_schedule_analytics: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Помилка розрахунку аналітики: {str(e)}"
+        )
+
+
+@router.get("/api/queues", tags=["Queues"])
+async def get_all_queues(request: Request):
+    """
+    Отримати список всіх доступних черг
+    """
+    try:
+        snapshot, cache_hit = await get_snapshot()
+
+        rendered = snapshot.rendered("queues", lambda: RenderedResponse.from_content({
+            "success": True,
+            "queues": list(snapshot.queue_list)
+        }))
+        return conditional_response(request, rendered, response_headers(cache_hit))
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in get_all_queues: {e}")
         raise HTTPException(
@@ -220,12 +1081,19 @@ async def get_all_queues():
 async def get_cache_info():
     """
     Отримати інформацію про кеш
+
+    Розміри, час запису, термін та кількість звернень беруться з індексу в пам'яті - записи не читаються.
     """
     try:
         info = cache.get_cache_info()
+        history_stats = await asyncio.to_thread(history.get_stats)
         return {
             "success": True,
-            "cache_info": info
+            "cache_info": info,
+            "singleflight": refresher.singleflight.get_stats(),
+            "history": history_stats,
+            "leader": refresher.leader.is_leader if refresher.leader else True,
+            "push": broadcaster.get_stats()
         }
     except Exception as e:
         logger.error(f"Error in get_cache_info: {e}")
@@ -235,6 +1103,23 @@ async def get_cache_info():
         )
 
 
+@router.get("/api/polling", tags=["Cache"])
+async def get_polling_info():
+    """
+    Як часто API зараз опитує ZOE і чому
+
+    Інтервал підлаштовується під історію публікацій (години доби, нещодавні зміни,
+    Last-Modified сторінки) в межах POLL_MIN_MINUTES..POLL_MAX_MINUTES.
+    """
+    return {
+        "success": True,
+        "polling": refresher.polling_info(),
+        "circuit": scraper.breaker.info(),
+        "upstream_max_requests_per_minute": UPSTREAM_MAX_RPM,
+        "crawl_max_requests_per_minute": UPSTREAM_CRAWL_MAX_RPM
+    }
+
+
 @router.delete("/api/cache/clear", tags=["Cache"])
 async def clear_cache(key: Optional[str] = Query(None, description="Ключ для очищення (або весь кеш)")):
     """
@@ -244,7 +1129,8 @@ async def clear_cache(key: Optional[str] = Query(None, description="Ключ д
         key: Опціонально - конкретний ключ для очищення. Якщо не вказано, очищається весь кеш
     """
     try:
-        cache.clear(key)
+        # Waits for the cache writer thread, possibly behind a running sweep
+        await asyncio.to_thread(cache.clear, key)
         return {
             "success": True,
             "message": f"Кеш {'для ключа ' + key if key else 'повністю'} очищено"
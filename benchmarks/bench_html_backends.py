@@ -0,0 +1,108 @@
+"""
+Benchmark HTML backends парсера сторінки ZOE.
+
+Кожен встановлений backend запускається в окремому процесі, щоб пікова пам'ять
+одного не впливала на інший. Для кожного вимірюється:
+- час розбору однієї сторінки (parse_page, мс)
+- пік Python алокацій (tracemalloc, KiB) - не бачить пам'ять C бібліотек
+- приріст максимального RSS процесу (KiB) - бачить усе
+
+Також перевіряється, що результат кожного backend збігається з html.parser.
+
+Запуск: python benchmarks/bench_html_backends.py
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from services.scraper import BaseScraper, available_html_backends  # noqa: E402
+
+FIXTURES_DIR = os.path.join(ROOT_DIR, "benchmarks", "fixtures")
+REPEAT = 20
+
+
+def load_pages():
+    pages = []
+    for filename in sorted(os.listdir(FIXTURES_DIR)):
+        if filename.endswith('.html'):
+            with open(os.path.join(FIXTURES_DIR, filename), 'r', encoding='utf-8') as f:
+                pages.append(f.read())
+    return pages
+
+
+def comparable(schedules):
+    return [{k: v for k, v in s.items() if k != 'parsed_at'} for s in schedules]
+
+
+def measure(backend: str) -> dict:
+    """Виміри для одного backend (виконується в дочірньому процесі)"""
+    pages = load_pages()
+    scraper = BaseScraper(backend)
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        for page in pages:
+            scraper.parse_page(page)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for page in pages:
+        scraper.parse_page(page)
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # After the measurements, so the reference parse doesn't raise the RSS baseline
+    reference = BaseScraper('html.parser')
+    matches = all(
+        comparable(scraper.parse_page(page)) == comparable(reference.parse_page(page))
+        for page in pages
+    )
+
+    return {
+        "backend": backend,
+        "matches_html_parser": matches,
+        "ms_per_page": round(elapsed / (REPEAT * len(pages)) * 1000, 2),
+        "python_peak_kib": round(python_peak / 1024, 1),
+        "max_rss_growth_kib": rss_after - rss_before,
+        "page_kib": round(sum(len(p.encode('utf-8')) for p in pages) / len(pages) / 1024, 1)
+    }
+
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == '--backend':
+        import logging
+        logging.disable(logging.INFO)
+        print(json.dumps(measure(sys.argv[2])))
+        return
+
+    print("=" * 60)
+    print(f"HTML backend benchmark: {', '.join(available_html_backends())}")
+    print("=" * 60)
+
+    results = []
+    for backend in available_html_backends():
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--backend', backend],
+            capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(json.dumps(results, indent=2))
+
+    if not all(r["matches_html_parser"] for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+Benchmark всього шляху scrape → parse → serve, що запускається без мережі.
+
+Мікро-benchmarks (в цьому процесі, на збережених сторінках з benchmarks/fixtures):
+- розбір сторінки повністю та до першого актуального графіку, час на одну статтю
+- побудова знімку (з нуля та інкрементально від попереднього)
+- CacheService: get з пам'яті, get_shared незміненого запису (перевірка версії), читання зі сховища,
+  set із записом (для file та shm)
+- формати відповіді черги (json, json з ?fields=, compact, msgpack): розмір у байтах без стиснення,
+  з gzip та br, час серіалізації та стиснення
+
+HTTP навантаження (API в окремому процесі проти локальної заглушки ZOE):
+- cache hit: відповіді зі знімку (/queue, /latest, /queues, /status)
+- cache miss: force_refresh з незмінною сторінкою (запит до заглушки без розбору)
+  та зі сторінкою, що змінюється на кожен запит (запит + розбір)
+Для кожного сценарію - кількість запитів, пропускна здатність, p50/p90/p99 латентності.
+
+Результати виводяться як JSON; --output зберігає їх у файл, --compare порівнює з попереднім запуском.
+
+Запуск: python benchmarks/bench_pipeline.py [--duration 5] [--concurrency 16] [--output run.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import (  # noqa: E402
+    ROOT_DIR, KeepAliveClient, StubUpstream, load_fixture_pages, percentile, start_api, wait_for_api
+)
+from api.formats import MSGPACK_AVAILABLE, compact_queue, render_compact  # noqa: E402
+from api.rendering import BROTLI_AVAILABLE, RenderedResponse, compress  # noqa: E402
+from models.schedule import OutageTime, QueueSchedule, ScheduleResponse  # noqa: E402
+from services.cache import CacheService  # noqa: E402
+from services.cache_backends import get_cache_backend  # noqa: E402
+from services.refresher import ScheduleSnapshot  # noqa: E402
+from services.scraper import BaseScraper  # noqa: E402
+
+HTTP_SCENARIOS = [
+    # (name, path, upstream mode)
+    ("hit_queue", "/api/schedules/queue/1.1", None),
+    ("hit_queue_compact", "/api/schedules/queue/1.1?format=compact", None),
+    ("hit_latest", "/api/schedules/latest", None),
+    ("hit_queues_all", "/api/schedules/queues?ids=all", None),
+    ("hit_status", "/api/schedules/queue/1.1/status?at=12:00", None),
+    ("miss_unchanged", "/api/schedules/queue/1.1?force_refresh=true", "same"),
+    ("miss_modified", "/api/schedules/queue/1.1?force_refresh=true", "rotate"),
+]
+
+
+def time_op(fn, min_seconds: float = 0.2, repeat: int = 5) -> dict:
+    """Час однієї операції в мікросекундах: медіана та найкращий з repeat серій"""
+    number = 1
+    while timeit.timeit(fn, number=number) < min_seconds / repeat and number < 1_000_000:
+        number *= 2
+
+    per_op = [t / number * 1e6 for t in timeit.repeat(fn, number=number, repeat=repeat)]
+    return {"us_median": round(sorted(per_op)[len(per_op) // 2], 2), "us_best": round(min(per_op), 2)}
+
+
+def micro_benchmarks() -> dict:
+    pages = load_fixture_pages()
+    scraper = BaseScraper()
+    results = {"html_backend": scraper.html_backend.name}
+
+    for name, html in pages.items():
+        page = name.rsplit('.', 1)[0]
+        results[f"parse_page_full.{page}"] = time_op(lambda: scraper.parse_page(html))
+        results[f"parse_page_latest.{page}"] = time_op(lambda: scraper.parse_latest_schedule(html))
+
+        articles = scraper.html_backend.articles(html)
+        parsed_at = datetime.now().isoformat()
+        per_page = time_op(lambda: [scraper._parse_article(a, i, parsed_at) for i, a in enumerate(articles)])
+        results[f"parse_article.{page}"] = {k: round(v / len(articles), 2) for k, v in per_page.items()}
+
+    latest = scraper.parse_latest_schedule(next(iter(pages.values())))
+    previous = ScheduleSnapshot.from_latest(scraper, latest)
+    results["snapshot_build"] = time_op(lambda: ScheduleSnapshot.from_latest(scraper, latest))
+    results["snapshot_build_incremental"] = time_op(
+        lambda: ScheduleSnapshot.from_latest(scraper, latest, previous=previous)
+    )
+
+    results.update(format_benchmarks(previous))
+
+    workdir = tempfile.mkdtemp(prefix='zoe-bench-cache-')
+    # Separate shm slots, so a running API's cache is not touched
+    shm_dir = tempfile.mkdtemp(prefix='zoe-bench-', dir='/dev/shm' if os.path.isdir('/dev/shm') else None)
+    try:
+        for backend_name in ("file", "shm"):
+            options = {"cache_dir": workdir} if backend_name == "file" else {"directory": shm_dir}
+            try:
+                backend = get_cache_backend(backend_name, **options)
+            except (ValueError, TypeError, OSError) as e:
+                results[f"cache.{backend_name}"] = {"skipped": str(e)}
+                continue
+
+            cache = CacheService(cache_dir=workdir, backend=backend)
+            cache.set("latest_schedule", latest)
+            cache.flush()
+
+            def set_and_write():
+                cache.set("latest_schedule", latest)
+                cache.flush()
+
+            results[f"cache_get_memory.{backend_name}"] = time_op(lambda: cache.get("latest_schedule"))
+            results[f"cache_get_shared.{backend_name}"] = time_op(lambda: cache.get_shared("latest_schedule"))
+            results[f"cache_get_backend.{backend_name}"] = time_op(lambda: cache._load("latest_schedule"))
+            results[f"cache_set.{backend_name}"] = time_op(set_and_write)
+            cache.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        shutil.rmtree(shm_dir, ignore_errors=True)
+
+    return results
+
+
+def format_benchmarks(snapshot: ScheduleSnapshot) -> dict:
+    """Розмір і вартість рендерингу відповіді черги в кожному форматі та кодуванні"""
+    queue_data = snapshot.queues["1.1"]
+
+    def full_model() -> ScheduleResponse:
+        return ScheduleResponse(
+            success=True,
+            queue_data=QueueSchedule(
+                queue=queue_data['queue'],
+                outages=[OutageTime(**o) for o in queue_data.get('outages', [])],
+                status=queue_data.get('status', 'active')
+            ),
+            message=queue_data.get('message'),
+            updated_at=snapshot.fetched_at
+        )
+
+    formats = {
+        "json": lambda: RenderedResponse.from_model(full_model()),
+        "json_fields": lambda: RenderedResponse.from_model(full_model(), {'queue_data': {'outages': True}}),
+        "compact": lambda: render_compact(compact_queue(queue_data, snapshot.fetched_at), "compact"),
+    }
+    if MSGPACK_AVAILABLE:
+        formats["msgpack"] = lambda: render_compact(compact_queue(queue_data, snapshot.fetched_at), "msgpack")
+
+    encodings = ("gzip", "br") if BROTLI_AVAILABLE else ("gzip",)
+    results = {}
+    for name, build in formats.items():
+        body = build().body
+        result = {"bytes": len(body), "serialize": time_op(build)}
+        for encoding in encodings:
+            result[f"bytes_{encoding}"] = len(compress(body, encoding))
+            result[f"compress_{encoding}"] = time_op(lambda: compress(body, encoding))
+        results[f"format.{name}"] = result
+    return results
+
+
+async def load(path: str, duration: float, concurrency: int) -> dict:
+    """concurrency з'єднань з keep-alive, кожне шле запити підряд протягом duration секунд"""
+    latencies = []
+    errors = 0
+
+    async def worker(deadline: float):
+        nonlocal errors
+        client = KeepAliveClient()
+        try:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                status = await client.get(path)
+                latencies.append(time.perf_counter() - started)
+                if status >= 400:
+                    errors += 1
+        finally:
+            client.close()
+
+    # Short warm-up so connection setup and first renders aren't measured
+    await asyncio.gather(*(worker(time.perf_counter() + 0.3) for _ in range(concurrency)))
+    latencies.clear()
+    errors = 0
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(started + duration) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    ms = [value * 1000 for value in latencies]
+    return {
+        "requests": len(ms),
+        "errors": errors,
+        "rps": round(len(ms) / elapsed, 1),
+        "p50_ms": round(percentile(ms, 50), 2) if ms else None,
+        "p90_ms": round(percentile(ms, 90), 2) if ms else None,
+        "p99_ms": round(percentile(ms, 99), 2) if ms else None,
+        "max_ms": round(max(ms), 2) if ms else None
+    }
+
+
+async def http_benchmarks(duration: float, concurrency: int) -> dict:
+    pages = list(load_fixture_pages().values())
+    stub = StubUpstream(pages[0], pages).start()
+    workdir = tempfile.mkdtemp(prefix='zoe-bench-api-')
+    api = start_api(workdir)
+
+    results = {}
+    try:
+        await wait_for_api()
+        for name, path, upstream in HTTP_SCENARIOS:
+            stub.rotate = upstream == "rotate"
+            upstream_before = stub.requests
+            results[name] = await load(path, duration, concurrency)
+            # Concurrent force_refresh requests are coalesced into one upstream fetch
+            results[name]["upstream_requests"] = stub.requests - upstream_before
+    finally:
+        api.terminate()
+        api.wait()
+        stub.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return results
+
+
+def run_metadata(args) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "duration_seconds": args.duration,
+        "concurrency": args.concurrency
+    }
+
+
+def flatten(data, prefix=""):
+    """{'a': {'b': 1}} -> {'a.b': 1}, лише числові значення"""
+    values = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            values.update(flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[path] = value
+    return values
+
+
+def compare(baseline: dict, current: dict) -> None:
+    """Надрукувати зміну кожного числового показника відносно baseline"""
+    old, new = flatten(baseline.get("results", {})), flatten(current["results"])
+    print(f"{'metric':<52} {'baseline':>12} {'current':>12} {'change':>9}")
+    for path in sorted(set(old) & set(new)):
+        change = f"{(new[path] - old[path]) / old[path] * 100:+.1f}%" if old[path] else "-"
+        print(f"{path:<52} {old[path]:>12} {new[path]:>12} {change:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape -> parse -> serve benchmark suite")
+    parser.add_argument('--duration', type=float, default=5, help="Тривалість кожного HTTP сценарію, с")
+    parser.add_argument('--concurrency', type=int, default=16, help="Кількість одночасних з'єднань")
+    parser.add_argument('--skip-micro', action='store_true', help="Без мікро-benchmarks")
+    parser.add_argument('--skip-http', action='store_true', help="Без HTTP навантаження")
+    parser.add_argument('--output', help="Зберегти результати в JSON файл")
+    parser.add_argument('--compare', help="JSON попереднього запуску для порівняння")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)
+
+    report = {"meta": run_metadata(args), "results": {}}
+    if not args.skip_micro:
+        report["results"]["micro"] = micro_benchmarks()
+    if not args.skip_http:
+        report["results"]["http"] = asyncio.run(http_benchmarks(args.duration, args.concurrency))
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
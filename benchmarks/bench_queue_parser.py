@@ -0,0 +1,117 @@
+"""
+Benchmark розбору статей на {черга: [проміжки]}.
+
+Перевіряє результат на збережених сторінках ZOE (benchmarks/fixtures/*.html,
+очікувані значення - *.expected.json) і вимірює час розбору однієї статті
+в порівнянні зі старим підходом (окремий regex на кожну чергу).
+
+Запуск: python benchmarks/bench_queue_parser.py
+"""
+import json
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.queue_parser import parse_queue_intervals  # noqa: E402
+from services.scraper import BaseScraper  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+REPEAT = 200
+
+
+def legacy_queue_lookup(content: str, queue_id: str):
+    """Старий parse_queue_specific_times: regex компілюється на кожен виклик"""
+    pattern = rf'{re.escape(queue_id)}:\s*((?:\d{{1,2}}:\d{{2}}\s*[-–—]\s*\d{{1,2}}:\d{{2}},?\s*)+)'
+    match = re.search(pattern, content)
+    if match:
+        return re.findall(r'(\d{1,2}:\d{2})\s*[-–—]\s*(\d{1,2}:\d{2})', match.group(1))
+    return []
+
+
+def load_articles():
+    """Тексти статей та очікувані результати з усіх fixture сторінок"""
+    scraper = BaseScraper()
+    articles = []
+
+    for filename in sorted(os.listdir(FIXTURES_DIR)):
+        if not filename.endswith('.html'):
+            continue
+
+        with open(os.path.join(FIXTURES_DIR, filename), 'r', encoding='utf-8') as f:
+            schedules = scraper.parse_page(f.read())
+
+        with open(os.path.join(FIXTURES_DIR, filename.replace('.html', '.expected.json')), 'r', encoding='utf-8') as f:
+            expected = json.load(f)
+
+        for schedule, exp in zip(schedules, expected):
+            articles.append((filename, schedule['content_text'], exp['queue_times']))
+
+    return articles
+
+
+def main():
+    articles = load_articles()
+
+    print("=" * 60)
+    print(f"Queue parser benchmark: {len(articles)} articles")
+    print("=" * 60)
+
+    failures = 0
+    for filename, text, expected in articles:
+        if parse_queue_intervals(text) != expected:
+            failures += 1
+            print(f"[FAIL] {filename}: parsed intervals differ from expected")
+
+    if failures:
+        sys.exit(1)
+    print("[OK] All articles match expected queue intervals")
+
+    queues = BaseScraper.DEFAULT_QUEUES
+    texts = [text for _, text, _ in articles]
+    parsed = [parse_queue_intervals(text) for text in texts]
+
+    legacy_correct = sum(
+        1 for text, expected in zip(texts, (exp for _, _, exp in articles))
+        if all(
+            [list(r) for r in legacy_queue_lookup(text, queue_id)] == intervals
+            for queue_id, intervals in expected.items()
+        )
+    )
+
+    def run_parse():
+        for text in texts:
+            parse_queue_intervals(text)
+
+    def run_lookup():
+        for intervals in parsed:
+            for queue_id in queues:
+                intervals.get(queue_id)
+
+    def run_legacy():
+        for text in texts:
+            for queue_id in queues:
+                legacy_queue_lookup(text, queue_id)
+
+    lookups = REPEAT * len(texts) * len(queues)
+    parse_time = timeit.timeit(run_parse, number=REPEAT) / (REPEAT * len(texts))
+    lookup_time = timeit.timeit(run_lookup, number=REPEAT) / lookups
+    legacy_time = timeit.timeit(run_legacy, number=REPEAT) / lookups
+
+    results = {
+        "articles": len(texts),
+        # Paid once per article per refresh
+        "parse_us_per_article": round(parse_time * 1e6, 2),
+        # Paid on every queue lookup
+        "lookup_us_per_queue": round(lookup_time * 1e6, 3),
+        "legacy_lookup_us_per_queue": round(legacy_time * 1e6, 3),
+        "legacy_correct_articles": legacy_correct
+    }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
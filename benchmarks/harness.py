@@ -0,0 +1,164 @@
+"""
+Спільні частини benchmarks: корпус збережених сторінок ZOE, локальна заглушка сайту,
+API в окремому процесі та простий HTTP/1.1 клієнт з keep-alive для навантаження.
+"""
+import asyncio
+import http.server
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(ROOT_DIR, "benchmarks", "fixtures")
+
+STUB_PORT = 18181
+API_PORT = 18180
+
+
+def load_fixture_pages() -> Dict[str, str]:
+    """{ім'я файлу: HTML} усіх збережених сторінок zoe.com.ua"""
+    pages = {}
+    for filename in sorted(os.listdir(FIXTURES_DIR)):
+        if filename.endswith('.html'):
+            with open(os.path.join(FIXTURES_DIR, filename), 'r', encoding='utf-8') as f:
+                pages[filename] = f.read()
+    return pages
+
+
+class StubUpstream:
+    """
+    Заглушка сайту ZOE на localhost. Віддає page; з rotate=True кожен запит отримує наступну
+    сторінку з pages, тож API щоразу бачить змінену сторінку і розбирає її.
+    delay - затримка перед відповіддю в секундах (повільний сайт); port=0 - вільний порт.
+    """
+
+    def __init__(self, page: str, pages: Optional[List[str]] = None, port: int = STUB_PORT, delay: float = 0):
+        self.page = page
+        self.pages = pages or [page]
+        self.rotate = False
+        self.requests = 0
+        self.port = port
+        self.delay = delay
+        self._server: Optional[http.server.ThreadingHTTPServer] = None
+
+    def _next_body(self) -> bytes:
+        self.requests += 1
+        page = self.pages[self.requests % len(self.pages)] if self.rotate else self.page
+        return page.encode('utf-8')
+
+    def start(self) -> "StubUpstream":
+        stub = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                if stub.delay:
+                    time.sleep(stub.delay)
+                body = stub._next_body()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = http.server.ThreadingHTTPServer(('127.0.0.1', self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/outage/"
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+def start_api(workdir: str, port: int = API_PORT, stub_port: int = STUB_PORT) -> subprocess.Popen:
+    """API (main.app) в окремому процесі, що ходить на заглушку; кеш та історія - у workdir"""
+    code = (
+        f"import sys; sys.path.insert(0, {ROOT_DIR!r});"
+        "import logging; logging.disable(logging.INFO);"
+        "from services.scraper import BaseScraper;"
+        f"BaseScraper.BASE_URL = 'http://127.0.0.1:{stub_port}/outage/';"
+        "import uvicorn, main;"
+        f"uvicorn.run(main.app, host='127.0.0.1', port={port}, log_level='warning', backlog=4096)"
+    )
+    # No politeness cap towards the stub, force_refresh scenarios measure the pipeline itself
+    env = {**os.environ, "UPSTREAM_MAX_RPM": "0"}
+    return subprocess.Popen([sys.executable, '-c', code], cwd=workdir, env=env)
+
+
+async def http_get(path: str, port: int = API_PORT) -> bytes:
+    """Один запит з окремим з'єднанням; повертає сиру відповідь"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+    body = await reader.read()
+    writer.close()
+    return body
+
+
+async def wait_for_api(timeout: float = 30, port: int = API_PORT) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if b'200 OK' in await http_get('/api/schedules/latest', port):
+                return
+        except OSError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("API did not start")
+
+
+class KeepAliveClient:
+    """Мінімальний HTTP/1.1 клієнт на одному з'єднанні, щоб клієнт не був вузьким місцем"""
+
+    def __init__(self, port: int = API_PORT):
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def get(self, path: str) -> int:
+        """Виконати GET і дочитати тіло; повертає HTTP статус"""
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection('127.0.0.1', self.port)
+
+        self._writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        head = await self._reader.readuntil(b'\r\n\r\n')
+        status = int(head.split(b' ', 2)[1])
+
+        length = 0
+        for line in head.split(b'\r\n'):
+            if line[:15].lower() == b'content-length:':
+                length = int(line[15:])
+        if length:
+            await self._reader.readexactly(length)
+        return status
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def rss_kib(pid: int) -> int:
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else None
@@ -0,0 +1,190 @@
+"""
+Навантажувальний тест push підписок (SSE та WebSocket).
+
+Піднімає локальну заглушку сайту ZOE (сторінка з benchmarks/fixtures) та API в окремому
+процесі, відкриває багато підписок на різні черги, змінює графік однієї черги на заглушці
+та вимірює:
+- час підключення всіх підписників
+- RSS процесу API з відкритими підписками
+- затримку від оновлення до отримання події (p50/p99) для підписників зміненої черги
+- що підписники незмінених черг нічого не отримали
+
+Запуск: python benchmarks/load_push.py [--sse 5000] [--ws 500]
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import (  # noqa: E402
+    API_PORT, FIXTURES_DIR, StubUpstream, http_get, percentile, rss_kib, start_api, wait_for_api
+)
+from services.refresher import ScheduleSnapshot  # noqa: E402
+from services.scraper import BaseScraper  # noqa: E402
+
+FIXTURE = os.path.join(FIXTURES_DIR, "outage_grouped.html")
+EVENT_MARKER = b'event: schedule'
+
+try:
+    import websockets
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    WEBSOCKETS_AVAILABLE = False
+
+
+def changed_page(html: str):
+    """Сторінка, де змінено перший проміжок черги 1.1 в першій статті, та змінені черги"""
+    first_article = html.index('<article')
+    queue_pos = html.index('1.1', first_article)
+    match = re.compile(r'\d\d:\d\d').search(html, queue_pos)
+    changed = html[:match.start()] + '00:05' + html[match.end():]
+
+    scraper = BaseScraper()
+    before = ScheduleSnapshot.from_latest(scraper, scraper.parse_latest_schedule(html))
+    after = ScheduleSnapshot.from_latest(scraper, scraper.parse_latest_schedule(changed), previous=before)
+    queues = set(after.changes)
+    return changed, queues
+
+
+class SseClient:
+    """Мінімальний SSE клієнт на сирому сокеті, щоб клієнти не були вузьким місцем"""
+
+    def __init__(self, queue_id: str):
+        self.queue_id = queue_id
+        self.events = 0
+        self.received_at = None
+        self.ready = asyncio.Event()
+
+    async def run(self, stop: asyncio.Event) -> None:
+        reader, writer = await asyncio.open_connection('127.0.0.1', API_PORT)
+        writer.write(
+            f"GET /api/schedules/stream?ids={self.queue_id} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode()
+        )
+        try:
+            while not stop.is_set():
+                chunk = await reader.read(65536)
+                if not chunk:
+                    break
+                self.events += chunk.count(EVENT_MARKER)
+                if self.events > 1 and self.received_at is None:
+                    self.received_at = time.perf_counter()
+                if self.events:
+                    self.ready.set()
+        finally:
+            writer.close()
+
+
+class WsClient:
+    def __init__(self, queue_id: str):
+        self.queue_id = queue_id
+        self.events = 0
+        self.received_at = None
+        self.ready = asyncio.Event()
+
+    async def run(self, stop: asyncio.Event) -> None:
+        url = f"ws://127.0.0.1:{API_PORT}/api/schedules/ws?ids={self.queue_id}"
+        async with websockets.connect(url, ping_interval=None) as ws:
+            while not stop.is_set():
+                await ws.recv()
+                self.events += 1
+                if self.events > 1 and self.received_at is None:
+                    self.received_at = time.perf_counter()
+                self.ready.set()
+
+
+async def run(args) -> dict:
+    original = open(FIXTURE, 'r', encoding='utf-8').read()
+    changed, changed_queues = changed_page(original)
+    stub = StubUpstream(original).start()
+
+    workdir = tempfile.mkdtemp(prefix='zoe-load-push-')
+    api = start_api(workdir)
+    try:
+        await wait_for_api()
+        rss_idle = rss_kib(api.pid)
+
+        queues = BaseScraper.DEFAULT_QUEUES
+        clients = [SseClient(queues[i % len(queues)]) for i in range(args.sse)]
+        if WEBSOCKETS_AVAILABLE:
+            clients += [WsClient(queues[i % len(queues)]) for i in range(args.ws)]
+
+        stop = asyncio.Event()
+        start = time.perf_counter()
+        tasks = []
+        for i in range(0, len(clients), 200):
+            batch = clients[i:i + 200]
+            tasks += [asyncio.create_task(c.run(stop)) for c in batch]
+            await asyncio.gather(*(c.ready.wait() for c in batch))
+        connect_seconds = time.perf_counter() - start
+        rss_connected = rss_kib(api.pid)
+
+        # Change one queue upstream and let the API notice it
+        stub.page = changed
+        published = time.perf_counter()
+        await http_get('/api/schedules/latest?force_refresh=true')
+
+        expected = [c for c in clients if c.queue_id in changed_queues]
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline and any(c.received_at is None for c in expected):
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(1)
+
+        latencies = [(c.received_at - published) * 1000 for c in expected if c.received_at]
+        unexpected = sum(1 for c in clients if c.queue_id not in changed_queues and c.events > 1)
+
+        stop.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        return {
+            "sse_subscribers": args.sse,
+            "ws_subscribers": args.ws if WEBSOCKETS_AVAILABLE else 0,
+            "connect_seconds": round(connect_seconds, 2),
+            "api_rss_idle_mib": round(rss_idle / 1024, 1),
+            "api_rss_connected_mib": round(rss_connected / 1024, 1),
+            "rss_per_subscriber_kib": round((rss_connected - rss_idle) / len(clients), 2),
+            "changed_queues": sorted(changed_queues),
+            "expected_deliveries": len(expected),
+            "delivered": len(latencies),
+            "latency_p50_ms": round(percentile(latencies, 50), 1) if latencies else None,
+            "latency_p99_ms": round(percentile(latencies, 99), 1) if latencies else None,
+            "latency_max_ms": round(max(latencies), 1) if latencies else None,
+            "unexpected_deliveries": unexpected
+        }
+    finally:
+        api.terminate()
+        api.wait()
+        stub.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Push subscriptions load test")
+    parser.add_argument('--sse', type=int, default=5000, help="Кількість SSE підписників")
+    parser.add_argument('--ws', type=int, default=500, help="Кількість WebSocket підписників")
+    args = parser.parse_args()
+
+    # Each subscriber is a socket on both ends
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    print("=" * 60)
+    print(f"Push load test: {args.sse} SSE + {args.ws if WEBSOCKETS_AVAILABLE else 0} WebSocket subscribers")
+    print("=" * 60)
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+
+    if results["delivered"] != results["expected_deliveries"] or results["unexpected_deliveries"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,8 @@ from fastapi.responses import JSONResponse
 import logging
 import sys
 
-from api.routes import router
+from api.middleware import MetricsMiddleware
+from api.routes import router, refresher, cache, history
 
 # Configure logging
 logging.basicConfig(
@@ -50,6 +51,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency and status counters for /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include routes
 app.include_router(router)
 
@@ -77,11 +81,19 @@ async def startup_event():
     logger.info("API Documentation: http://localhost:8000/docs")
     logger.info("=" * 60)
 
+    # Background refresh - request handlers are served from the in-memory snapshot
+    refresher.start()
+    cache.start_sweeper()
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Виконується при зупинці додатку"""
     logger.info("ZOE Outage API Shutting down...")
+    await refresher.stop()
+    await cache.stop_sweeper()
+    cache.close()
+    history.close()
 
 
 if __name__ == "__main__":
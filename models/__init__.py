@@ -1,3 +1,3 @@
-from .schedule import OutageTime, Schedule, ScheduleResponse, QueueSchedule
+from .schedule import OutageTime, Schedule, ScheduleResponse, QueueSchedule, BulkQueueResponse, QueueStatusResponse, HistoryEntry, HistoryResponse, OutageShift, QueueChange, ScheduleChange, ChangesResponse, SupplyPeriod, QueueAnalytics, AnalyticsResponse, CacheBackendStatus, ReadinessResponse
 
-__all__ = ["OutageTime", "Schedule", "ScheduleResponse", "QueueSchedule"]
+__all__ = ["OutageTime", "Schedule", "ScheduleResponse", "QueueSchedule", "BulkQueueResponse", "QueueStatusResponse", "HistoryEntry", "HistoryResponse", "OutageShift", "QueueChange", "ScheduleChange", "ChangesResponse", "SupplyPeriod", "QueueAnalytics", "AnalyticsResponse", "CacheBackendStatus", "ReadinessResponse"]
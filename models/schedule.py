@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 
@@ -43,6 +43,10 @@ class Schedule(BaseModel):
     content_text: str = Field(..., description="Текстовий вміст")
     queues: List[str] = Field(default_factory=list, description="Список черг")
     times: List[List[str]] = Field(default_factory=list, description="Часи відключень")
+    queue_times: Dict[str, List[List[str]]] = Field(
+        default_factory=dict,
+        description="Часи відключень по чергах"
+    )
     created_at: Optional[datetime] = Field(default_factory=datetime.now)
 
     class Config:
@@ -52,7 +56,11 @@ class Schedule(BaseModel):
                 "date": "2025-01-25",
                 "content_text": "Години відсутності електропостачання...",
                 "queues": ["1.1", "1.2", "2.1"],
-                "times": [["03:00", "08:00"], ["12:00", "17:00"]]
+                "times": [["03:00", "08:00"], ["12:00", "17:00"]],
+                "queue_times": {
+                    "1.1": [["03:00", "08:00"], ["12:00", "17:00"]],
+                    "1.2": [["03:00", "08:00"]]
+                }
             }
         }
 
@@ -64,7 +72,6 @@ class ScheduleResponse(BaseModel):
     queue_data: Optional[QueueSchedule] = None
     message: Optional[str] = None
     updated_at: datetime = Field(default_factory=datetime.now)
-    cache_hit: bool = Field(default=False, description="Чи дані взяті з кешу")
 
     class Config:
         json_schema_extra = {
@@ -75,8 +82,233 @@ class ScheduleResponse(BaseModel):
                     "queues": ["1.1", "1.2"],
                     "times": [["03:00", "08:00"]]
                 },
-                "updated_at": "2025-01-25T10:30:00Z",
-                "cache_hit": False
+                "updated_at": "2025-01-25T10:30:00Z"
+            }
+        }
+
+
+class BulkQueueResponse(BaseModel):
+    """Відповідь API з графіками кількох черг з одного знімку"""
+    success: bool = Field(default=True)
+    queues: Dict[str, QueueSchedule] = Field(default_factory=dict, description="Графіки по чергах")
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "success": True,
+                "queues": {
+                    "1.1": {"queue": "1.1", "outages": [{"start": "03:00", "end": "08:00"}], "status": "active"},
+                    "2.2": {"queue": "2.2", "outages": [], "status": "no_data"}
+                },
+                "updated_at": "2025-01-25T10:30:00Z"
+            }
+        }
+
+
+class QueueStatusResponse(BaseModel):
+    """Стан черги на конкретний момент: чи є світло та коли наступна зміна"""
+    success: bool = Field(default=True)
+    queue: str = Field(..., description="Номер черги")
+    at: str = Field(..., description="Момент, для якого розраховано стан (HH:MM, київський час)")
+    status: str = Field(..., description="Статус: on, off, no_data")
+    power_on: Optional[bool] = Field(None, description="Чи є світло (None - немає даних)")
+    current_outage: Optional[OutageTime] = Field(None, description="Відключення, що діє зараз")
+    next_outage: Optional[OutageTime] = Field(None, description="Наступне відключення (сьогодні або завтра)")
+    next_change_at: Optional[str] = Field(None, description="Коли зміниться стан (HH:MM)")
+    minutes_until_change: Optional[int] = Field(None, description="Хвилин до зміни стану")
+    minutes_until_next_outage: Optional[int] = Field(None, description="Хвилин до наступного відключення")
+    slots: str = Field("", description="48 півгодинних слотів доби, '1' - відключення")
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "success": True,
+                "queue": "1.1",
+                "at": "14:35",
+                "status": "off",
+                "power_on": False,
+                "current_outage": {"start": "12:00", "end": "17:00"},
+                "next_outage": {"start": "22:00", "end": "24:00"},
+                "next_change_at": "17:00",
+                "minutes_until_change": 145,
+                "minutes_until_next_outage": 445,
+                "slots": "000000111111111100000000111111111100000000001111",
+                "updated_at": "2025-01-25T10:30:00Z"
+            }
+        }
+
+
+class HistoryEntry(BaseModel):
+    """Відключення черги на конкретну дату з історії графіків"""
+    date: str = Field(..., description="Дата, на яку діє графік (YYYY-MM-DD)")
+    queue: str = Field(..., description="Номер черги")
+    outages: List[OutageTime] = Field(default_factory=list, description="Список відключень")
+    title: str = Field(..., description="Заголовок графіку")
+    published_at: Optional[str] = Field(None, description="Дата публікації статті")
+    recorded_at: datetime = Field(..., description="Коли графік потрапив в історію")
+
+
+class HistoryResponse(BaseModel):
+    """Відповідь API з історією графіків"""
+    success: bool = Field(default=True)
+    queue: Optional[str] = None
+    date_from: Optional[str] = None
+    date_to: Optional[str] = None
+    count: int = 0
+    entries: List[HistoryEntry] = Field(default_factory=list)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "success": True,
+                "queue": "1.1",
+                "date_from": "2025-01-01",
+                "date_to": "2025-01-31",
+                "count": 1,
+                "entries": [
+                    {
+                        "date": "2025-01-25",
+                        "queue": "1.1",
+                        "outages": [{"start": "03:00", "end": "08:00"}],
+                        "title": "25 СІЧНЯ ПО ЗАПОРІЗЬКІЙ ОБЛАСТІ ДІЯТИМУТЬ ГПВ",
+                        "published_at": "2025-01-24T20:15:00+02:00",
+                        "recorded_at": "2025-01-24T20:20:00"
+                    }
+                ]
+            }
+        }
+
+
+class OutageShift(BaseModel):
+    """Відключення, у якого змінився початок чи кінець"""
+    before: OutageTime
+    after: OutageTime
+
+
+class QueueChange(BaseModel):
+    """Зміна графіку черги між двома версіями"""
+    status_before: Optional[str] = Field(None, description="Статус у попередній версії (None - черги не було)")
+    status_after: Optional[str] = Field(None, description="Статус у новій версії (None - черга зникла)")
+    added: List[OutageTime] = Field(default_factory=list, description="Нові відключення")
+    removed: List[OutageTime] = Field(default_factory=list, description="Скасовані відключення")
+    shifted: List[OutageShift] = Field(default_factory=list, description="Зсунуті відключення")
+
+
+class ScheduleChange(BaseModel):
+    """Нова версія графіку та зміни по чергах відносно попередньої"""
+    id: int = Field(..., description="Номер зміни, використовується як since")
+    detected_at: datetime = Field(..., description="Коли зміну виявлено")
+    schedule_date: Optional[str] = Field(None, description="Дата, на яку діє нова версія")
+    previous_schedule_date: Optional[str] = Field(None, description="Дата, на яку діяла попередня версія")
+    title: str = Field(..., description="Заголовок нової версії")
+    previous_title: Optional[str] = Field(None, description="Заголовок попередньої версії")
+    correction: bool = Field(False, description="Уточнення графіку на ту саму дату, а не графік на новий день")
+    queues: Dict[str, QueueChange] = Field(default_factory=dict, description="Змінені черги")
+
+
+class ChangesResponse(BaseModel):
+    """Відповідь API зі змінами графіків"""
+    success: bool = Field(default=True)
+    since: Optional[str] = None
+    queue: Optional[str] = None
+    count: int = 0
+    last_id: Optional[int] = Field(None, description="Номер останньої зміни у відповіді (since для наступного запиту)")
+    changes: List[ScheduleChange] = Field(default_factory=list)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "success": True,
+                "since": "41",
+                "queue": None,
+                "count": 1,
+                "last_id": 42,
+                "changes": [
+                    {
+                        "id": 42,
+                        "detected_at": "2025-01-25T10:30:00",
+                        "schedule_date": "2025-01-25",
+                        "previous_schedule_date": "2025-01-25",
+                        "title": "ОНОВЛЕНО: 25 СІЧНЯ ПО ЗАПОРІЗЬКІЙ ОБЛАСТІ ДІЯТИМУТЬ ГПВ",
+                        "previous_title": "25 СІЧНЯ ПО ЗАПОРІЗЬКІЙ ОБЛАСТІ ДІЯТИМУТЬ ГПВ",
+                        "correction": True,
+                        "queues": {
+                            "1.1": {
+                                "status_before": "active",
+                                "status_after": "active",
+                                "added": [{"start": "20:00", "end": "22:00"}],
+                                "removed": [],
+                                "shifted": [
+                                    {"before": {"start": "03:00", "end": "08:00"},
+                                     "after": {"start": "04:00", "end": "08:00"}}
+                                ]
+                            }
+                        }
+                    }
+                ]
+            }
+        }
+
+
+class SupplyPeriod(BaseModel):
+    """Безперервний проміжок зі світлом"""
+    start: datetime = Field(..., description="Початок")
+    end: datetime = Field(..., description="Кінець")
+    minutes: int = Field(..., description="Тривалість в хвилинах")
+
+
+class QueueAnalytics(BaseModel):
+    """Агрегати по одній черзі за період"""
+    outage_minutes: List[Optional[int]] = Field(
+        default_factory=list,
+        description="Хвилини відключень по днях періоду (None - немає графіку)"
+    )
+    total_outage_minutes: int = 0
+    days_with_data: int = 0
+    longest_supply: Optional[SupplyPeriod] = Field(None, description="Найдовший проміжок зі світлом")
+    slots: Optional[List[str]] = Field(
+        None,
+        description="Стан по слотах кожного дня: '1' - відключення, '0' - світло, '-' - немає графіку"
+    )
+
+
+class AnalyticsResponse(BaseModel):
+    """Відповідь API з агрегатами історії по чергах"""
+    success: bool = Field(default=True)
+    date_from: str
+    date_to: str
+    slot_minutes: int
+    dates: List[str] = Field(default_factory=list)
+    queues: Dict[str, QueueAnalytics] = Field(default_factory=dict)
+    overlap_minutes: Dict[str, Dict[str, int]] = Field(
+        default_factory=dict,
+        description="Хвилини одночасних відключень для кожної пари черг"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "success": True,
+                "date_from": "2025-01-24",
+                "date_to": "2025-01-25",
+                "slot_minutes": 15,
+                "dates": ["2025-01-24", "2025-01-25"],
+                "queues": {
+                    "1.1": {
+                        "outage_minutes": [None, 300],
+                        "total_outage_minutes": 300,
+                        "days_with_data": 1,
+                        "longest_supply": {
+                            "start": "2025-01-25T08:00:00",
+                            "end": "2025-01-26T00:00:00",
+                            "minutes": 960
+                        },
+                        "slots": None
+                    }
+                },
+                "overlap_minutes": {"1.1": {"1.1": 300}}
             }
         }
 
@@ -86,3 +318,50 @@ class HealthResponse(BaseModel):
     status: str
     timestamp: datetime = Field(default_factory=datetime.now)
     version: str = "1.0.0"
+
+
+class CacheBackendStatus(BaseModel):
+    """Стан спільного сховища кешу за останніми операціями"""
+    backend: str
+    ok: bool
+    last_ok_at: Optional[str] = None
+    last_error_at: Optional[str] = None
+    last_error: Optional[str] = None
+
+
+class ReadinessResponse(BaseModel):
+    """Готовність воркера обслуговувати запити: свіжість знімку та стан залежностей"""
+    status: str = Field(..., description="ready, degraded або not_ready")
+    ready: bool
+    reasons: List[str] = Field(default_factory=list, description="Чому статус не ready")
+    role: str = Field(..., description="leader або follower")
+    snapshot_age_seconds: Optional[float] = Field(None, description="Скільки секунд тому побудовано знімок")
+    data_age_seconds: Optional[float] = Field(None, description="Скільки секунд тому дані підтверджено на ZOE")
+    stale: bool = False
+    last_success_at: Optional[datetime] = None
+    last_failure_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    consecutive_failures: int = 0
+    upstream_circuit: str = Field("closed", description="Стан автомату запитів до ZOE: closed, open або half_open")
+    cache: CacheBackendStatus
+    timestamp: datetime = Field(default_factory=datetime.now)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "status": "degraded",
+                "ready": True,
+                "reasons": ["3 consecutive upstream failures", "upstream circuit open"],
+                "role": "leader",
+                "snapshot_age_seconds": 5400.2,
+                "data_age_seconds": 2400.7,
+                "stale": True,
+                "last_success_at": "2025-01-25T10:30:00",
+                "last_failure_at": "2025-01-25T11:10:00",
+                "last_error": "Failed to fetch schedules after 3 attempts: timed out",
+                "consecutive_failures": 3,
+                "upstream_circuit": "open",
+                "cache": {"backend": "file", "ok": True, "last_ok_at": "2025-01-25T10:30:01"},
+                "timestamp": "2025-01-25T11:10:00"
+            }
+        }
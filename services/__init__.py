@@ -1,3 +1,6 @@
-from .scraper import ScraperService
+from .scraper import ScraperService, AsyncScraperService
+from .history import HistoryService
+from .refresher import RefreshService, ScheduleSnapshot
+from .singleflight import SingleFlight
 
-__all__ = ["ScraperService"]
+__all__ = ["ScraperService", "AsyncScraperService", "RefreshService", "HistoryService", "ScheduleSnapshot", "SingleFlight"]
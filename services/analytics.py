@@ -0,0 +1,229 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+from .timeline import MINUTES_PER_DAY, to_minutes
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Slot sizes that split a day evenly
+SLOT_SIZES = (5, 10, 15, 20, 30, 60)
+
+
+def queue_sort_key(queue_id: str) -> Tuple[int, ...]:
+    """'2.10' після '2.9'"""
+    return tuple(int(part) if part.isdigit() else 0 for part in queue_id.split('.'))
+
+
+class ScheduleMatrix:
+    """
+    Графіки багатьох черг за період як булева матриця черга × часовий слот (numpy).
+
+    off[q, i] - відключення черги q в слоті i, де i = день * slots_per_day + слот доби;
+    known[q, d] - чи є графік черги q на день d. Межі проміжків округлюються назовні до слоту,
+    проміжок через північ (22:00 - 02:00) продовжується на наступний день.
+    Агрегати рахуються над усією матрицею без циклів по днях і чергах.
+    """
+
+    def __init__(
+        self,
+        queues: Sequence[str],
+        dates: Sequence[date],
+        slot_minutes: int,
+        off,
+        known
+    ):
+        self.queues = list(queues)
+        self.dates = list(dates)
+        self.slot_minutes = slot_minutes
+        self.slots_per_day = MINUTES_PER_DAY // slot_minutes
+        self.off = off
+        self.known = known
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[Tuple[str, str, List[List[str]]]],
+        date_from: date,
+        date_to: date,
+        slot_minutes: int = 15,
+        queues: Optional[Sequence[str]] = None
+    ) -> "ScheduleMatrix":
+        """
+        Побудувати матрицю з рядків (дата, черга, [[початок, кінець], ...]).
+
+        Args:
+            rows: Рядки історії, наприклад HistoryService.latest_outages()
+            date_from: Перший день періоду
+            date_to: Останній день періоду
+            slot_minutes: Розмір слоту в хвилинах (дільник доби)
+            queues: Черги-рядки матриці; без них - всі черги з rows
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("Schedule analytics requires numpy")
+        if slot_minutes not in SLOT_SIZES:
+            raise ValueError(f"slot_minutes must be one of {SLOT_SIZES}")
+
+        rows = list(rows)
+        if queues is None:
+            queues = sorted({queue_id for _, queue_id, _ in rows}, key=queue_sort_key)
+        queue_index = {queue_id: i for i, queue_id in enumerate(queues)}
+
+        days = (date_to - date_from).days + 1
+        slots_per_day = MINUTES_PER_DAY // slot_minutes
+        width = days * slots_per_day
+
+        known = np.zeros((len(queues), days), dtype=bool)
+        # Schedules reuse a handful of dates and times, parse each string once
+        day_index: Dict[str, int] = {}
+        minutes: Dict[str, int] = {}
+        rows_idx: List[int] = []
+        starts: List[int] = []
+        ends: List[int] = []
+
+        for day, queue_id, intervals in rows:
+            q = queue_index.get(queue_id)
+            if q is None:
+                continue
+            d = day_index.get(day)
+            if d is None:
+                d = day_index[day] = (date.fromisoformat(day) - date_from).days
+            if not 0 <= d < days:
+                continue
+
+            known[q, d] = True
+            base = d * slots_per_day
+            for start, end in intervals:
+                start_minute = minutes.get(start)
+                if start_minute is None:
+                    start_minute = minutes[start] = to_minutes(start)
+                end_minute = minutes.get(end)
+                if end_minute is None:
+                    end_minute = minutes[end] = to_minutes(end)
+                if end_minute == start_minute:
+                    continue
+                if end_minute < start_minute:
+                    end_minute += MINUTES_PER_DAY
+
+                rows_idx.append(q)
+                starts.append(base + start_minute // slot_minutes)
+                ends.append(min(base + -(-end_minute // slot_minutes), width))
+
+        # Paint all intervals at once: +1 at start, -1 at end, running sum > 0 is an outage
+        delta = np.zeros((len(queues), width + 1), dtype=np.int16)
+        if rows_idx:
+            rows_arr = np.asarray(rows_idx)
+            np.add.at(delta, (rows_arr, np.asarray(starts)), 1)
+            np.add.at(delta, (rows_arr, np.asarray(ends)), -1)
+        off = np.cumsum(delta, axis=1)[:, :width] > 0
+
+        dates = [date_from + timedelta(days=i) for i in range(days)]
+        logger.debug(f"Schedule matrix {len(queues)}x{width} built from {len(rows)} history rows")
+        return cls(queues, dates, slot_minutes, off, known)
+
+    @classmethod
+    def from_history(
+        cls,
+        history,
+        date_from: date,
+        date_to: date,
+        slot_minutes: int = 15,
+        queues: Optional[Sequence[str]] = None
+    ) -> "ScheduleMatrix":
+        """Матриця з останніх версій графіків у HistoryService за період"""
+        return cls.from_rows(
+            history.latest_outages(date_from, date_to), date_from, date_to, slot_minutes, queues
+        )
+
+    @property
+    def known_slots(self):
+        """known, розгорнутий до слотів: (черги, дні * слоти)"""
+        return np.repeat(self.known, self.slots_per_day, axis=1)
+
+    def outage_minutes(self):
+        """Хвилини відключень по чергах і днях: (черги, дні); дні без графіку - 0"""
+        per_day = self.off.reshape(len(self.queues), len(self.dates), self.slots_per_day).sum(axis=2)
+        return np.where(self.known, per_day * self.slot_minutes, 0)
+
+    def overlap_minutes(self):
+        """Хвилини одночасних відключень кожної пари черг: (черги, черги), діагональ - власні"""
+        off = (self.off & self.known_slots).astype(np.float64)
+        return np.rint(off @ off.T).astype(np.int64) * self.slot_minutes
+
+    def longest_supply(self) -> List[Optional[Tuple[int, int]]]:
+        """
+        Найдовший безперервний проміжок зі світлом для кожної черги: (перший слот, слот після
+        останнього) або None. Слоти днів без графіку розривають проміжок.
+        """
+        supply = ~self.off & self.known_slots
+        padded = np.zeros((len(self.queues), supply.shape[1] + 2), dtype=np.int8)
+        padded[:, 1:-1] = supply
+        edges = np.diff(padded, axis=1)
+
+        # Run starts and ends come in the same row-major order, one end per start
+        rows, starts = np.nonzero(edges == 1)
+        _, ends = np.nonzero(edges == -1)
+        result: List[Optional[Tuple[int, int]]] = [None] * len(self.queues)
+        if not len(rows):
+            return result
+
+        order = np.lexsort((starts, -(ends - starts), rows))
+        best_rows, first = np.unique(rows[order], return_index=True)
+        for q, i in zip(best_rows, order[first]):
+            result[q] = (int(starts[i]), int(ends[i]))
+        return result
+
+    def slot_strings(self) -> List[List[str]]:
+        """Стан по слотах кожного дня: '1' - відключення, '0' - світло, '-' - немає графіку"""
+        chars = np.where(self.off, ord('1'), ord('0')).astype(np.uint8)
+        chars[~self.known_slots] = ord('-')
+        days = chars.reshape(len(self.queues) * len(self.dates), self.slots_per_day)
+        flat = days.view(f'S{self.slots_per_day}').ravel()
+        return [
+            [value.decode('ascii') for value in flat[q * len(self.dates):(q + 1) * len(self.dates)]]
+            for q in range(len(self.queues))
+        ]
+
+    def slot_time(self, index: int) -> datetime:
+        """Початок слоту за його індексом у матриці"""
+        start = datetime.combine(self.dates[0], datetime.min.time())
+        return start + timedelta(minutes=index * self.slot_minutes)
+
+    def summary(self, include_slots: bool = False) -> Dict:
+        """Всі агрегати у вигляді словника для API"""
+        minutes = self.outage_minutes()
+        overlap = self.overlap_minutes()
+        longest = self.longest_supply()
+        slots = self.slot_strings() if include_slots else None
+
+        queues = {}
+        for q, queue_id in enumerate(self.queues):
+            known = self.known[q]
+            supply = longest[q]
+            queues[queue_id] = {
+                'outage_minutes': [int(m) if k else None for m, k in zip(minutes[q], known)],
+                'total_outage_minutes': int(minutes[q].sum()),
+                'days_with_data': int(known.sum()),
+                'longest_supply': {
+                    'start': self.slot_time(supply[0]),
+                    'end': self.slot_time(supply[1]),
+                    'minutes': (supply[1] - supply[0]) * self.slot_minutes
+                } if supply else None,
+                'slots': slots[q] if slots else None
+            }
+
+        return {
+            'dates': [day.isoformat() for day in self.dates],
+            'queues': queues,
+            'overlap_minutes': {
+                queue_id: {other: int(overlap[q, o]) for o, other in enumerate(self.queues)}
+                for q, queue_id in enumerate(self.queues)
+            }
+        }
@@ -0,0 +1,136 @@
+import asyncio
+import threading
+from typing import Dict, Iterable, Optional, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """
+    Підписка одного клієнта на набір черг.
+    Зберігається лише остання версія кожної черги, тож повільний клієнт не накопичує чергу подій.
+    """
+
+    __slots__ = ('queues', 'pending', 'event', 'closed')
+
+    def __init__(self, queues: Iterable[str]):
+        self.queues: Set[str] = set(queues)
+        self.pending: Dict[str, bytes] = {}
+        self.event = asyncio.Event()
+        self.closed = False
+
+    def push(self, queue_id: str, payload: bytes) -> None:
+        self.pending[queue_id] = payload
+        self.event.set()
+
+    async def next(self, timeout: Optional[float] = None) -> Dict[str, bytes]:
+        """Дочекатися змін (або timeout) та забрати їх; порожній словник - змін не було"""
+        if not self.pending:
+            try:
+                await asyncio.wait_for(self.event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+        pending, self.pending = self.pending, {}
+        self.event.clear()
+        return pending
+
+
+class ScheduleBroadcaster:
+    """
+    Розсилка змін графіків підписаним клієнтам (SSE, WebSocket).
+    Підписки індексовані за чергою, тож публікація торкається лише клієнтів змінених черг,
+    а тіло події рендериться один раз на чергу і спільне для всіх підписників.
+    """
+
+    def __init__(self, max_subscribers: int = 50000):
+        """
+        Args:
+            max_subscribers: Максимальна кількість одночасних підписок у процесі
+        """
+        self.max_subscribers = max_subscribers
+        self._by_queue: Dict[str, Set[Subscription]] = {}
+        self._count = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+
+        self.published = 0
+        self.delivered = 0
+
+    def subscribe(self, queues: Iterable[str]) -> Subscription:
+        """Нова підписка; OverflowError, якщо досягнуто ліміт"""
+        if self._count >= self.max_subscribers:
+            raise OverflowError(f"Subscriber limit reached ({self.max_subscribers})")
+
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._loop_thread = threading.get_ident()
+
+        subscription = Subscription(queues)
+        for queue_id in subscription.queues:
+            self._by_queue.setdefault(queue_id, set()).add(subscription)
+        self._count += 1
+        return subscription
+
+    def update(self, subscription: Subscription, queues: Iterable[str]) -> None:
+        """Змінити набір черг існуючої підписки"""
+        self._unindex(subscription)
+        subscription.queues = set(queues)
+        for queue_id in subscription.queues:
+            self._by_queue.setdefault(queue_id, set()).add(subscription)
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        if subscription.closed:
+            return
+        subscription.closed = True
+        self._unindex(subscription)
+        self._count -= 1
+
+    def _unindex(self, subscription: Subscription) -> None:
+        for queue_id in subscription.queues:
+            subscribers = self._by_queue.get(queue_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._by_queue[queue_id]
+
+    @property
+    def subscriber_count(self) -> int:
+        return self._count
+
+    def has_subscribers(self, queue_id: str) -> bool:
+        return queue_id in self._by_queue
+
+    def publish(self, events: Dict[str, bytes]) -> None:
+        """
+        Розіслати {черга: тіло події} підписникам цих черг.
+        Можна викликати з будь-якого потоку - доставка виконується в event loop.
+        """
+        if not events or self._loop is None:
+            return
+
+        if threading.get_ident() == self._loop_thread:
+            self._publish(events)
+        else:
+            self._loop.call_soon_threadsafe(self._publish, events)
+
+    def _publish(self, events: Dict[str, bytes]) -> None:
+        delivered = 0
+        for queue_id, payload in events.items():
+            for subscription in self._by_queue.get(queue_id, ()):
+                subscription.push(queue_id, payload)
+                delivered += 1
+
+        self.published += len(events)
+        self.delivered += delivered
+        logger.info(f"Pushed {len(events)} queue update(s) to {delivered} subscription(s)")
+
+    def get_stats(self) -> Dict:
+        return {
+            'subscribers': self.subscriber_count,
+            'max_subscribers': self.max_subscribers,
+            'queues': {queue_id: len(subs) for queue_id, subs in sorted(self._by_queue.items())},
+            'published': self.published,
+            'delivered': self.delivered
+        }
@@ -1,118 +1,504 @@
+import asyncio
 import json
-import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional, Any
+from typing import Optional, Any, Dict, Hashable, Tuple
 import logging
 
+from .cache_backends import CacheBackend, FileCacheBackend
+from .metrics import REGISTRY
+
 logger = logging.getLogger(__name__)
 
+CACHE_REQUESTS = REGISTRY.counter(
+    'zoe_cache_requests', 'Cache lookups by key, layer (memory or backend name) and result', ['key', 'layer', 'result']
+)
+CACHE_WRITES = REGISTRY.counter('zoe_cache_writes', 'Values written to the cache', ['key'])
+CACHE_SWEPT = REGISTRY.counter('zoe_cache_swept', 'Expired entries removed from the backend by the sweeper')
+
+# Backend key of the persisted metadata index
+MANIFEST_KEY = "_manifest"
+
+
+@dataclass
+class EntryMeta:
+    """Метадані запису сховища: розмір, час запису, до коли зберігається, кількість звернень"""
+
+    size: Optional[int]
+    stored_at: datetime
+    expires_at: datetime
+    hits: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'size': self.size,
+            'stored_at': self.stored_at.isoformat(),
+            'expires_at': self.expires_at.isoformat(),
+            'hits': self.hits
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EntryMeta":
+        return cls(
+            size=data.get('size'),
+            stored_at=datetime.fromisoformat(data['stored_at']),
+            expires_at=datetime.fromisoformat(data['expires_at']),
+            hits=int(data.get('hits', 0))
+        )
+
 
 class CacheService:
-    """Простий файловий кеш для графіків"""
+    """
+    Дворівневий кеш для графіків: LRU в пам'яті процесу поверх спільного сховища.
+    Сховище (файли, shared memory або Redis) використовується для швидкого старту після
+    перезапуску та для обміну даними між воркерами; записи в нього йдуть у фоні.
+
+    get_shared() бере значення з LRU, лише поки версія запису в сховищі (mtime файлу, лічильник слоту shm)
+    та сама, що й під час читання, тож воркер бачить запис іншого процесу без розбору незміненого тіла.
+
+    Запис свіжий протягом ttl, після цього ще max_stale зберігається як застарілий:
+    get() його не повертає, але get_shared() віддає разом з часом запису, щоб його можна було
+    показати, поки дані оновлюються або сайт недоступний. Видаляється запис лише після ttl + max_stale -
+    фоновим прибиранням (sweep), а не під час читання.
 
-    def __init__(self, cache_dir: str = "cache", ttl_minutes: int = 30):
+    Метадані записів (розмір, час запису, термін, кількість звернень) тримаються в пам'яті
+    та зберігаються в сховищі як маніфест, тож get_cache_info() не читає записи сховища.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = "cache",
+        ttl_minutes: int = 30,
+        max_entries: int = 256,
+        backend: Optional[CacheBackend] = None,
+        max_stale_minutes: int = 0,
+        sweep_interval_seconds: float = 300
+    ):
         """
         Args:
-            cache_dir: Директорія для кешу
+            cache_dir: Директорія для кешу (для файлового backend)
             ttl_minutes: Час життя кешу в хвилинах
+            max_entries: Максимальна кількість записів у пам'яті
+            backend: Спільне сховище; за замовчуванням JSON файли в cache_dir
+            max_stale_minutes: Скільки хвилин після ttl зберігати запис як застарілий
+            sweep_interval_seconds: Як часто фонова задача видаляє прострочені записи
         """
         self.cache_dir = cache_dir
         self.ttl = timedelta(minutes=ttl_minutes)
+        self.max_stale = timedelta(minutes=max_stale_minutes)
+        self.max_entries = max_entries
+        self.backend = backend or FileCacheBackend(cache_dir)
+        self.sweep_interval = sweep_interval_seconds
+
+        # Outcome of the latest backend operations, for readiness checks without extra I/O
+        self.backend_ok_at: Optional[datetime] = None
+        self.backend_error_at: Optional[datetime] = None
+        self.backend_error: Optional[str] = None
+
+        # key -> (value, cached_at, fresh until, kept until, backend version) - deadlines on the monotonic clock;
+        # the version is None for values not read from the backend.
+        # Used from the event loop and worker threads (sync_from_cache, clear), always under the lock
+        self._memory: "OrderedDict[str, Tuple[Any, datetime, float, float, Optional[Hashable]]]" = OrderedDict()
+        self._memory_lock = threading.Lock()
+
+        # Single writer thread keeps backend operations ordered (set, then clear, ...)
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-writer")
+
+        # key -> metadata of the backend entry; updated from the event loop and the writer thread,
+        # readers iterate a list() copy
+        self._index: Dict[str, EntryMeta] = {}
+        self._index_dirty = False
+        self.last_sweep_at: Optional[datetime] = None
+        self.last_sweep_removed = 0
+        self._sweeper: Optional[asyncio.Task] = None
+        self._load_manifest()
 
-        # Create cache directory if it doesn't exist
-        os.makedirs(cache_dir, exist_ok=True)
+    def _remaining(self, cached_at: datetime) -> float:
+        """Скільки секунд запис ще свіжий (від'ємне - вже застарів)"""
+        return self.ttl.total_seconds() - (datetime.now() - cached_at).total_seconds()
 
-    def _get_cache_path(self, key: str) -> str:
-        """Отримати шлях до файлу кешу"""
-        safe_key = key.replace('/', '_').replace('\\', '_')
-        return os.path.join(self.cache_dir, f"{safe_key}.json")
+    def _track(self, key: str, cached_at: datetime, size: Optional[int] = None) -> EntryMeta:
+        """Записати в індекс метадані запису, збережені в cached_at"""
+        meta = self._index.get(key)
+        if meta is None or meta.stored_at != cached_at:
+            meta = self._index[key] = EntryMeta(
+                size=size, stored_at=cached_at, expires_at=cached_at + self.ttl + self.max_stale
+            )
+            self._index_dirty = True
+        elif size is not None:
+            meta.size = size
+        return meta
+
+    def _hit(self, key: str) -> None:
+        meta = self._index.get(key)
+        if meta is not None:
+            meta.hits += 1
+            self._index_dirty = True
+
+    def _remember(self, key: str, value: Any, cached_at: datetime, version: Optional[Hashable] = None) -> None:
+        """Покласти значення в LRU з TTL, відрахованим від моменту кешування, та версією запису сховища"""
+        fresh_until = time.monotonic() + self._remaining(cached_at)
+        entry = (value, cached_at, fresh_until, fresh_until + self.max_stale.total_seconds(), version)
+
+        evicted = []
+        with self._memory_lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                evicted.append(self._memory.popitem(last=False)[0])
+
+        for evicted_key in evicted:
+            logger.debug(f"Evicted key from memory cache: {evicted_key}")
 
     def get(self, key: str) -> Optional[Any]:
-        """Отримати значення з кешу"""
-        cache_path = self._get_cache_path(key)
+        """Отримати свіже значення з кешу"""
+        now = time.monotonic()
+        with self._memory_lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now < entry[2]:
+                    self._memory.move_to_end(key)
+                elif now >= entry[3]:
+                    # The backend entry is left to the sweeper
+                    del self._memory[key]
+
+        if entry is not None:
+            value, _, fresh_until, kept_until, _ = entry
+            if now < fresh_until:
+                CACHE_REQUESTS.inc(key, 'memory', 'hit')
+                self._hit(key)
+                return value
 
-        if not os.path.exists(cache_path):
+            if now >= kept_until:
+                logger.debug(f"Cache expired for key: {key}")
+                CACHE_REQUESTS.inc(key, 'memory', 'expired')
+                return None
+
+            # Stale in memory - another worker may have stored a fresh value meanwhile
+            CACHE_REQUESTS.inc(key, 'memory', 'stale')
+
+        entry = self._load(key)
+        if entry is None or self._remaining(entry[1]) <= 0:
+            return None
+        return entry[0]
+
+    def get_shared(self, key: str) -> Optional[Tuple[Any, datetime]]:
+        """
+        Значення та час його запису в спільному сховищі - так воркер бачить дані, які записав
+        інший процес. З LRU, якщо версія запису в сховищі не змінилась з моменту читання, інакше
+        запис читається наново. Повертає і застарілі записи (в межах max_stale) - свіжість визначає
+        той, хто читає, за часом запису.
+        """
+        with self._memory_lock:
+            entry = self._memory.get(key)
+        if entry is not None and entry[4] is not None:
+            value, cached_at, _, kept_until, version = entry
+            # The version check may stat the backend, so it runs outside the lock
+            if time.monotonic() < kept_until and self._version(key) == version:
+                with self._memory_lock:
+                    if self._memory.get(key) is entry:
+                        self._memory.move_to_end(key)
+                CACHE_REQUESTS.inc(key, 'memory', 'hit' if self._remaining(cached_at) > 0 else 'stale')
+                self._hit(key)
+                return value, cached_at
+
+        return self._load(key)
+
+    def _version(self, key: str) -> Optional[Hashable]:
+        try:
+            return self.backend.version(key)
+        except Exception as e:
+            # The read that follows reports the failure
+            logger.debug(f"Cache backend version check failed for key {key}: {e}")
+            return None
+
+    def _read_entry(self, key: str) -> Optional[dict]:
+        """Розібрати запис сховища; пошкоджений запис видаляється"""
+        body = self.backend.read(key)
+        if body is None:
             logger.debug(f"Cache miss for key: {key}")
             return None
 
         try:
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                cached_data = json.load(f)
+            cached_data = json.loads(body)
+            return {
+                'cached_at': datetime.fromisoformat(cached_data['cached_at']),
+                'data': cached_data['data'],
+                'size': len(body)
+            }
 
-            # Check if cache is still valid
-            cached_at = datetime.fromisoformat(cached_data['cached_at'])
-            if datetime.now() - cached_at > self.ttl:
-                logger.debug(f"Cache expired for key: {key}")
-                os.remove(cache_path)
-                return None
+        except (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Invalid cache entry for key {key}: {e}")
+            # Remove corrupted cache entry
+            self.backend.delete(key)
+            return None
+
+    def _backend_failed(self, error: Exception) -> None:
+        self.backend_error_at = datetime.now()
+        self.backend_error = str(error)
+
+    def backend_status(self) -> Dict[str, Any]:
+        """Стан сховища за результатами останніх операцій (без звернення до нього)"""
+        failing = self.backend_error_at is not None and (
+            self.backend_ok_at is None or self.backend_error_at > self.backend_ok_at
+        )
+        return {
+            'backend': self.backend.name,
+            'ok': not failing,
+            'last_ok_at': self.backend_ok_at.isoformat(timespec='seconds') if self.backend_ok_at else None,
+            'last_error_at': self.backend_error_at.isoformat(timespec='seconds') if self.backend_error_at else None,
+            'last_error': self.backend_error
+        }
 
-            logger.debug(f"Cache hit for key: {key}")
-            return cached_data['data']
+    def _load(self, key: str) -> Optional[Tuple[Any, datetime]]:
+        """Прочитати значення зі сховища та підняти його в пам'ять"""
+        # Before the read: a write landing in between only costs one more read later
+        version = self._version(key)
+        try:
+            cached_data = self._read_entry(key)
+        except Exception as e:
+            logger.warning(f"Cache backend read failed for key {key}: {e}")
+            CACHE_REQUESTS.inc(key, self.backend.name, 'error')
+            self._backend_failed(e)
+            return None
+        self.backend_ok_at = datetime.now()
 
-        except (json.JSONDecodeError, KeyError, ValueError) as e:
-            logger.warning(f"Invalid cache file for key {key}: {e}")
-            # Remove corrupted cache file
-            if os.path.exists(cache_path):
-                os.remove(cache_path)
+        if cached_data is None:
+            CACHE_REQUESTS.inc(key, self.backend.name, 'miss')
             return None
 
-    def set(self, key: str, value: Any) -> None:
-        """Зберегти значення в кеш"""
-        cache_path = self._get_cache_path(key)
+        # Stale entries are kept (and returned) until ttl + max_stale, then removed by the sweeper
+        cached_at = cached_data['cached_at']
+        self._track(key, cached_at, cached_data['size'])
+        age = datetime.now() - cached_at
+        if age > self.ttl + self.max_stale:
+            logger.debug(f"Cache expired for key: {key}")
+            CACHE_REQUESTS.inc(key, self.backend.name, 'expired')
+            return None
+
+        logger.debug(f"Cache hit for key: {key} ({self.backend.name})")
+        CACHE_REQUESTS.inc(key, self.backend.name, 'hit' if age <= self.ttl else 'stale')
+        self._hit(key)
+        self._remember(key, cached_data['data'], cached_at, version)
+        return cached_data['data'], cached_at
+
+    def set(self, key: str, value: Any, cached_at: Optional[datetime] = None) -> datetime:
+        """Зберегти значення в кеш; повертає час запису (cached_at, за замовчуванням - зараз)"""
+        cached_at = cached_at or datetime.now()
+        self._remember(key, value, cached_at)
+        self._track(key, cached_at)
+        CACHE_WRITES.inc(key)
+        self._writer.submit(self._write, key, value, cached_at)
+        logger.debug(f"Cached data for key: {key}")
+        return cached_at
 
+    def _write(self, key: str, value: Any, cached_at: datetime) -> None:
         try:
+            if hasattr(value, 'model_dump'):
+                value = value.model_dump(mode='json')
+
             cache_data = {
-                'cached_at': datetime.now().isoformat(),
+                'cached_at': cached_at.isoformat(),
                 'data': value
             }
+            body = json.dumps(cache_data, ensure_ascii=False, indent=2).encode('utf-8')
 
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
+            # The backend keeps the entry through its stale period too
+            self.backend.write(key, body, self._remaining(cached_at) + self.max_stale.total_seconds())
+            self.backend_ok_at = datetime.now()
 
-            logger.debug(f"Cached data for key: {key}")
+            meta = self._index.get(key)
+            if meta is not None and meta.stored_at == cached_at:
+                meta.size = len(body)
 
         except Exception as e:
             logger.error(f"Failed to cache data for key {key}: {e}")
+            self._backend_failed(e)
+
+    def flush(self) -> None:
+        """Дочекатися завершення всіх відкладених записів у сховище"""
+        self._writer.submit(lambda: None).result()
 
     def clear(self, key: Optional[str] = None) -> None:
         """Очистити кеш (конкретний ключ або весь кеш)"""
         if key:
-            cache_path = self._get_cache_path(key)
-            if os.path.exists(cache_path):
-                os.remove(cache_path)
-                logger.info(f"Cleared cache for key: {key}")
+            with self._memory_lock:
+                self._memory.pop(key, None)
+            self._index.pop(key, None)
+            self._index_dirty = True
+            self._writer.submit(self.backend.delete, key).result()
+            logger.info(f"Cleared cache for key: {key}")
         else:
-            # Clear all cache files
-            for filename in os.listdir(self.cache_dir):
-                if filename.endswith('.json'):
-                    os.remove(os.path.join(self.cache_dir, filename))
+            # Clear all stored entries (the manifest too), then store an empty one
+            with self._memory_lock:
+                self._memory.clear()
+            self._index.clear()
+            self._index_dirty = True
+            self._writer.submit(self._clear_backend).result()
             logger.info("Cleared all cache")
 
-    def get_cache_info(self) -> dict:
-        """Отримати інформацію про кеш"""
-        cache_files = [f for f in os.listdir(self.cache_dir) if f.endswith('.json')]
+    def _clear_backend(self) -> None:
+        self.backend.clear()
+        self._save_manifest()
+
+    def _load_manifest(self) -> None:
+        """
+        Відновити індекс з маніфесту. Ключі сховища лише перелічуються: записи, яких
+        немає в маніфесті (записані іншим воркером або до появи маніфесту), читаються,
+        а зниклі зі сховища прибираються з індексу.
+        """
+        try:
+            keys = set(self.backend.keys()) - {MANIFEST_KEY}
+            body = self.backend.read(MANIFEST_KEY)
+        except Exception as e:
+            logger.warning(f"Cache manifest load failed: {e}")
+            self._backend_failed(e)
+            return
+
+        if body is not None:
+            try:
+                entries = json.loads(body)['entries']
+                self._index = {
+                    key: EntryMeta.from_dict(meta) for key, meta in entries.items() if key in keys
+                }
+            except (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Invalid cache manifest, rebuilding: {e}")
+                self._index = {}
+                # Rewrite it even if every entry is re-read
+                body = None
+
+        for key in keys - set(self._index):
+            try:
+                cached_data = self._read_entry(key)
+            except Exception as e:
+                logger.warning(f"Error reading cache entry {key}: {e}")
+                continue
+            if cached_data is not None:
+                self._track(key, cached_data['cached_at'], cached_data['size'])
+
+        self._index_dirty = body is None or len(self._index) != len(keys)
+        logger.info(f"Cache index loaded: {len(self._index)} entries ({self.backend.name})")
+
+    def _save_manifest(self) -> None:
+        """Зберегти індекс у сховище (в потоці запису)"""
+        self._index_dirty = False
+        entries = {key: meta.to_dict() for key, meta in list(self._index.items())}
+        body = json.dumps({'entries': entries}, ensure_ascii=False).encode('utf-8')
+        try:
+            # Outlives every entry it describes
+            ttl = max((self.ttl + self.max_stale).total_seconds(), 60)
+            self.backend.write(MANIFEST_KEY, body, ttl)
+        except Exception as e:
+            self._index_dirty = True
+            logger.error(f"Failed to save cache manifest: {e}")
+            self._backend_failed(e)
+
+    def sweep(self) -> int:
+        """
+        Видалити зі сховища записи, старші за ttl + max_stale, та зберегти маніфест, якщо індекс змінився.
+        Перед видаленням запис перечитується: інший воркер міг тим часом записати свіже значення.
+        Повертає кількість видалених записів.
+        """
+        now = datetime.now()
+        removed = 0
+        for key, meta in list(self._index.items()):
+            if meta.expires_at > now:
+                continue
+
+            try:
+                cached_data = self._read_entry(key)
+                if cached_data is not None and cached_data['cached_at'] + self.ttl + self.max_stale > now:
+                    self._track(key, cached_data['cached_at'], cached_data['size'])
+                    continue
+                self.backend.delete(key)
+            except Exception as e:
+                logger.error(f"Failed to sweep cache entry {key}: {e}")
+                self._backend_failed(e)
+                continue
+
+            if self._index.get(key) is meta:
+                del self._index[key]
+            self._index_dirty = True
+            removed += 1
+            CACHE_SWEPT.inc()
+
+        if removed:
+            logger.info(f"Swept {removed} expired cache entries")
+        if self._index_dirty:
+            self._save_manifest()
+
+        self.last_sweep_at = now
+        self.last_sweep_removed = removed
+        return removed
 
+    async def _sweep_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                # On the writer thread, so a sweep never races a pending write of the same key
+                await loop.run_in_executor(self._writer, self.sweep)
+            except Exception as e:
+                logger.error(f"Cache sweep failed: {e}")
+
+    def start_sweeper(self) -> None:
+        """Запустити фонове прибирання прострочених записів (викликається зі startup hook)"""
+        if self._sweeper and not self._sweeper.done():
+            return
+        self._sweeper = asyncio.create_task(self._sweep_loop())
+        logger.info(f"Cache sweeper started (every {self.sweep_interval:.0f}s)")
+
+    async def stop_sweeper(self) -> None:
+        """Зупинити фонове прибирання"""
+        if self._sweeper is None:
+            return
+        self._sweeper.cancel()
+        try:
+            await self._sweeper
+        except asyncio.CancelledError:
+            pass
+        self._sweeper = None
+
+    def close(self) -> None:
+        """Дописати відкладені записи, зберегти маніфест та закрити сховище"""
+        if self._index_dirty:
+            self._writer.submit(self._save_manifest)
+        self.flush()
+        self.backend.close()
+
+    def get_cache_info(self) -> dict:
+        """Отримати інформацію про кеш (з індексу в пам'яті, без читання сховища)"""
+        now = datetime.now()
+        entries = sorted(list(self._index.items()))
         info = {
-            'total_files': len(cache_files),
+            'backend': self.backend.name,
+            'total_files': len(entries),
+            'total_bytes': sum(meta.size or 0 for _, meta in entries),
+            'memory_entries': len(self._memory),
+            'max_memory_entries': self.max_entries,
+            'ttl_minutes': int(self.ttl.total_seconds() // 60),
+            'max_stale_minutes': int(self.max_stale.total_seconds() // 60),
+            'last_sweep_at': self.last_sweep_at.isoformat(timespec='seconds') if self.last_sweep_at else None,
+            'last_sweep_removed': self.last_sweep_removed,
             'files': []
         }
 
-        for filename in cache_files:
-            cache_path = os.path.join(self.cache_dir, filename)
-            try:
-                with open(cache_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    cached_at = datetime.fromisoformat(data['cached_at'])
-                    age = datetime.now() - cached_at
-                    is_valid = age <= self.ttl
-
-                    info['files'].append({
-                        'key': filename.replace('.json', ''),
-                        'cached_at': data['cached_at'],
-                        'age_minutes': int(age.total_seconds() / 60),
-                        'is_valid': is_valid
-                    })
-            except Exception as e:
-                logger.warning(f"Error reading cache file {filename}: {e}")
+        for key, meta in entries:
+            age = now - meta.stored_at
+            is_valid = age <= self.ttl
+            info['files'].append({
+                'key': key,
+                'cached_at': meta.stored_at.isoformat(),
+                'expires_at': meta.expires_at.isoformat(),
+                'age_minutes': int(age.total_seconds() / 60),
+                'size_bytes': meta.size,
+                'hits': meta.hits,
+                'is_valid': is_valid,
+                'is_stale': not is_valid and now < meta.expires_at
+            })
 
         return info
@@ -0,0 +1,293 @@
+import mmap
+import os
+import struct
+import tempfile
+import time
+from typing import Dict, Hashable, List, Optional
+import logging
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows
+    fcntl = None
+    FCNTL_AVAILABLE = False
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def safe_key(key: str) -> str:
+    return key.replace('/', '_').replace('\\', '_')
+
+
+class CacheBackend:
+    """
+    Спільне сховище під LRU кешем: зберігає готові JSON байти за ключем.
+    Всі методи викликаються з потоку запису CacheService або з потоку запиту при промаху LRU.
+    """
+
+    name = "base"
+    available = True
+
+    def read(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def version(self, key: str) -> Optional[Hashable]:
+        """
+        Маркер версії запису без читання тіла: змінюється з кожним записом. None - запису немає
+        або сховище не вміє дешево це перевірити, тоді запис треба прочитати.
+        """
+        return None
+
+    def write(self, key: str, body: bytes, ttl_seconds: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def keys(self) -> List[str]:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        for key in self.keys():
+            self.delete(key)
+
+    def close(self) -> None:
+        pass
+
+
+class FileCacheBackend(CacheBackend):
+    """JSON файли в директорії; запис у тимчасовий файл та атомарний os.replace"""
+
+    name = "file"
+
+    def __init__(self, cache_dir: str = "cache"):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{safe_key(key)}.json")
+
+    def read(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def version(self, key: str) -> Optional[Hashable]:
+        # os.replace gives every write a new inode, so this changes even within one mtime tick
+        try:
+            stat = os.stat(self._path(key))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def write(self, key: str, body: bytes, ttl_seconds: float) -> None:
+        # Readers in other workers see either the old file or the new one, never a partial write
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{safe_key(key)}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(body)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def keys(self) -> List[str]:
+        return [
+            filename[:-len('.json')]
+            for filename in os.listdir(self.cache_dir)
+            if filename.endswith('.json') and not filename.startswith('.')
+        ]
+
+
+class SharedMemoryCacheBackend(CacheBackend):
+    """
+    Слоти фіксованого розміру в mmap файлах (/dev/shm) для воркерів на одному хості.
+    Запис під flock, читання без блокувань через seqlock: лічильник непарний під час запису,
+    читач повторює спробу, якщо лічильник змінився.
+    """
+
+    name = "shm"
+    available = FCNTL_AVAILABLE
+
+    # seq (uint64), body length (uint32); length 0 marks a deleted entry
+    HEADER = struct.Struct('<QI')
+    READ_ATTEMPTS = 100
+
+    def __init__(self, directory: Optional[str] = None, slot_size: int = 1024 * 1024):
+        """
+        Args:
+            directory: Директорія для mmap файлів (за замовчуванням /dev/shm/zoe-outage-api)
+            slot_size: Максимальний розмір одного значення в байтах
+        """
+        if directory is None:
+            base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+            directory = os.path.join(base, 'zoe-outage-api')
+
+        self.directory = directory
+        self.slot_size = slot_size
+        self._slots: Dict[str, mmap.mmap] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{safe_key(key)}.slot")
+
+    def _slot(self, key: str, create: bool) -> Optional[mmap.mmap]:
+        slot = self._slots.get(key)
+        if slot is not None:
+            return slot
+
+        path = self._path(key)
+        if not create and not os.path.exists(path):
+            return None
+
+        size = self.HEADER.size + self.slot_size
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            slot = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+        self._slots[key] = slot
+        return slot
+
+    def _locked_write(self, key: str, body: bytes) -> None:
+        slot = self._slot(key, create=True)
+        with open(self._path(key), 'rb') as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                seq, _ = self.HEADER.unpack_from(slot, 0)
+                self.HEADER.pack_into(slot, 0, seq + 1, 0)
+                slot[self.HEADER.size:self.HEADER.size + len(body)] = body
+                self.HEADER.pack_into(slot, 0, seq + 2, len(body))
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def read(self, key: str) -> Optional[bytes]:
+        slot = self._slot(key, create=False)
+        if slot is None:
+            return None
+
+        for _ in range(self.READ_ATTEMPTS):
+            seq, length = self.HEADER.unpack_from(slot, 0)
+            if seq % 2:
+                time.sleep(0)
+                continue
+
+            body = slot[self.HEADER.size:self.HEADER.size + length]
+            if self.HEADER.unpack_from(slot, 0)[0] == seq:
+                return body or None
+
+        logger.warning(f"Shared memory slot {key} kept changing, treating as a miss")
+        return None
+
+    def version(self, key: str) -> Optional[Hashable]:
+        # The seqlock counter: odd while a write is in progress, bumped by every write and delete
+        slot = self._slot(key, create=False)
+        if slot is None:
+            return None
+        seq, length = self.HEADER.unpack_from(slot, 0)
+        return seq if length and not seq % 2 else None
+
+    def write(self, key: str, body: bytes, ttl_seconds: float) -> None:
+        if len(body) > self.slot_size:
+            raise ValueError(f"Value for {key} is {len(body)} bytes, slot size is {self.slot_size}")
+        self._locked_write(key, body)
+
+    def delete(self, key: str) -> None:
+        if os.path.exists(self._path(key)):
+            self._locked_write(key, b'')
+
+    def keys(self) -> List[str]:
+        keys = []
+        for filename in os.listdir(self.directory):
+            if filename.endswith('.slot'):
+                key = filename[:-len('.slot')]
+                if self.read(key) is not None:
+                    keys.append(key)
+        return keys
+
+    def close(self) -> None:
+        for slot in self._slots.values():
+            slot.close()
+        self._slots.clear()
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis (або сумісний сервер) для воркерів на різних хостах; TTL виставляється на ключ"""
+
+    name = "redis"
+    available = REDIS_AVAILABLE
+
+    def __init__(self, url: Optional[str] = None, client=None, prefix: str = "zoe:cache:"):
+        """
+        Args:
+            url: Адреса Redis (redis://host:6379/0)
+            client: Готовий клієнт з інтерфейсом redis-py (наприклад, fakeredis для перевірок)
+            prefix: Префікс ключів
+        """
+        if client is None:
+            if not REDIS_AVAILABLE:
+                raise ValueError("Redis cache backend requires the 'redis' package")
+            client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+
+        self.client = client
+        self.prefix = prefix
+
+    def read(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def write(self, key: str, body: bytes, ttl_seconds: float) -> None:
+        self.client.set(self.prefix + key, body, px=max(int(ttl_seconds * 1000), 1))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def keys(self) -> List[str]:
+        return [
+            (key.decode() if isinstance(key, bytes) else key)[len(self.prefix):]
+            for key in self.client.scan_iter(match=self.prefix + '*')
+        ]
+
+    def close(self) -> None:
+        close = getattr(self.client, 'close', None)
+        if close:
+            close()
+
+
+CACHE_BACKENDS = {
+    backend.name: backend
+    for backend in (FileCacheBackend, SharedMemoryCacheBackend, RedisCacheBackend)
+}
+
+
+def get_cache_backend(name: str = "file", **options) -> CacheBackend:
+    """Створити backend спільного кешу за назвою (file, shm, redis)"""
+    backend = CACHE_BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"Unknown cache backend '{name}', expected one of {', '.join(CACHE_BACKENDS)}")
+    if not backend.available and not options.get('client'):
+        raise ValueError(f"Cache backend '{name}' is not available on this system")
+    return backend(**options)
@@ -0,0 +1,67 @@
+from collections import Counter
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .timeline import MINUTES_PER_DAY, to_minutes
+
+
+def _span(interval: Tuple[str, str]) -> Tuple[int, int]:
+    """Проміжок в хвилинах; кінець через північ - більший за 1440"""
+    start, end = to_minutes(interval[0]), to_minutes(interval[1])
+    return start, end + MINUTES_PER_DAY if end < start else end
+
+
+def _overlap(a: Tuple[str, str], b: Tuple[str, str]) -> int:
+    (a_start, a_end), (b_start, b_end) = _span(a), _span(b)
+    return min(a_end, b_end) - max(a_start, b_start)
+
+
+def _outage(interval: Tuple[str, str]) -> Dict[str, str]:
+    return {'start': interval[0], 'end': interval[1]}
+
+
+def diff_outages(before: Sequence[Dict], after: Sequence[Dict]) -> Dict[str, List]:
+    """
+    Різниця двох списків відключень черги.
+    Проміжок нової версії, що перетинається з прибраним проміжком старої, вважається зсувом
+    (змінився початок чи кінець), решта - додані та прибрані проміжки.
+    """
+    old = Counter((o['start'], o['end']) for o in before)
+    new = Counter((o['start'], o['end']) for o in after)
+    common = old & new
+    removed = sorted((old - common).elements(), key=_span)
+    added = sorted((new - common).elements(), key=_span)
+
+    shifted = []
+    for interval in list(removed):
+        best = max(added, key=lambda candidate: _overlap(interval, candidate), default=None)
+        if best is not None and _overlap(interval, best) > 0:
+            shifted.append({'before': _outage(interval), 'after': _outage(best)})
+            removed.remove(interval)
+            added.remove(best)
+
+    return {
+        'added': [_outage(interval) for interval in added],
+        'removed': [_outage(interval) for interval in removed],
+        'shifted': shifted
+    }
+
+
+def diff_queue(before: Optional[Dict], after: Optional[Dict]) -> Optional[Dict]:
+    """Структурована зміна графіку черги або None, якщо те, що бачить клієнт, не змінилось"""
+    before, after = before or {}, after or {}
+    status_before, status_after = before.get('status'), after.get('status')
+    outages = diff_outages(before.get('outages', []), after.get('outages', []))
+
+    if status_before == status_after and not any(outages.values()):
+        return None
+    return {'status_before': status_before, 'status_after': status_after, **outages}
+
+
+def diff_queues(before: Mapping[str, Dict], after: Mapping[str, Dict]) -> Dict[str, Dict]:
+    """{черга: зміна} для черг, графік яких з'явився, зник або змінився"""
+    changes = {}
+    for queue_id in sorted(set(before) | set(after)):
+        change = diff_queue(before.get(queue_id), after.get(queue_id))
+        if change is not None:
+            changes[queue_id] = change
+    return changes
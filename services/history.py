@@ -0,0 +1,345 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Genitive month names as they appear in titles: "ГРАФІК ВІДКЛЮЧЕНЬ НА 24 ЛИСТОПАДА"
+UA_MONTHS = {
+    'січня': 1, 'лютого': 2, 'березня': 3, 'квітня': 4, 'травня': 5, 'червня': 6,
+    'липня': 7, 'серпня': 8, 'вересня': 9, 'жовтня': 10, 'листопада': 11, 'грудня': 12
+}
+
+_TITLE_DATE_RE = re.compile(r'\b(\d{1,2})\s+(' + '|'.join(UA_MONTHS) + r')\b', re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedules (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL UNIQUE,
+    schedule_date TEXT,
+    published_at TEXT,
+    title TEXT NOT NULL,
+    recorded_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS queue_outages (
+    schedule_id INTEGER NOT NULL REFERENCES schedules(id) ON DELETE CASCADE,
+    schedule_date TEXT NOT NULL,
+    queue TEXT NOT NULL,
+    outages TEXT NOT NULL,
+    PRIMARY KEY (schedule_date, queue, schedule_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_schedules_date ON schedules (schedule_date, published_at, id);
+CREATE INDEX IF NOT EXISTS idx_queue_outages_queue_date ON queue_outages (queue, schedule_date);
+CREATE TABLE IF NOT EXISTS schedule_changes (
+    id INTEGER PRIMARY KEY,
+    detected_at TEXT NOT NULL,
+    schedule_date TEXT,
+    previous_schedule_date TEXT,
+    title TEXT NOT NULL,
+    previous_title TEXT,
+    correction INTEGER NOT NULL,
+    queues TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_schedule_changes_detected ON schedule_changes (detected_at);
+"""
+
+# Latest version per date: the newest schedule published for that date
+LATEST_VERSION = (
+    "s.id = (SELECT s2.id FROM schedules s2 WHERE s2.schedule_date = q.schedule_date "
+    "ORDER BY s2.published_at DESC, s2.id DESC LIMIT 1)"
+)
+
+
+def parse_schedule_date(title: str, published: Optional[str]) -> Optional[str]:
+    """
+    Дата, на яку діє графік (YYYY-MM-DD).
+    Береться з заголовку ("НА 24 ЛИСТОПАДА"), рік - з дати публікації;
+    без дати в заголовку - сама дата публікації.
+    """
+    published_date = None
+    if published:
+        try:
+            published_date = datetime.fromisoformat(published.strip()).date()
+        except ValueError:
+            pass
+
+    match = _TITLE_DATE_RE.search(title or '')
+    if match:
+        day, month = int(match.group(1)), UA_MONTHS[match.group(2).lower()]
+        year = published_date.year if published_date else date.today().year
+
+        # Published in late December for early January
+        if published_date and month < published_date.month - 6:
+            year += 1
+        # Published in early January for late December
+        elif published_date and month > published_date.month + 6:
+            year -= 1
+
+        try:
+            return date(year, month, day).isoformat()
+        except ValueError:
+            pass
+
+    return published_date.isoformat() if published_date else None
+
+
+def is_cancellation(title: str) -> bool:
+    """Оголошення про скасування графіку ("ГПВ НА 5 БЕРЕЗНЯ СКАСОВАНО") - не версія графіку"""
+    return 'скасовано' in (title or '').lower()
+
+
+class HistoryService:
+    """
+    Історія графіків у SQLite: кожна унікальна версія графіку з нормалізованою датою
+    та проміжками по чергах, з індексами за (дата, черга) та (черга, дата),
+    а також журнал змін по чергах між послідовними версіями.
+    """
+
+    def __init__(self, db_path: str = "cache/history.db"):
+        """
+        Args:
+            db_path: Шлях до файлу бази даних
+        """
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        # One connection shared by the event loop and worker threads, guarded by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+
+    @staticmethod
+    def _content_hash(schedule: Dict) -> str:
+        key = json.dumps(
+            [schedule.get('title'), schedule.get('date'), schedule.get('queue_times') or {}],
+            ensure_ascii=False, sort_keys=True
+        )
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def record(self, schedule: Dict) -> bool:
+        """Зберегти графік, якщо такої версії ще немає. Повертає True, якщо додано новий запис"""
+        return self.record_many([schedule]) > 0
+
+    def record_many(self, schedules: Iterable[Dict]) -> int:
+        """Зберегти кілька графіків за одну транзакцію; повертає кількість нових"""
+        added = 0
+        recorded_at = datetime.now().isoformat()
+
+        with self._lock, self._conn:
+            for schedule in schedules:
+                queue_times = schedule.get('queue_times') or {}
+                schedule_date = parse_schedule_date(schedule.get('title', ''), schedule.get('date'))
+                if not queue_times or not schedule_date or is_cancellation(schedule.get('title', '')):
+                    continue
+
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO schedules "
+                    "(content_hash, schedule_date, published_at, title, recorded_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (self._content_hash(schedule), schedule_date, schedule.get('date'),
+                     schedule.get('title', ''), recorded_at)
+                )
+                if not cursor.rowcount:
+                    continue
+
+                self._conn.executemany(
+                    "INSERT INTO queue_outages (schedule_id, schedule_date, queue, outages) "
+                    "VALUES (?, ?, ?, ?)",
+                    [
+                        (cursor.lastrowid, schedule_date, queue_id, json.dumps(intervals))
+                        for queue_id, intervals in queue_times.items()
+                    ]
+                )
+                added += 1
+
+        if added:
+            logger.info(f"Recorded {added} new schedule(s) in history")
+        return added
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM schedules LIMIT 1").fetchone() is None
+
+    def query(
+        self,
+        queue: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        all_versions: bool = False,
+        limit: int = 1000
+    ) -> List[Dict]:
+        """
+        Проміжки відключень по датах (від старших до новіших).
+        За замовчуванням для кожної дати лише остання опублікована версія графіку.
+        """
+        conditions, params = [], []
+        if queue:
+            conditions.append("q.queue = ?")
+            params.append(queue)
+        if date_from:
+            conditions.append("q.schedule_date >= ?")
+            params.append(date_from.isoformat())
+        if date_to:
+            conditions.append("q.schedule_date <= ?")
+            params.append(date_to.isoformat())
+
+        if not all_versions:
+            conditions.append(LATEST_VERSION)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = (
+            "SELECT q.schedule_date, q.queue, q.outages, s.title, s.published_at, s.recorded_at "
+            "FROM queue_outages q JOIN schedules s ON s.id = q.schedule_id "
+            f"{where} ORDER BY q.schedule_date, s.published_at, s.id, q.queue LIMIT ?"
+        )
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        return [
+            {
+                'date': row['schedule_date'],
+                'queue': row['queue'],
+                'outages': [{'start': start, 'end': end} for start, end in json.loads(row['outages'])],
+                'title': row['title'],
+                'published_at': row['published_at'],
+                'recorded_at': row['recorded_at']
+            }
+            for row in rows
+        ]
+
+    def latest_outages(
+        self,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> List[Tuple[str, str, List[List[str]]]]:
+        """(дата, черга, [[початок, кінець], ...]) останньої версії графіку на кожну дату, без ліміту"""
+        conditions, params = [], []
+        if date_from:
+            conditions.append("schedule_date >= ?")
+            params.append(date_from.isoformat())
+        if date_to:
+            conditions.append("schedule_date <= ?")
+            params.append(date_to.isoformat())
+
+        # Resolve the latest version once per date, not once per queue row
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = (
+            "WITH latest AS MATERIALIZED ("
+            "SELECT d.schedule_date, (SELECT s2.id FROM schedules s2 WHERE s2.schedule_date = d.schedule_date "
+            "ORDER BY s2.published_at DESC, s2.id DESC LIMIT 1) AS id "
+            f"FROM (SELECT DISTINCT schedule_date FROM schedules {where}) d) "
+            "SELECT q.schedule_date, q.queue, q.outages FROM latest "
+            "JOIN queue_outages q ON q.schedule_date = latest.schedule_date AND q.schedule_id = latest.id"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        return [(row[0], row[1], json.loads(row[2])) for row in rows]
+
+    def record_change(self, change: Dict) -> int:
+        """Зберегти зміни по чергах між двома версіями графіку; повертає id запису"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO schedule_changes (detected_at, schedule_date, previous_schedule_date, "
+                "title, previous_title, correction, queues) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (change['detected_at'], change.get('schedule_date'), change.get('previous_schedule_date'),
+                 change.get('title', ''), change.get('previous_title'), int(change.get('correction', False)),
+                 json.dumps(change['queues'], ensure_ascii=False))
+            )
+        logger.info(f"Recorded schedule change #{cursor.lastrowid}: {len(change['queues'])} queue(s)")
+        return cursor.lastrowid
+
+    def changes_since(
+        self,
+        since_id: Optional[int] = None,
+        since_time: Optional[datetime] = None,
+        queue: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Dict]:
+        """
+        Зміни графіків (від старших до новіших) після id або моменту часу.
+        Без since - останні limit змін. З queue - лише зміни цієї черги.
+        """
+        conditions, params = [], []
+        if since_id is not None:
+            conditions.append("id > ?")
+            params.append(since_id)
+        if since_time is not None:
+            conditions.append("detected_at > ?")
+            params.append(since_time.isoformat())
+        if queue:
+            conditions.append("json_type(queues, ?) IS NOT NULL")
+            params.append(f'$."{queue}"')
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        # Oldest first after a cursor, the newest ones when there is none
+        order = "ASC" if since_id is not None or since_time is not None else "DESC"
+        sql = f"SELECT * FROM schedule_changes {where} ORDER BY id {order} LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        if order == "DESC":
+            rows.reverse()
+
+        changes = []
+        for row in rows:
+            queues = json.loads(row['queues'])
+            changes.append({
+                'id': row['id'],
+                'detected_at': row['detected_at'],
+                'schedule_date': row['schedule_date'],
+                'previous_schedule_date': row['previous_schedule_date'],
+                'title': row['title'],
+                'previous_title': row['previous_title'],
+                'correction': bool(row['correction']),
+                'queues': {queue: queues[queue]} if queue else queues
+            })
+        return changes
+
+    def publication_times(self, since: datetime) -> List[datetime]:
+        """
+        Моменти публікацій після since: час публікації збережених графіків (з сайту)
+        та моменти виявлених змін (коли сайт оновив графік без нової статті)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT published_at FROM schedules WHERE published_at >= ? "
+                "UNION ALL SELECT detected_at FROM schedule_changes WHERE detected_at >= ?",
+                (since.date().isoformat(), since.isoformat())
+            ).fetchall()
+
+        moments = []
+        for (value,) in rows:
+            try:
+                moments.append(datetime.fromisoformat(value))
+            except (TypeError, ValueError):
+                continue
+        return moments
+
+    def get_stats(self) -> Dict:
+        """Кількість збережених графіків та діапазон дат"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) AS schedules, MIN(schedule_date) AS first_date, "
+                "MAX(schedule_date) AS last_date, "
+                "(SELECT COUNT(*) FROM schedule_changes) AS changes FROM schedules"
+            ).fetchone()
+        return dict(row)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
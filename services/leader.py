@@ -0,0 +1,131 @@
+import os
+import uuid
+from typing import Optional
+import logging
+
+from .cache_backends import FCNTL_AVAILABLE, RedisCacheBackend, fcntl
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderElection:
+    """
+    Вибір одного воркера, який звертається до ZOE; решта читають його знімок зі спільного кешу.
+    try_acquire викликається періодично: отримує лідерство або підтверджує його.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.is_leader = False
+
+    def try_acquire(self) -> bool:
+        raise NotImplementedError
+
+    def release(self) -> None:
+        raise NotImplementedError
+
+    def _changed(self, is_leader: bool) -> bool:
+        if is_leader != self.is_leader:
+            logger.info(f"Worker {os.getpid()} {'became' if is_leader else 'is no longer'} the leader ({self.name})")
+        self.is_leader = is_leader
+        return is_leader
+
+
+class FileLockLeaderElection(LeaderElection):
+    """Лідер - процес, що тримає flock на файлі. Блокування звільняється ОС, якщо процес впав"""
+
+    name = "flock"
+
+    def __init__(self, lock_path: str = "cache/leader.lock"):
+        """
+        Args:
+            lock_path: Файл блокування, спільний для всіх воркерів на хості
+        """
+        super().__init__()
+        if not FCNTL_AVAILABLE:
+            raise ValueError("File lock leader election requires fcntl")
+
+        self.lock_path = lock_path
+        if os.path.dirname(lock_path):
+            os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        self._fd: Optional[int] = None
+
+    def try_acquire(self) -> bool:
+        if self._fd is not None:
+            return self._changed(True)
+
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return self._changed(False)
+
+        self._fd = fd
+        return self._changed(True)
+
+    def release(self) -> None:
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._changed(False)
+
+
+class RedisLeaderElection(LeaderElection):
+    """
+    Лідерство як ключ Redis з терміном дії (SET NX PX), який лідер продовжує.
+    Якщо лідер зупинився, ключ зникає через ttl_seconds і його забирає інший воркер.
+    Продовження та звільнення - Lua скрипти: перевірка власника і pexpire / del атомарні,
+    тож воркер не продовжить і не видалить ключ, який після закінчення терміну забрав інший.
+    """
+
+    name = "redis"
+
+    # KEYS[1] - lock key, ARGV[1] - our token, ARGV[2] - ttl in ms
+    RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+    RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+    def __init__(self, client, key: str = "zoe:leader", ttl_seconds: int = 90):
+        """
+        Args:
+            client: Клієнт з інтерфейсом redis-py
+            key: Ключ блокування
+            ttl_seconds: Термін дії лідерства без продовження
+        """
+        super().__init__()
+        self.client = client
+        self.key = key
+        self.ttl_ms = ttl_seconds * 1000
+        self.token = f"{os.getpid()}:{uuid.uuid4().hex}".encode()
+
+    def try_acquire(self) -> bool:
+        if self.client.set(self.key, self.token, nx=True, px=self.ttl_ms):
+            return self._changed(True)
+
+        renewed = self.client.eval(self.RENEW_SCRIPT, 1, self.key, self.token, self.ttl_ms)
+        return self._changed(bool(renewed))
+
+    def release(self) -> None:
+        self.client.eval(self.RELEASE_SCRIPT, 1, self.key, self.token)
+        self._changed(False)
+
+
+def leader_election_for(backend, lock_path: str = "cache/leader.lock") -> Optional[LeaderElection]:
+    """Вибір лідера, що відповідає спільному кешу: Redis ключ для Redis, інакше flock на хості"""
+    if isinstance(backend, RedisCacheBackend):
+        return RedisLeaderElection(backend.client)
+    if FCNTL_AVAILABLE:
+        return FileLockLeaderElection(lock_path)
+    return None
@@ -0,0 +1,242 @@
+import asyncio
+import random
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+import logging
+
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# ZOE publishes on Kyiv time; the hour-of-day profile is kept in it
+SCHEDULE_TZ = ZoneInfo("Europe/Kyiv")
+
+UPSTREAM_THROTTLED = REGISTRY.counter(
+    'zoe_upstream_throttled', 'Upstream requests delayed by the per-host rate cap'
+)
+POLL_INTERVAL = REGISTRY.gauge(
+    'zoe_poll_interval_seconds', 'Current delay before the next scheduled poll of ZOE'
+)
+
+
+def to_schedule_tz(moment: datetime) -> datetime:
+    """Наївний час вважається локальним часом сервера"""
+    return (moment if moment.tzinfo else moment.astimezone()).astimezone(SCHEDULE_TZ)
+
+
+class RateLimitedError(Exception):
+    """Запит до ZOE не виконувався: місце в ліміті звільниться пізніше, ніж дозволяє дедлайн"""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"Upstream rate cap reached, next slot in {retry_after:.0f}s")
+
+
+class HostRateLimiter:
+    """
+    Обмеження кількості запитів до одного хоста за ковзну хвилину. Запит понад ліміт
+    не відхиляється, а чекає, поки звільниться місце. max_per_minute=0 вимикає обмеження.
+    """
+
+    def __init__(self, max_per_minute: int = 20):
+        self.max_per_minute = max_per_minute
+        # Start times of the last max_per_minute requests per host, including reserved future ones
+        self._slots: Dict[str, Deque[float]] = {}
+
+    def _reserve(self, host: str, timeout: Optional[float]) -> float:
+        """Зайняти найближче вільне місце; повертає, скільки секунд до нього чекати"""
+        slots = self._slots.get(host)
+        if slots is None:
+            slots = self._slots[host] = deque(maxlen=self.max_per_minute)
+
+        now = time.monotonic()
+        while slots and now - slots[0] >= 60:
+            slots.popleft()
+        # Full window: the next slot opens a minute after the oldest of the last max_per_minute
+        start = max(now, slots[0] + 60) if len(slots) == self.max_per_minute else now
+
+        if timeout is not None and start - now > timeout:
+            raise RateLimitedError(start - now)
+        slots.append(start)
+        return start - now
+
+    async def acquire(self, host: str, timeout: Optional[float] = None) -> None:
+        """
+        Дочекатися свого місця в ліміті хоста. Якщо чекати довше за timeout секунд,
+        місце не займається, а виникає RateLimitedError.
+        """
+        if self.max_per_minute <= 0:
+            return
+
+        # Reserved synchronously, so waiters keep their order and no lock is held while sleeping
+        wait = self._reserve(host, timeout)
+        if wait > 0:
+            UPSTREAM_THROTTLED.inc()
+            logger.info(f"Upstream rate cap reached for {host}, waiting {wait:.1f}s")
+            await asyncio.sleep(wait)
+
+
+class AdaptivePollScheduler:
+    """
+    Інтервал опитування ZOE, що підлаштовується під те, як сайт публікує графіки:
+
+    - після нещодавньої зміни (або свіжого Last-Modified сторінки, тіло якої справді змінилось) -
+      мінімальний інтервал, бо оновлення й виправлення зазвичай виходять серіями;
+    - в години, коли за історією публікацій графіки виходять часто, - коротший за базовий;
+    - в години, коли публікацій не було, - максимальний;
+    - інакше - базовий.
+
+    Результат обмежений [min_interval, max_interval] та розмивається jitter, щоб воркери різних
+    хостів не звертались до сайту одночасно. Кожне рішення зберігається разом з причинами.
+    """
+
+    def __init__(
+        self,
+        base_interval_seconds: int = 600,
+        min_interval_seconds: int = 180,
+        max_interval_seconds: int = 1500,
+        jitter: float = 0.1,
+        burst_window_seconds: int = 45 * 60,
+        learn_days: int = 28,
+        relearn_seconds: int = 6 * 3600
+    ):
+        """
+        Args:
+            base_interval_seconds: Інтервал без особливих ознак активності
+            min_interval_seconds: Найменший інтервал (під час серії публікацій)
+            max_interval_seconds: Найбільший інтервал (тихі години)
+            jitter: Частка інтервалу для випадкового зсуву (0.1 = ±10%)
+            burst_window_seconds: Скільки після зміни сторінки опитувати з мінімальним інтервалом
+            learn_days: За скільки останніх днів історії будується профіль годин
+            relearn_seconds: Як часто перебудовувати профіль
+        """
+        self.base_interval = base_interval_seconds
+        self.min_interval = min(min_interval_seconds, base_interval_seconds)
+        self.max_interval = max(max_interval_seconds, base_interval_seconds)
+        self.jitter = jitter
+        self.burst_window = burst_window_seconds
+        self.learn_days = learn_days
+        self.relearn_seconds = relearn_seconds
+
+        # Publications per day for each Kyiv hour of day
+        self.hourly_rate: List[float] = [0.0] * 24
+        self.learned_days = 0
+        self.learned_events = 0
+        self._learned_at: Optional[float] = None
+
+        self.last_change_at: Optional[datetime] = None
+        self.last_modified: Optional[datetime] = None
+        # Last-Modified of the latest fetch whose body differed from the previous one
+        self.page_changed_at: Optional[datetime] = None
+        self.decision: Dict = {}
+
+    def needs_learning(self) -> bool:
+        return self._learned_at is None or time.monotonic() - self._learned_at >= self.relearn_seconds
+
+    def learn(self, moments: Iterable[datetime], now: Optional[datetime] = None) -> None:
+        """Побудувати профіль годин з моментів публікацій та виявлених змін"""
+        now = to_schedule_tz(now or datetime.now())
+        since = now - timedelta(days=self.learn_days)
+
+        counts = [0] * 24
+        first = None
+        for moment in moments:
+            moment = to_schedule_tz(moment)
+            if since <= moment <= now:
+                counts[moment.hour] += 1
+                first = moment if first is None or moment < first else first
+
+        # Rates over the days actually covered, so a young history isn't diluted
+        self.learned_days = max((now - first).days + 1, 1) if first else 0
+        self.learned_events = sum(counts)
+        self.hourly_rate = [count / self.learned_days for count in counts] if first else [0.0] * 24
+        self._learned_at = time.monotonic()
+        logger.info(f"Poll profile learned from {self.learned_events} publications over {self.learned_days} day(s)")
+
+    def observe(
+        self,
+        changed: bool,
+        last_modified: Optional[datetime],
+        page_changed: bool = False,
+        now: Optional[datetime] = None
+    ) -> None:
+        """
+        Врахувати результат опитування: чи змінився графік, Last-Modified сторінки та чи змінилось
+        її тіло. Last-Modified свідчить про публікацію, лише якщо він зсунувся разом зі зміною тіла:
+        динамічні сторінки CMS ставлять у нього поточний час на кожну відповідь.
+        """
+        if changed:
+            self.last_change_at = now or datetime.now()
+        if last_modified is not None:
+            if page_changed and last_modified != self.last_modified:
+                self.page_changed_at = last_modified
+            self.last_modified = last_modified
+
+    def _base(self, now: datetime) -> Tuple[float, List[str]]:
+        local = to_schedule_tz(now)
+
+        if self.last_change_at is not None:
+            since_change = (local - to_schedule_tz(self.last_change_at)).total_seconds()
+            if since_change < self.burst_window:
+                return self.min_interval, [f"schedule changed {int(since_change // 60)} min ago"]
+
+        if self.page_changed_at is not None:
+            since_modified = (local - to_schedule_tz(self.page_changed_at)).total_seconds()
+            if 0 <= since_modified < self.burst_window:
+                return self.min_interval, [f"upstream Last-Modified {int(since_modified // 60)} min ago"]
+
+        if self.learned_days == 0:
+            return self.base_interval, ["no publication history yet"]
+
+        # Look one hour ahead too, so polling speeds up before a usual publication time
+        hour = local.hour
+        activity = max(self.hourly_rate[hour], self.hourly_rate[(hour + 1) % 24])
+        if activity == 0:
+            return self.max_interval, [f"no publications around {hour:02d}:00 in {self.learned_days} day(s)"]
+
+        interval = self.base_interval / (1 + 4 * activity)
+        return interval, [f"{activity:.2f} publications/day around {hour:02d}:00"]
+
+    def next_interval(self, now: Optional[datetime] = None) -> float:
+        """Затримка до наступного опитування в секундах; причини - в decision"""
+        now = now or datetime.now()
+        interval, reasons = self._base(now)
+
+        bounded = min(max(interval, self.min_interval), self.max_interval)
+        if bounded != interval:
+            reasons.append(f"clamped to [{self.min_interval}, {self.max_interval}]s")
+
+        delay = bounded * (1 + random.uniform(-self.jitter, self.jitter))
+        POLL_INTERVAL.set(delay)
+
+        self.decision = {
+            'interval_seconds': round(delay, 1),
+            'planned_interval_seconds': round(bounded, 1),
+            'next_poll_at': (now + timedelta(seconds=delay)).isoformat(timespec='seconds'),
+            'reasons': reasons,
+            'decided_at': now.isoformat(timespec='seconds')
+        }
+        return delay
+
+    def info(self) -> Dict:
+        """Поточне рішення та дані, з яких воно прийняте"""
+        return {
+            **self.decision,
+            'bounds': {
+                'min_seconds': self.min_interval,
+                'base_seconds': self.base_interval,
+                'max_seconds': self.max_interval,
+                'jitter': self.jitter
+            },
+            'last_change_at': self.last_change_at.isoformat(timespec='seconds') if self.last_change_at else None,
+            'upstream_last_modified': self.last_modified.isoformat() if self.last_modified else None,
+            'upstream_page_changed_at': self.page_changed_at.isoformat() if self.page_changed_at else None,
+            'profile': {
+                'days': self.learned_days,
+                'publications': self.learned_events,
+                'hourly_rate': [round(rate, 3) for rate in self.hourly_rate]
+            }
+        }
@@ -0,0 +1,117 @@
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# Queue ids are "<group>.<subgroup>" (1.1 ... 12.9). The lookarounds keep dates
+# such as 25.01.2025 and times such as 12.30 from being read as queues.
+QUEUE_PATTERN = r'(?<![\d.:])(?:1[0-2]|[1-9])\.[1-9](?![\d.])'
+
+# 3:00, 03:00, 03.00, 24:00
+TIME_PATTERN = r'(?:[01]?\d|2[0-4])[:.][0-5]\d'
+
+# "03:00 - 08:00", "03:00–08:00", "03:00 — 08:00", "з 03:00 до 08:00"
+RANGE_SEPARATOR = r'\s*(?:-|‐|‑|–|—|до)\s*'
+
+_RANGE_RE = re.compile(rf'({TIME_PATTERN}){RANGE_SEPARATOR}({TIME_PATTERN})')
+
+# One pass over the article: every range, queue id, word and line break is a token.
+# Filler words ("черга", "з", "до", "год") may surround queues and ranges; any other
+# word is prose.
+_TOKEN_RE = re.compile(
+    rf'(?P<range>({TIME_PATTERN}){RANGE_SEPARATOR}({TIME_PATTERN}))'
+    rf'|(?P<queue>{QUEUE_PATTERN})'
+    r'|(?P<newline>\n)'
+    r'|(?P<filler>\b(?:(?:[Пп]ід)?[Чч]ерг[аиі]?|[Гг]од)\b)'
+    r'|(?P<prose>[^\W\d_]{3,})'
+)
+
+
+def normalize_time(value: str) -> str:
+    """'3.00' -> '03:00'"""
+    value = value.replace('.', ':')
+    return value if len(value) == 5 else '0' + value
+
+
+@lru_cache(maxsize=4096)
+def normalize_range(start: str, end: str) -> Optional[Tuple[str, str]]:
+    """Нормалізований проміжок або None, якщо це не валідний час доби (25:00, 24:30, 08:00-08:00)"""
+    start, end = normalize_time(start), normalize_time(end)
+    if start > '24:00' or end > '24:00' or start == end:
+        return None
+    return start, end
+
+
+def find_time_ranges(text: str) -> List[List[str]]:
+    """Всі проміжки часу в тексті, у порядку появи"""
+    ranges = []
+    for start, end in _RANGE_RE.findall(text):
+        normalized = normalize_range(start, end)
+        if normalized:
+            ranges.append(list(normalized))
+    return ranges
+
+
+def parse_queue_intervals(text: str) -> Dict[str, List[List[str]]]:
+    """
+    Розібрати текст статті на {черга: [[початок, кінець], ...]} за один прохід.
+
+    Проміжки часу належать останній згаданій групі черг ("1.1, 1.2: 03:00 – 08:00"),
+    в тому числі якщо вони на наступних рядках. Рядок зі звичайним текстом без номерів
+    черг закриває поточну групу, тож загальні фрази на кшталт "з 00:00 до 24:00"
+    не приписуються останній черзі.
+    """
+    intervals: Dict[str, List[List[str]]] = {}
+    group: List[str] = []
+    group_has_times = False
+
+    # Ranges of the current line are held back until we know whether the line is prose
+    line_ranges: List[List[str]] = []
+    line_has_queue = False
+    line_has_prose = False
+
+    def flush_line():
+        nonlocal group, group_has_times
+        if line_has_prose and not line_has_queue:
+            group, group_has_times = [], False
+            return
+
+        if not group or not line_ranges:
+            return
+
+        for queue_id in group:
+            queue_intervals = intervals[queue_id]
+            for interval in line_ranges:
+                if interval not in queue_intervals:
+                    queue_intervals.append(interval)
+        group_has_times = True
+
+    for token in _TOKEN_RE.finditer(text):
+        kind = token.lastgroup
+
+        if kind == 'range':
+            normalized = normalize_range(token.group(2), token.group(3))
+            if normalized:
+                line_ranges.append(list(normalized))
+
+        elif kind == 'queue':
+            # Ranges seen earlier on this line belong to the previous group
+            flush_line()
+            line_ranges = []
+            line_has_queue = True
+
+            queue_id = token.group('queue')
+            if group_has_times:
+                group, group_has_times = [], False
+            if queue_id not in group:
+                group.append(queue_id)
+            intervals.setdefault(queue_id, [])
+
+        elif kind == 'newline':
+            flush_line()
+            line_ranges, line_has_queue, line_has_prose = [], False, False
+
+        elif kind == 'prose':
+            line_has_prose = True
+
+    flush_line()
+    return intervals
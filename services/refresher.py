@@ -0,0 +1,530 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+import logging
+
+from .scraper import AsyncScraperService, BaseScraper
+from .cache import CacheService
+from .changes import diff_queues
+from .history import HistoryService, parse_schedule_date
+from .leader import LeaderElection
+from .metrics import REGISTRY
+from .polling import AdaptivePollScheduler, RateLimitedError
+from .resilience import CircuitOpenError
+from .singleflight import SingleFlight
+from .timeline import QueueDay
+
+logger = logging.getLogger(__name__)
+
+STALE_RESPONSES = REGISTRY.counter(
+    'zoe_stale_responses', 'Requests served from stale data, by reason (revalidating or upstream error)', ['reason']
+)
+
+
+@dataclass(frozen=True)
+class ScheduleSnapshot:
+    """Незмінний знімок даних, з якого обслуговуються всі endpoints"""
+
+    latest: Optional[Dict]
+    queues: Mapping[str, Dict]
+    queue_list: Tuple[str, ...]
+    fetched_at: datetime = field(default_factory=datetime.now)
+
+    # Per-queue outages as sorted minute offsets + 30-minute slot bitmap
+    days: Mapping[str, QueueDay] = field(default_factory=lambda: MappingProxyType({}))
+
+    # Structured per-queue diff against the snapshot this one replaced
+    changes: Mapping[str, Dict] = field(default_factory=lambda: MappingProxyType({}))
+
+    # Per-endpoint renders of this data version, filled lazily by the API layer
+    _rendered: Dict[str, Any] = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def build(cls, scraper: BaseScraper, schedules: List[Dict]) -> "ScheduleSnapshot":
+        """Побудувати знімок з усіх розібраних статей сторінки"""
+        return cls.from_latest(scraper, scraper.select_latest_schedule(schedules))
+
+    @classmethod
+    def from_latest(
+        cls,
+        scraper: BaseScraper,
+        latest: Optional[Dict],
+        fetched_at: Optional[datetime] = None,
+        previous: Optional["ScheduleSnapshot"] = None
+    ) -> "ScheduleSnapshot":
+        """
+        Побудувати знімок з уже вибраного актуального графіку.
+        З previous рахуються зміни по чергах, а дані та відрендерені відповіді незмінених черг
+        переносяться в новий знімок, тож скидається лише те, що стосується змінених черг.
+        """
+        queue_list = scraper.list_queues(latest)
+
+        queues = {}
+        if latest:
+            for queue_id in set(queue_list) | set(scraper.DEFAULT_QUEUES):
+                queues[queue_id] = scraper.build_queue_schedule(latest, queue_id)
+
+        changes: Dict[str, Dict] = {}
+        unchanged = set()
+        if previous is not None:
+            changes = diff_queues(previous.queues, queues)
+            unchanged = {queue_id for queue_id in queues if queue_id in previous.days and queue_id not in changes}
+
+        days = {
+            queue_id: previous.days[queue_id] if queue_id in unchanged
+            else QueueDay.from_outages(queue_data['outages'])
+            for queue_id, queue_data in queues.items()
+        }
+
+        return cls(
+            latest=latest,
+            queues=MappingProxyType(queues),
+            queue_list=tuple(queue_list),
+            fetched_at=fetched_at or datetime.now(),
+            days=MappingProxyType(days),
+            changes=MappingProxyType(changes),
+            _rendered=previous.queue_renders(unchanged) if unchanged else {},
+        )
+
+    def get_queue(self, queue_id: str, scraper: BaseScraper) -> Optional[Dict]:
+        """Графік черги зі знімку (без звернення до мережі)"""
+        queue_data = self.queues.get(queue_id)
+        if queue_data is None and self.latest:
+            # Unknown queue ids are rare; build the "no_data" answer on demand
+            queue_data = scraper.build_queue_schedule(self.latest, queue_id)
+        return queue_data
+
+    def rendered(self, key: str, render: Callable[[], Any]) -> Any:
+        """Відрендерити відповідь один раз на версію даних та повторно використовувати її"""
+        result = self._rendered.get(key)
+        if result is None:
+            result = self._rendered[key] = render()
+        return result
+
+    def queue_renders(self, queue_ids: set) -> Dict[str, Any]:
+        """Відрендерені відповіді окремих черг (ключі виду '<вид>:<черга>') з переліку queue_ids"""
+        # list() copies in one step, the event loop may be adding renders meanwhile
+        return {
+            key: value for key, value in list(self._rendered.items())
+            if key.partition(':')[2] in queue_ids
+        }
+
+    @property
+    def age_seconds(self) -> float:
+        return (datetime.now() - self.fetched_at).total_seconds()
+
+
+class RefreshService:
+    """
+    Фонове оновлення графіків: один запит до ZOE на цикл замість запиту на кожен endpoint.
+    З кількома воркерами до ZOE звертається лише лідер, решта підхоплюють його знімок зі спільного кешу.
+
+    Дані, не підтверджені довше за stale_after, вважаються застарілими: їх віддають одразу,
+    а оновлення запускається у фоні (stale-while-revalidate). Якщо ZOE недоступний, застарілі дані
+    віддаються ще max_stale (stale-if-error); старіші - лише після успішного оновлення.
+    """
+
+    LATEST_CACHE_KEY = "latest_schedule"
+    FETCH_KEY = "fetch_schedules"
+    BACKFILL_KEY = "backfill_history"
+
+    def __init__(
+        self,
+        scraper: AsyncScraperService,
+        cache: Optional[CacheService] = None,
+        interval_minutes: int = 30,
+        retry_seconds: int = 60,
+        history: Optional[HistoryService] = None,
+        leader: Optional[LeaderElection] = None,
+        follower_poll_seconds: int = 30,
+        stale_after_minutes: int = 30,
+        max_stale_minutes: int = 24 * 60,
+        poller: Optional[AdaptivePollScheduler] = None,
+        backfill_pages: int = 1
+    ):
+        """
+        Args:
+            scraper: Сервіс парсингу ZOE
+            cache: Файловий кеш для збереження знімку між перезапусками
+            history: Сховище історії, куди записується кожна нова версія графіку
+            interval_minutes: Інтервал між оновленнями
+            retry_seconds: Затримка перед повтором після невдалого оновлення
+            stale_after_minutes: Через скільки хвилин без підтвердження дані вважаються застарілими
+            max_stale_minutes: Скільки ще хвилин після цього можна віддавати застарілі дані
+            poller: Адаптивний інтервал опитування; без нього - фіксований interval_minutes
+            backfill_pages: Скільки сторінок пагінації ZOE завантажити в порожню історію
+        """
+        self.scraper = scraper
+        self.cache = cache
+        self.interval = interval_minutes * 60
+        self.retry_seconds = retry_seconds
+        self.history = history
+        self.leader = leader
+        self.follower_poll_seconds = follower_poll_seconds
+        self.stale_after = stale_after_minutes * 60
+        self.max_stale = max_stale_minutes * 60
+        self.poller = poller
+        self.backfill_pages = backfill_pages
+
+        self.snapshot: Optional[ScheduleSnapshot] = None
+        self.last_error: Optional[str] = None
+        self.last_success_at: Optional[datetime] = None
+        self.last_failure_at: Optional[datetime] = None
+        # Failed fetches from ZOE since the last successful one
+        self.consecutive_failures = 0
+        # When the served data was last confirmed against ZOE (or written by the leader)
+        self.verified_at: Optional[datetime] = None
+        self.singleflight = SingleFlight()
+        self._task: Optional[asyncio.Task] = None
+        self._revalidation: Optional[asyncio.Task] = None
+        self._last_revalidation = 0.0
+        self._next_refresh = 0.0
+        self._listeners: List[Callable[[Optional[ScheduleSnapshot], ScheduleSnapshot], None]] = []
+
+    def add_listener(self, listener: Callable[[Optional[ScheduleSnapshot], ScheduleSnapshot], None]) -> None:
+        """Викликати listener(попередній, новий) при кожній підміні знімку"""
+        self._listeners.append(listener)
+
+    def _store(self, snapshot: ScheduleSnapshot, verified_at: datetime) -> None:
+        """
+        Записати знімок у спільний кеш разом з його fetched_at: фоловери будують знімок з тим самим
+        часом, тож однакові дані дають однакові тіла та ETag на всіх воркерах. Час запису - момент
+        останньої перевірки на ZOE.
+        """
+        self.cache.set(
+            self.LATEST_CACHE_KEY,
+            {'fetched_at': snapshot.fetched_at.isoformat(), 'schedule': snapshot.latest},
+            cached_at=verified_at
+        )
+
+    def _swap(self, snapshot: ScheduleSnapshot) -> None:
+        # Single reference assignment - readers see either the old or the new snapshot
+        previous, self.snapshot = self.snapshot, snapshot
+        for listener in self._listeners:
+            try:
+                listener(previous, snapshot)
+            except Exception as e:
+                logger.error(f"Snapshot listener failed: {e}")
+
+    @property
+    def is_follower(self) -> bool:
+        return self.leader is not None and not self.leader.is_leader
+
+    @property
+    def data_age_seconds(self) -> Optional[float]:
+        """Скільки секунд тому дані знімку востаннє підтверджено"""
+        if self.verified_at is None:
+            return None
+        return max((datetime.now() - self.verified_at).total_seconds(), 0.0)
+
+    def is_stale(self) -> bool:
+        age = self.data_age_seconds
+        return age is not None and age > self.stale_after
+
+    def is_usable(self) -> bool:
+        """Чи можна ще віддавати знімок (свіжий або застарілий у межах max_stale)"""
+        age = self.data_age_seconds
+        return self.snapshot is not None and age is not None and age <= self.stale_after + self.max_stale
+
+    async def current(self, force_refresh: bool = False) -> Tuple[ScheduleSnapshot, bool]:
+        """
+        Знімок для відповіді та ознака того, що він узятий з пам'яті.
+        Свіжий знімок віддається одразу; застарілий - теж одразу, з оновленням у фоні;
+        занадто старий (або force_refresh) - після оновлення, а якщо ZOE недоступний,
+        то застарілий у межах max_stale.
+        """
+        snapshot = self.snapshot
+        if snapshot is not None and not force_refresh:
+            if not self.is_stale():
+                return snapshot, True
+            if self.is_usable():
+                self.revalidate()
+                STALE_RESPONSES.inc('revalidating')
+                return snapshot, True
+
+        try:
+            return await self.refresh(), False
+        except Exception as e:
+            if not self.is_usable():
+                raise
+            self.last_error = str(e)
+            logger.warning(f"Refresh failed, serving stale snapshot ({int(self.data_age_seconds)}s old): {e}")
+            STALE_RESPONSES.inc('error')
+            return self.snapshot, True
+
+    def revalidate(self) -> None:
+        """Запустити фонове оновлення, якщо воно ще не йде (не частіше за retry_seconds)"""
+        if self._revalidation is not None and not self._revalidation.done():
+            return
+        if time.monotonic() - self._last_revalidation < self.retry_seconds:
+            return
+
+        self._last_revalidation = time.monotonic()
+        self._revalidation = asyncio.create_task(self._revalidate())
+
+    async def _revalidate(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Background revalidation failed: {e}")
+
+    async def refresh(self) -> ScheduleSnapshot:
+        """
+        Завантажити сторінку, побудувати новий знімок та атомарно підмінити поточний.
+        Одночасні виклики (фонова задача, force_refresh, холодний старт) чекають на одне завантаження.
+        Не-лідер спершу бере знімок лідера зі спільного кешу і йде до ZOE, лише якщо його там немає.
+        """
+        if self.is_follower:
+            snapshot = await asyncio.to_thread(self.sync_from_cache)
+            if snapshot is not None:
+                return snapshot
+
+        return await self.singleflight.do(self.FETCH_KEY, self._refresh)
+
+    async def _refresh(self) -> ScheduleSnapshot:
+        # Only the latest schedule is served, so articles after it are never parsed
+        try:
+            latest = await self.scraper.fetch_latest_schedule()
+        except (CircuitOpenError, RateLimitedError) as e:
+            # Rejected without a request - not another upstream failure, but still the latest error
+            self.last_error = str(e)
+            raise
+        except Exception as e:
+            self.consecutive_failures += 1
+            self.last_failure_at = datetime.now()
+            self.last_error = str(e)
+            raise
+        verified_at = self.last_success_at = self.verified_at = datetime.now()
+        self.consecutive_failures = 0
+
+        if self.snapshot is not None and self.scraper.last_fetch_status != 'modified':
+            # Page didn't change - keep the current snapshot as is
+            self.last_error = None
+            if self.poller is not None:
+                self.poller.observe(False, self.scraper.last_modified)
+            if self.cache and self.snapshot.latest:
+                # Keep the shared entry alive for other workers and restarts
+                self._store(self.snapshot, verified_at)
+            return self.snapshot
+
+        previous = self.snapshot
+        snapshot = ScheduleSnapshot.from_latest(self.scraper, latest, fetched_at=verified_at, previous=previous)
+        self._swap(snapshot)
+        if self.poller is not None and previous is not None:
+            self.poller.observe(bool(snapshot.changes), self.scraper.last_modified, page_changed=True)
+        self.last_error = None
+        stats = self.scraper.last_parse_stats
+        logger.info(
+            f"Snapshot refreshed: parsed {stats['parsed']}/{stats['articles']} articles, "
+            f"{len(snapshot.queue_list)} queues, {len(snapshot.changes)} changed"
+        )
+
+        if self.cache and snapshot.latest:
+            self._store(snapshot, verified_at)
+
+        if self.history and snapshot.latest:
+            await self._record_history()
+            if previous is not None and previous.latest and snapshot.changes:
+                await self._record_change(previous, snapshot)
+
+        return snapshot
+
+    async def backfill_history(self, pages: int) -> Dict:
+        """
+        Завантажити в історію графіки з перших pages сторінок кожного джерела; повертає статистику crawl.
+        Одночасні виклики чекають на вже запущене заповнення і отримують його результат.
+        """
+        return await self.singleflight.do(self.BACKFILL_KEY, lambda: self._backfill_history(pages))
+
+    async def _backfill_history(self, pages: int) -> Dict:
+        schedules = await self.scraper.crawl(pages)
+        added = await asyncio.to_thread(self.history.record_many, schedules) if schedules else 0
+        return {**self.scraper.last_crawl_stats, 'added': added}
+
+    async def _record_history(self) -> None:
+        """
+        Записати в історію всі графіки зміненої сторінки (не лише актуальний: виправлення може вийти
+        нижче новішої статті); вже збережені версії пропускаються за хешем вмісту.
+        Порожню історію спершу заповнити статтями перших backfill_pages сторінок.
+        """
+        try:
+            if self.backfill_pages > 1 and await asyncio.to_thread(self.history.is_empty):
+                # One-off crawl of what's published, so history doesn't start empty
+                stats = await self.backfill_history(self.backfill_pages)
+                if stats['added']:
+                    return
+            await asyncio.to_thread(self.history.record_many, await self.scraper.current_schedules())
+        except Exception as e:
+            # History is best effort - serving the snapshot must not depend on it
+            logger.error(f"Failed to record schedule history: {e}")
+
+    async def _record_change(self, previous: ScheduleSnapshot, snapshot: ScheduleSnapshot) -> None:
+        """Записати зміни по чергах між версіями графіку (лише лідер, тож запис один на хост)"""
+        schedule_date = parse_schedule_date(snapshot.latest.get('title', ''), snapshot.latest.get('date'))
+        previous_date = parse_schedule_date(previous.latest.get('title', ''), previous.latest.get('date'))
+        change = {
+            'detected_at': snapshot.fetched_at.isoformat(),
+            'schedule_date': schedule_date,
+            'previous_schedule_date': previous_date,
+            'title': snapshot.latest.get('title', ''),
+            'previous_title': previous.latest.get('title', ''),
+            # Same day republished with corrections, not the next day's schedule
+            'correction': schedule_date is not None and schedule_date == previous_date,
+            'queues': dict(snapshot.changes)
+        }
+        try:
+            await asyncio.to_thread(self.history.record_change, change)
+        except Exception as e:
+            logger.error(f"Failed to record schedule change: {e}")
+
+    def sync_from_cache(self) -> Optional[ScheduleSnapshot]:
+        """Підхопити знімок зі спільного кешу (записаний цим або іншим воркером)"""
+        if not self.cache:
+            return None
+
+        entry = self.cache.get_shared(self.LATEST_CACHE_KEY)
+        if entry is None:
+            return None
+
+        value, cached_at = entry
+        if isinstance(value, dict) and 'schedule' in value and 'fetched_at' in value:
+            latest, fetched_at = value['schedule'], datetime.fromisoformat(value['fetched_at'])
+        else:
+            # Entry written before the snapshot time was stored alongside
+            latest, fetched_at = value, cached_at
+
+        if self.verified_at is None or cached_at > self.verified_at:
+            # The leader re-writes the entry on every check, even when nothing changed
+            self.verified_at = cached_at
+        if self.snapshot is not None and self.snapshot.latest == latest:
+            return self.snapshot
+
+        self._swap(ScheduleSnapshot.from_latest(
+            self.scraper, latest, fetched_at=fetched_at, previous=self.snapshot
+        ))
+        logger.info(f"Snapshot loaded from shared cache ({self.cache.backend.name})")
+        return self.snapshot
+
+    def load_from_cache(self) -> Optional[ScheduleSnapshot]:
+        """
+        Відновити знімок з кешу (швидкий старт до першого оновлення).
+        Застарілий запис теж підходить: він віддається, поки фонове оновлення отримує свіжі дані.
+        """
+        return self.sync_from_cache()
+
+    async def _is_leader(self) -> bool:
+        if self.leader is None:
+            return True
+        return await asyncio.to_thread(self.leader.try_acquire)
+
+    async def _learn_poll_profile(self) -> None:
+        """Перебудувати профіль годин публікацій з історії (раз на relearn_seconds)"""
+        if self.poller is None or self.history is None or not self.poller.needs_learning():
+            return
+        try:
+            since = datetime.now() - timedelta(days=self.poller.learn_days)
+            self.poller.learn(await asyncio.to_thread(self.history.publication_times, since))
+        except Exception as e:
+            logger.error(f"Failed to learn poll profile: {e}")
+
+    def _poll_interval(self) -> float:
+        if self.poller is None:
+            return self.interval
+        interval = self.poller.next_interval()
+        logger.info(f"Next poll in {interval:.0f}s ({'; '.join(self.poller.decision['reasons'])})")
+        return interval
+
+    async def _leader_tick(self) -> float:
+        """Оновити дані, якщо настав час; повертає затримку до наступної перевірки"""
+        if time.monotonic() >= self._next_refresh:
+            try:
+                await self.refresh()
+                await self._learn_poll_profile()
+                self._next_refresh = time.monotonic() + self._poll_interval()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Background refresh failed: {e}")
+                self._next_refresh = time.monotonic() + self.retry_seconds
+
+        delay = self._next_refresh - time.monotonic()
+        if self.leader is not None:
+            # Wake up often enough to renew leadership
+            delay = min(delay, self.follower_poll_seconds)
+        return max(delay, 0)
+
+    def polling_info(self) -> Dict:
+        """Стан опитування ZOE: інтервал, причини його вибору та час до наступного запиту"""
+        info = {
+            'role': 'follower' if self.is_follower else 'leader',
+            'adaptive': self.poller is not None,
+            'next_poll_in_seconds': (
+                round(max(self._next_refresh - time.monotonic(), 0), 1)
+                if self._task is not None and not self.is_follower else None
+            ),
+            'last_success_at': self.last_success_at.isoformat(timespec='seconds') if self.last_success_at else None,
+            'last_error': self.last_error,
+            'consecutive_failures': self.consecutive_failures,
+            'data_age_seconds': round(self.data_age_seconds, 1) if self.data_age_seconds is not None else None,
+            'stale': self.is_stale()
+        }
+        if self.is_follower:
+            info['reasons'] = [f"follower: picks up the leader's snapshot every {self.follower_poll_seconds}s"]
+        elif self.poller is not None:
+            info.update(self.poller.info())
+        else:
+            info.update({'interval_seconds': self.interval, 'reasons': ["fixed interval"]})
+        return info
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if await self._is_leader():
+                    delay = await self._leader_tick()
+                else:
+                    # Follower: the leader talks to ZOE, we only pick up its snapshot
+                    await asyncio.to_thread(self.sync_from_cache)
+                    delay = self.follower_poll_seconds
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Background refresh failed: {e}")
+                delay = self.retry_seconds
+
+            await asyncio.sleep(delay)
+
+    def start(self) -> None:
+        """Запустити фонове оновлення (викликається зі startup hook)"""
+        if self._task and not self._task.done():
+            return
+
+        self.load_from_cache()
+        self._task = asyncio.create_task(self._run())
+        if self.poller is not None:
+            logger.info(
+                f"Background refresh started (adaptive, {self.poller.min_interval}-{self.poller.max_interval}s)"
+            )
+        else:
+            logger.info(f"Background refresh started (every {self.interval // 60} minutes)")
+
+    async def stop(self) -> None:
+        """Зупинити фонове оновлення"""
+        if not self._task:
+            return
+
+        for task in (self._task, self._revalidation):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._revalidation = None
+
+        if self.leader is not None:
+            await asyncio.to_thread(self.leader.release)
+        await self.scraper.aclose()
@@ -0,0 +1,146 @@
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+import logging
+
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_TRANSITIONS = REGISTRY.counter(
+    'zoe_upstream_circuit_transitions', 'Upstream circuit breaker state changes', ['state']
+)
+CIRCUIT_REJECTIONS = REGISTRY.counter(
+    'zoe_upstream_circuit_rejections', 'Upstream calls rejected without a request while the circuit is open'
+)
+RETRY_BUDGET_EXHAUSTED = REGISTRY.counter(
+    'zoe_upstream_retry_budget_exhausted', 'Retries skipped because the shared retry budget was spent'
+)
+
+
+class CircuitOpenError(Exception):
+    """Запит до ZOE не виконувався: автомат розімкнений після серії невдач"""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"Upstream circuit is open, next attempt in {retry_after:.0f}s")
+
+
+class CircuitBreaker:
+    """
+    Автомат для запитів до ZOE: closed -> open після failure_threshold невдач поспіль;
+    у стані open запити відхиляються одразу, без звернення до сайту; через recovery_seconds
+    автомат переходить у half_open і пропускає half_open_max_calls пробних запитів.
+    Успішна проба замикає його, невдала - знову розмикає.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, recovery_seconds: float = 60, half_open_max_calls: int = 1):
+        """
+        Args:
+            failure_threshold: Скільки невдач поспіль розмикають автомат
+            recovery_seconds: Скільки автомат лишається розімкненим до пробного запиту
+            half_open_max_calls: Скільки пробних запитів одночасно в стані half_open
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_calls = 0
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning(f"Upstream circuit {self.state} -> {state}")
+        self.state = state
+        CIRCUIT_TRANSITIONS.inc(state)
+
+    def retry_after(self) -> float:
+        """Секунд до наступного пробного запиту (0, якщо запити дозволені)"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(self.recovery_seconds - (time.monotonic() - self.opened_at), 0.0)
+
+    def before_call(self) -> None:
+        """Перевірити, чи можна звертатися до ZOE; інакше CircuitOpenError"""
+        if self.state == self.OPEN:
+            if self.retry_after() > 0:
+                CIRCUIT_REJECTIONS.inc()
+                raise CircuitOpenError(self.retry_after())
+            self._transition(self.HALF_OPEN)
+            self._trial_calls = 0
+
+        if self.state == self.HALF_OPEN:
+            if self._trial_calls >= self.half_open_max_calls:
+                CIRCUIT_REJECTIONS.inc()
+                raise CircuitOpenError(self.recovery_seconds)
+            self._trial_calls += 1
+
+    def release(self) -> None:
+        """Звільнити пробний запит, що завершився без результату (наприклад, скасований)"""
+        if self.state == self.HALF_OPEN and self._trial_calls > 0:
+            self._trial_calls -= 1
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._transition(self.CLOSED)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._transition(self.OPEN)
+
+    def info(self) -> Dict:
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'retry_after_seconds': round(self.retry_after(), 1),
+            'failure_threshold': self.failure_threshold,
+            'recovery_seconds': self.recovery_seconds
+        }
+
+
+class RetryBudget:
+    """
+    Спільний для всіх викликів ліміт повторів: за ковзне вікно повторів може бути не більше
+    ratio від кількості запитів (але щонайменше min_retries). Коли сайт лежить, повтори
+    швидко вичерпуються, і навантаження на нього не множиться на кількість спроб.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 3, window_seconds: float = 60):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window_seconds = window_seconds
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+
+    def _prune(self, now: float) -> None:
+        for events in (self._requests, self._retries):
+            while events and now - events[0] >= self.window_seconds:
+                events.popleft()
+
+    def record_request(self) -> None:
+        self._requests.append(time.monotonic())
+
+    def try_retry(self) -> bool:
+        """Витратити повтор з бюджету; False, якщо бюджет вичерпано"""
+        now = time.monotonic()
+        self._prune(now)
+        if len(self._retries) >= max(self.min_retries, self.ratio * len(self._requests)):
+            RETRY_BUDGET_EXHAUSTED.inc()
+            return False
+        self._retries.append(now)
+        return True
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 4.0) -> float:
+    """Затримка перед повтором attempt (1, 2, ...): випадкова в [0, min(cap, base * 2^attempt)] ("full jitter")"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
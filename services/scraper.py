@@ -1,84 +1,270 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import hashlib
+import httpx
+from bs4 import BeautifulSoup, SoupStrainer
 import re
-from typing import List, Dict, Optional, Tuple
-import urllib3
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
 from datetime import datetime
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
 import logging
 
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from .metrics import REGISTRY
+from .polling import HostRateLimiter, RateLimitedError
+from .resilience import CircuitBreaker, CircuitOpenError, RetryBudget, backoff_delay
+from .queue_parser import find_time_ranges, parse_queue_intervals
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import lxml.html
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
 
-class ScraperService:
-    """Сервіс для парсингу графіків відключень з ZOE.COM.UA"""
+PARSE_ARTICLE_SECONDS = REGISTRY.histogram(
+    'zoe_parse_article_duration_seconds', 'Time to parse one article of the ZOE page', ['backend'],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+)
+UPSTREAM_FETCH_SECONDS = REGISTRY.histogram(
+    'zoe_upstream_fetch_duration_seconds', 'Duration of a single request to the ZOE website'
+)
+UPSTREAM_FETCHES = REGISTRY.counter(
+    'zoe_upstream_fetches', 'Requests to the ZOE website by HTTP status (timeout, error)', ['status']
+)
+UPSTREAM_BYTES = REGISTRY.counter('zoe_upstream_response_bytes', 'Bytes received from the ZOE website')
+UPSTREAM_RETRIES = REGISTRY.counter('zoe_upstream_retries', 'Retried requests to the ZOE website')
 
-    BASE_URL = "https://www.zoe.com.ua/outage/"
-    TIMEOUT = 30  # Increased from 10 to 30 seconds
-    MAX_RETRIES = 3
+CONTENT_CLASS_RE = re.compile(r'content|entry')
+# Upstream overloaded or unavailable - worth a retry and counted by the circuit breaker
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# WordPress listing pagination: /outage/page/2/
+PAGE_LINK_RE = re.compile(r'/page/(\d+)/')
+TITLE_TAGS = ('h1', 'h2', 'h3', 'h4')
+# Matches BeautifulSoup.get_text(), which skips script/style contents
+SKIPPED_TEXT_TAGS = ('script', 'style', 'template')
+
+
+class HtmlParserBackend:
+    """Повне дерево BeautifulSoup + html.parser (еталонна реалізація)"""
+
+    name = 'html.parser'
+    available = True
+
+    def articles(self, html: str) -> list:
+        return BeautifulSoup(html, 'html.parser').find_all('article')
+
+    def fields(self, article) -> Tuple[str, str, Optional[str]]:
+        """(заголовок, дата, текст вмісту або None) для однієї статті"""
+        title = ''
+        title_elem = article.find(list(TITLE_TAGS))
+        if title_elem:
+            title = title_elem.get_text(strip=True)
+
+        date = ''
+        date_elem = article.find('time')
+        if date_elem:
+            date = date_elem.get('datetime', date_elem.get_text(strip=True))
+
+        content = None
+        content_elem = article.find(['div', 'section'], class_=CONTENT_CLASS_RE)
+        if content_elem:
+            content = content_elem.get_text(separator='\n', strip=True)
+
+        return title, date, content
+
+
+class SoupStrainerBackend(HtmlParserBackend):
+    """BeautifulSoup будує лише піддерева <article>, решта сторінки пропускається"""
+
+    name = 'soupstrainer'
+
+    def articles(self, html: str) -> list:
+        return BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('article')).find_all('article')
+
+
+class LxmlBackend:
+    """libxml2 через lxml.html"""
+
+    name = 'lxml'
+    available = LXML_AVAILABLE
 
     def __init__(self):
-        self.session = requests.Session()
-        self.session.verify = False
-        # Add User-Agent to avoid being blocked
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'uk-UA,uk;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive'
-        })
+        self._title = etree.XPath('(.//h1|.//h2|.//h3|.//h4)[1]')
+        self._time = etree.XPath('(.//time)[1]')
+        self._content = etree.XPath(
+            "(.//*[self::div or self::section][re:test(@class, 'content|entry')])[1]",
+            namespaces={'re': 'http://exslt.org/regular-expressions'}
+        )
 
-    def fetch_schedules(self) -> List[Dict]:
-        """Отримати всі графіки зі сторінки"""
-        last_error = None
+    def articles(self, html: str) -> list:
+        return list(lxml.html.fromstring(html).iter('article'))
 
-        # Retry logic with exponential backoff
-        for attempt in range(self.MAX_RETRIES):
-            try:
-                if attempt > 0:
-                    import time
-                    wait_time = 2 ** attempt  # 2, 4, 8 seconds
-                    logger.info(f"Retry attempt {attempt + 1}/{self.MAX_RETRIES} after {wait_time}s")
-                    time.sleep(wait_time)
+    @staticmethod
+    def _text(element, separator: str) -> str:
+        parts = []
 
-                logger.info(f"Fetching schedules from {self.BASE_URL} (attempt {attempt + 1})")
-                response = self.session.get(self.BASE_URL, timeout=self.TIMEOUT)
-                response.raise_for_status()
+        def walk(node):
+            if isinstance(node.tag, str) and node.tag not in SKIPPED_TEXT_TAGS:
+                if node.text:
+                    parts.append(node.text)
+                for child in node:
+                    walk(child)
+                    if child.tail:
+                        parts.append(child.tail)
 
-                soup = BeautifulSoup(response.text, 'html.parser')
-                articles = soup.find_all('article')
+        walk(element)
+        return separator.join(part.strip() for part in parts if part.strip())
 
-                logger.info(f"Found {len(articles)} articles")
+    def fields(self, article) -> Tuple[str, str, Optional[str]]:
+        title_elems = self._title(article)
+        title = self._text(title_elems[0], '') if title_elems else ''
 
-                schedules = []
-                for idx, article in enumerate(articles):
-                    schedule = self._parse_article(article, idx)
-                    if schedule:
-                        schedules.append(schedule)
+        date = ''
+        date_elems = self._time(article)
+        if date_elems:
+            date = date_elems[0].get('datetime')
+            if date is None:
+                date = self._text(date_elems[0], '')
 
-                return schedules
+        content_elems = self._content(article)
+        content = self._text(content_elems[0], '\n') if content_elems else None
 
-            except requests.exceptions.Timeout as e:
-                last_error = e
-                logger.warning(f"Timeout on attempt {attempt + 1}: {e}")
-                continue
-            except requests.exceptions.RequestException as e:
-                last_error = e
-                logger.error(f"Request error on attempt {attempt + 1}: {e}")
-                if attempt == self.MAX_RETRIES - 1:
-                    break
-                continue
-            except Exception as e:
-                logger.error(f"Unexpected error: {e}")
-                raise
+        return title, date, content
+
+
+class SelectolaxBackend:
+    """lexbor через selectolax"""
+
+    name = 'selectolax'
+    available = SELECTOLAX_AVAILABLE
+
+    def articles(self, html: str) -> list:
+        return LexborHTMLParser(html).css('article')
+
+    def fields(self, article) -> Tuple[str, str, Optional[str]]:
+        title_elem = article.css_first(', '.join(TITLE_TAGS))
+        title = title_elem.text(separator='', strip=True) if title_elem else ''
+
+        date = ''
+        date_elem = article.css_first('time')
+        if date_elem:
+            date = date_elem.attributes.get('datetime')
+            if date is None:
+                date = date_elem.text(separator='', strip=True)
+
+        content = None
+        for elem in article.css('div, section'):
+            if CONTENT_CLASS_RE.search(elem.attributes.get('class') or ''):
+                elem.strip_tags(list(SKIPPED_TEXT_TAGS))
+                content = elem.text(separator='\n', strip=True, skip_empty=True)
+                break
+
+        return title, date, content
+
+
+HTML_BACKENDS = {
+    backend.name: backend
+    for backend in (SelectolaxBackend, LxmlBackend, SoupStrainerBackend, HtmlParserBackend)
+}
+
+
+def available_html_backends() -> List[str]:
+    """Встановлені backends, від найшвидшого до еталонного"""
+    return [name for name, backend in HTML_BACKENDS.items() if backend.available]
+
+
+def get_html_backend(name: Optional[str] = None):
+    """Backend за назвою або найшвидший з доступних"""
+    if name is None:
+        name = available_html_backends()[0]
 
-        # All retries failed
-        logger.error(f"Failed after {self.MAX_RETRIES} attempts. Last error: {last_error}")
-        raise Exception(f"Failed to fetch schedules after {self.MAX_RETRIES} attempts: {str(last_error)}")
+    backend = HTML_BACKENDS.get(name)
+    if backend is None or not backend.available:
+        raise ValueError(f"HTML backend '{name}' is not available. Available: {available_html_backends()}")
+    return backend()
 
-    def _parse_article(self, article, index: int) -> Optional[Dict]:
+
+class BaseScraper:
+    """Спільна логіка парсингу графіків відключень з ZOE.COM.UA"""
+
+    BASE_URL = "https://www.zoe.com.ua/outage/"
+    # ZOE answers slowly under load, but a connection that doesn't open in seconds won't open at all
+    CONNECT_TIMEOUT = 5
+    READ_TIMEOUT = 15
+    MAX_RETRIES = 3
+    # Upper bound for one fetch including retries, backoff and waiting for the rate cap
+    FETCH_DEADLINE = 30
+    DEFAULT_QUEUES = ['1.1', '1.2', '2.1', '2.2', '3.1', '3.2', '4.1', '4.2', '5.1', '5.2', '6.1', '6.2']
+
+    # Add User-Agent to avoid being blocked
+    HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'uk-UA,uk;q=0.9,en;q=0.8',
+        'Accept-Encoding': 'gzip, deflate',
+    }
+
+    def __init__(self, html_backend: Optional[str] = None):
+        """
+        Args:
+            html_backend: selectolax, lxml, soupstrainer або html.parser (за замовчуванням - найшвидший встановлений)
+        """
+        self.html_backend = get_html_backend(html_backend)
+
+        # How many of the page's articles the last parse actually had to process
+        self.last_parse_stats = {'articles': 0, 'parsed': 0}
+
+    def iter_schedules(self, html: str) -> Iterator[Dict]:
+        """Лінивий потік графіків: кожна стаття розбирається лише тоді, коли до неї дійшли"""
+        articles = self.html_backend.articles(html)
+        parsed_at = datetime.now().isoformat()
+
+        logger.info(f"Found {len(articles)} articles ({self.html_backend.name})")
+
+        stats = self.last_parse_stats = {'articles': len(articles), 'parsed': 0}
+        backend = self.html_backend.name
+        for idx, article in enumerate(articles):
+            stats['parsed'] += 1
+            started = time.perf_counter()
+            schedule = self._parse_article(article, idx, parsed_at)
+            PARSE_ARTICLE_SECONDS.observe(time.perf_counter() - started, backend)
+            if schedule:
+                yield schedule
+
+    def parse_page(self, html: str) -> List[Dict]:
+        """Розібрати HTML сторінки на список графіків"""
+        return list(self.iter_schedules(html))
+
+    def parse_latest_schedule(self, html: str) -> Optional[Dict]:
+        """Розібрати сторінку лише до першого актуального графіку"""
+        latest = self.select_latest_schedule(self.iter_schedules(html))
+
+        stats = self.last_parse_stats
+        logger.info(
+            f"Latest schedule found after parsing {stats['parsed']}/{stats['articles']} articles "
+            f"({stats['articles'] - stats['parsed']} skipped)"
+        )
+        return latest
+
+    def _parse_article(self, article, index: int, parsed_at: str) -> Optional[Dict]:
         """Парсинг окремої статті"""
         try:
             schedule_data = {
@@ -88,34 +274,24 @@ class ScraperService:
                 'content_text': '',
                 'queues': [],
                 'times': [],
-                'parsed_at': datetime.now().isoformat()
+                'queue_times': {},
+                'parsed_at': parsed_at
             }
 
-            # Get title
-            title_elem = article.find(['h1', 'h2', 'h3', 'h4'])
-            if title_elem:
-                schedule_data['title'] = title_elem.get_text(strip=True)
-
-            # Get date
-            date_elem = article.find('time')
-            if date_elem:
-                schedule_data['date'] = date_elem.get('datetime', date_elem.get_text(strip=True))
+            title, date, text = self.html_backend.fields(article)
+            schedule_data['title'] = title
+            schedule_data['date'] = date
 
-            # Get content
-            content_elem = article.find(['div', 'section'], class_=re.compile(r'content|entry'))
-            if content_elem:
-                text = content_elem.get_text(separator='\n', strip=True)
+            if text is not None:
                 schedule_data['content_text'] = text
 
-                # Find queue numbers (1.1, 1.2, etc.)
-                queue_pattern = r'(\d+\.\d+)'
-                queues_found = re.findall(queue_pattern, text)
-                schedule_data['queues'] = list(set(queues_found))  # Unique
+                # Queue -> time ranges, tokenized once per article (1.1: 03:00 – 08:00, ...)
+                queue_times = parse_queue_intervals(text)
+                schedule_data['queue_times'] = queue_times
+                schedule_data['queues'] = sorted(queue_times)
 
-                # Find time ranges (00:00-04:30 or з 00:00 до 04:30)
-                time_pattern = r'(\d{1,2}:\d{2})\s*[-–—до]\s*(\d{1,2}:\d{2})'
-                times_found = re.findall(time_pattern, text)
-                schedule_data['times'] = [[start, end] for start, end in times_found[:20]]
+                # All time ranges (00:00-04:30 or з 00:00 до 04:30)
+                schedule_data['times'] = find_time_ranges(text)[:20]
 
             return schedule_data
 
@@ -123,32 +299,60 @@ class ScraperService:
             logger.warning(f"Failed to parse article {index}: {e}")
             return None
 
-    def get_latest_schedule(self) -> Optional[Dict]:
-        """Отримати найсвіжіший актуальний графік"""
-        schedules = self.fetch_schedules()
-
-        if not schedules:
-            return None
+    @staticmethod
+    def page_url(source: str, page: int) -> str:
+        """URL сторінки пагінації джерела: /outage/ -> /outage/page/2/"""
+        if page <= 1:
+            return source
+        return f"{source.rstrip('/')}/page/{page}/"
+
+    @staticmethod
+    def page_numbers(html: str) -> List[int]:
+        """Номери сторінок з блоку пагінації (порожньо, якщо його немає)"""
+        start = html.find('pagination')
+        if start < 0:
+            return []
+        end = html.find('</nav>', start)
+        return sorted({int(n) for n in PAGE_LINK_RE.findall(html[start:end if end > 0 else None])})
+
+    def parse_listing(self, html: str) -> List[Dict]:
+        """Розібрати сторінку списку статей, не змінюючи last_parse_stats основного запиту"""
+        articles = self.html_backend.articles(html)
+        parsed_at = datetime.now().isoformat()
+        schedules = []
+        for idx, article in enumerate(articles):
+            schedule = self._parse_article(article, idx, parsed_at)
+            if schedule:
+                schedules.append(schedule)
+        return schedules
+
+    def select_latest_schedule(self, schedules: Iterable[Dict]) -> Optional[Dict]:
+        """
+        Вибрати найсвіжіший актуальний графік з розібраних статей.
+        Приймає і список, і лінивий потік: прохід зупиняється на першому актуальному графіку.
+        """
+        first = None
+        fallback = None
 
-        # Find first schedule with queues and times
         for schedule in schedules:
+            if first is None:
+                first = schedule
+
+            # Find first schedule with queues and times
             if schedule.get('queues') and schedule.get('times'):
                 # Check if it's not a cancellation notice
                 title_lower = schedule.get('title', '').lower()
                 if 'скасовано' not in title_lower and 'увага' not in title_lower:
                     return schedule
 
-        # If no active schedule found, return first one with data
-        for schedule in schedules:
-            if schedule.get('queues') and schedule.get('times'):
-                return schedule
+                # If no active schedule found, return first one with data
+                if fallback is None:
+                    fallback = schedule
 
-        return schedules[0] if schedules else None
-
-    def get_queue_schedule(self, queue_id: str) -> Optional[Dict]:
-        """Отримати графік для конкретної черги"""
-        latest = self.get_latest_schedule()
+        return fallback or first
 
+    def build_queue_schedule(self, latest: Optional[Dict], queue_id: str) -> Optional[Dict]:
+        """Побудувати графік черги з уже вибраного актуального графіку"""
         if not latest:
             return None
 
@@ -162,16 +366,15 @@ class ScraperService:
                 'message': f'Черга {queue_id} не знайдена в поточному графіку'
             }
 
-        # Extract times for this queue
-        # Note: This is simplified - in real implementation you'd need to parse
-        # the content more carefully to match times to specific queues
-        outages = []
-        for time_range in latest.get('times', [])[:10]:  # Limit to reasonable number
-            if len(time_range) == 2:
-                outages.append({
-                    'start': time_range[0],
-                    'end': time_range[1]
-                })
+        queue_times = latest.get('queue_times')
+        if queue_times is None:
+            # Schedules cached before per-queue parsing existed
+            queue_times = parse_queue_intervals(latest.get('content_text', ''))
+
+        outages = [
+            {'start': start, 'end': end}
+            for start, end in queue_times.get(queue_id, [])
+        ]
 
         return {
             'queue': queue_id,
@@ -187,24 +390,406 @@ class ScraperService:
         Парсинг часів для конкретної черги з тексту
         Приклад: "1.1: 03:00 – 08:00, 12:00 – 17:00"
         """
-        times = []
+        return [(start, end) for start, end in parse_queue_intervals(content).get(queue_id, [])]
+
+    def list_queues(self, latest: Optional[Dict]) -> List[str]:
+        """Список черг з уже вибраного актуального графіку"""
+        if latest and latest.get('queues'):
+            return sorted(latest.get('queues', []))
+        return list(self.DEFAULT_QUEUES)
+
+
+class AsyncScraperService(BaseScraper):
+    """Асинхронний сервіс для парсингу графіків з пулом з'єднань (keep-alive, HTTP/2)"""
+
+    MAX_CONNECTIONS = 10
+    MAX_KEEPALIVE_CONNECTIONS = 5
+
+    # Crawl of several sources / pagination pages: pages in flight overall and per host
+    CRAWL_WORKERS = 8
+    MAX_PER_HOST = 4
+
+    def __init__(
+        self,
+        html_backend: Optional[str] = None,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        crawl_rate_limiter: Optional[HostRateLimiter] = None,
+        sources: Optional[Iterable[str]] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        verify_tls: bool = False
+    ):
+        """
+        Args:
+            html_backend: Бекенд розбору HTML
+            rate_limiter: Обмеження запитів до хоста ZOE (за замовчуванням без обмеження)
+            crawl_rate_limiter: Окреме, нижче обмеження для crawl, щоб backfill не займав місця
+                основного опитування (за замовчуванням без обмеження)
+            sources: Сторінки зі списками статей для crawl (за замовчуванням - BASE_URL)
+            breaker: Автомат, що припиняє запити до ZOE після серії невдач
+            retry_budget: Спільний ліміт повторів (без нього - до MAX_RETRIES спроб на кожен виклик)
+            connect_timeout: Таймаут з'єднання, с (за замовчуванням CONNECT_TIMEOUT)
+            read_timeout: Таймаут читання відповіді, с (за замовчуванням READ_TIMEOUT)
+            verify_tls: Перевіряти сертифікат ZOE. За замовчуванням вимкнено, як і в початковому
+                скрапері: з сертифікатом сайту є проблеми, і з перевіркою запити падають
+                (див. INVESTIGATION_SUMMARY.md)
+        """
+        super().__init__(html_backend)
+        self._client: Optional[httpx.AsyncClient] = None
+        self.rate_limiter = rate_limiter
+        self.crawl_rate_limiter = crawl_rate_limiter
+        self.breaker = breaker
+        self.retry_budget = retry_budget
+        self.timeout = httpx.Timeout(
+            read_timeout or self.READ_TIMEOUT, connect=connect_timeout or self.CONNECT_TIMEOUT
+        )
+        self.sources = tuple(sources) if sources else ()
+        self.verify_tls = verify_tls
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self.last_crawl_stats: Dict = {}
+
+        # Validators of the last successfully parsed page
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._body_hash: Optional[str] = None
+        self._html: Optional[str] = None
+
+        # Parse results of the current page body ('all' / 'latest'), dropped when it changes
+        self._parsed: Dict[str, object] = {}
+
+        # modified / not_modified (304) / unchanged (same body hash)
+        self.last_fetch_status: Optional[str] = None
+
+    def _conditional_headers(self) -> Dict[str, str]:
+        """Заголовки умовного запиту (лише коли є що повернути на 304)"""
+        headers = {}
+        if self._html is not None:
+            if self._etag:
+                headers['If-None-Match'] = self._etag
+            if self._last_modified:
+                headers['If-Modified-Since'] = self._last_modified
+        return headers
+
+    @property
+    def last_modified(self) -> Optional[datetime]:
+        """Last-Modified останньої успішно завантаженої сторінки"""
+        if not self._last_modified:
+            return None
+        try:
+            return parsedate_to_datetime(self._last_modified)
+        except (TypeError, ValueError):
+            return None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Пул з'єднань створюється ліниво, в event loop, який його використовує"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self.HEADERS,
+                timeout=self.timeout,
+                verify=self.verify_tls,
+                http2=HTTP2_AVAILABLE,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.MAX_CONNECTIONS,
+                    max_keepalive_connections=self.MAX_KEEPALIVE_CONNECTIONS
+                )
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Закрити пул з'єднань"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        retry: bool = False,
+        crawl: bool = False,
+        deadline: Optional[float] = None
+    ) -> httpx.Response:
+        """
+        Один GET до ZOE через ліміт запитів до хоста (для crawl - окремий), автомат (поки він
+        розімкнений - CircuitOpenError без запиту) та метрики. Якщо місце в ліміті звільниться лише
+        після deadline (time.monotonic()) - RateLimitedError без запиту. Таймаути, помилки з'єднання,
+        відповіді 5xx/429 та неочікувані винятки рахуються автоматом як невдачі; скасований запит лише
+        звільняє пробний слот. Допущений автоматом перший запит (retry=False) поповнює бюджет повторів.
+        """
+        rate_limiter = self.crawl_rate_limiter if crawl else self.rate_limiter
+        if rate_limiter is not None:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            await rate_limiter.acquire(urlsplit(url).netloc, timeout)
+        # After the rate limiter, so a half-open trial slot isn't held while waiting
+        if self.breaker is not None:
+            self.breaker.before_call()
+        if self.retry_budget is not None and not retry:
+            self.retry_budget.record_request()
+
+        started = time.perf_counter()
+        try:
+            response = await self._get_client().get(url, headers=headers)
+        except BaseException as e:
+            if isinstance(e, httpx.HTTPError):
+                UPSTREAM_FETCHES.inc('timeout' if isinstance(e, httpx.TimeoutException) else 'error')
+            if self.breaker is not None:
+                if isinstance(e, Exception):
+                    self.breaker.record_failure()
+                else:
+                    # Cancelled - no verdict on ZOE, but the half-open trial slot must not leak
+                    self.breaker.release()
+            raise
+        finally:
+            UPSTREAM_FETCH_SECONDS.observe(time.perf_counter() - started)
+        UPSTREAM_FETCHES.inc(str(response.status_code))
+        UPSTREAM_BYTES.inc(amount=len(response.content))
+
+        if self.breaker is not None:
+            if response.status_code in RETRYABLE_STATUSES:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+        return response
+
+    async def _fetch_page(self) -> str:
+        """Завантажити сторінку (умовним запитом); last_fetch_status показує, чи вона змінилась"""
+        last_error = None
+        deadline = time.monotonic() + self.FETCH_DEADLINE
+
+        attempts = 0
+        for attempt in range(self.MAX_RETRIES):
+            if attempt > 0:
+                # Jittered backoff, within the overall deadline and the retry budget shared by all callers
+                wait_time = backoff_delay(attempt)
+                if time.monotonic() + wait_time >= deadline:
+                    logger.warning(f"Fetch deadline of {self.FETCH_DEADLINE}s reached, not retrying")
+                    break
+                if self.retry_budget is not None and not self.retry_budget.try_retry():
+                    logger.warning("Upstream retry budget exhausted, not retrying")
+                    break
+                UPSTREAM_RETRIES.inc()
+                logger.info(f"Retry attempt {attempt + 1}/{self.MAX_RETRIES} after {wait_time:.2f}s")
+                await asyncio.sleep(wait_time)
+
+            attempts += 1
+            logger.info(f"Fetching schedules from {self.BASE_URL} (attempt {attempt + 1})")
+            try:
+                response = await self._get(
+                    self.BASE_URL, headers=self._conditional_headers(), retry=attempt > 0, deadline=deadline
+                )
+                if response.status_code in RETRYABLE_STATUSES:
+                    response.raise_for_status()
+            except (CircuitOpenError, RateLimitedError) as e:
+                if last_error is None:
+                    # Rejected before any request was made
+                    raise
+                # Our own failed attempts opened the circuit or used up the deadline - report them, not the rejection
+                attempts -= 1
+                logger.warning(f"{e}, not retrying")
+                break
+            except httpx.TimeoutException as e:
+                last_error = e
+                logger.warning(f"Timeout on attempt {attempt + 1}: {e}")
+                continue
+            except httpx.HTTPError as e:
+                last_error = e
+                logger.error(f"Request error on attempt {attempt + 1}: {e}")
+                continue
+
+            if response.status_code == 304 and self._html is not None:
+                logger.info("Upstream page not modified (304), reusing parsed schedules")
+                self.last_fetch_status = 'not_modified'
+                return self._html
+
+            # Other client errors won't go away on a retry
+            response.raise_for_status()
+
+            # Servers without validators: skip parsing if the body is byte-identical
+            body_hash = hashlib.sha256(response.content).hexdigest()
+            if body_hash == self._body_hash and self._html is not None:
+                logger.info("Upstream page unchanged (same content hash), skipping parse")
+                self.last_fetch_status = 'unchanged'
+            else:
+                self._html = response.text
+                self._body_hash = body_hash
+                self._parsed = {}
+                self.last_fetch_status = 'modified'
+
+            self._etag = response.headers.get('ETag')
+            self._last_modified = response.headers.get('Last-Modified')
+            return self._html
+
+        # httpx timeouts have an empty message, so name the error type
+        reason = f"{type(last_error).__name__}: {last_error}".rstrip(': ')
+        logger.error(f"Failed after {attempts} attempt(s). Last error: {reason}")
+        raise Exception(f"Failed to fetch schedules after {attempts} attempt(s): {reason}")
+
+    @staticmethod
+    async def _parse_in_thread(parse: Callable[[str], T], html: str) -> T:
+        """Розібрати сторінку в окремому потоці: розбір навантажує CPU і не повинен зупиняти event loop"""
+        return await asyncio.to_thread(parse, html)
+
+    async def _fetch_listing(self, url: str) -> Optional[str]:
+        """Одна сторінка для crawl (без умовних заголовків і повторів); None, якщо її немає (404)"""
+        host = urlsplit(url).netloc
+        slots = self._host_slots.get(host)
+        if slots is None:
+            slots = self._host_slots[host] = asyncio.Semaphore(self.MAX_PER_HOST)
+
+        async with slots:
+            response = await self._get(url, crawl=True)
+
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.text
+
+    async def crawl(self, max_pages: int = 1, sources: Optional[Iterable[str]] = None) -> List[Dict]:
+        """
+        Завантажити та розібрати до max_pages сторінок пагінації кожного джерела паралельно
+        (не більше CRAWL_WORKERS сторінок одночасно і MAX_PER_HOST на хост, спільний пул з'єднань).
+        Номери сторінок беруться з блоку пагінації кожної завантаженої сторінки (до найбільшого в ньому).
+        Повертає об'єднаний список графіків без дублікатів, від новіших сторінок до старіших.
+        """
+        sources = list(sources or self.sources or (self.BASE_URL,))
+        workers = asyncio.Semaphore(self.CRAWL_WORKERS)
+        started = time.perf_counter()
+
+        results: Dict[Tuple[int, int], List[Dict]] = {}
+        failed: List[str] = []
+        scheduled = set()
+        pending: Dict[asyncio.Task, Tuple[int, int]] = {}
+
+        async def fetch(source_index: int, page: int) -> Optional[str]:
+            async with workers:
+                return await self._fetch_listing(self.page_url(sources[source_index], page))
+
+        def schedule(source_index: int, page: int) -> None:
+            if page <= max_pages and (source_index, page) not in scheduled:
+                scheduled.add((source_index, page))
+                pending[asyncio.create_task(fetch(source_index, page))] = (source_index, page)
+
+        for source_index in range(len(sources)):
+            schedule(source_index, 1)
+
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                source_index, page = pending.pop(task)
+                try:
+                    html = task.result()
+                except Exception as e:
+                    failed.append(self.page_url(sources[source_index], page))
+                    logger.warning(f"Failed to crawl {failed[-1]}: {e}")
+                    continue
+                if html is None:
+                    continue
+
+                # WordPress elides the middle of the list ("1 2 3 … 40"), so fill the gap up to the last one
+                numbers = self.page_numbers(html)
+                for number in range(2, (numbers[-1] if numbers else 1) + 1):
+                    schedule(source_index, number)
+                results[(source_index, page)] = await self._parse_in_thread(self.parse_listing, html)
+
+        # Listing order: sources as given, newer pages first; keep the first copy of a repeated article
+        merged, seen, duplicates = [], set(), 0
+        for key in sorted(results):
+            for schedule_data in results[key]:
+                identity = (schedule_data['title'], schedule_data['date'], schedule_data['content_text'])
+                if identity in seen:
+                    duplicates += 1
+                    continue
+                seen.add(identity)
+                merged.append({**schedule_data, 'index': len(merged)})
+
+        self.last_crawl_stats = {
+            'sources': len(sources),
+            'pages': len(results),
+            'failed': failed,
+            'schedules': len(merged),
+            'duplicates': duplicates,
+            'seconds': round(time.perf_counter() - started, 3)
+        }
+        logger.info(
+            f"Crawled {len(results)} page(s) from {len(sources)} source(s) in {self.last_crawl_stats['seconds']}s: "
+            f"{len(merged)} schedules, {duplicates} duplicates, {len(failed)} failed"
+        )
+        return merged
 
-        # Pattern to find queue-specific times
-        # Looking for "1.1: 03:00 – 08:00, 12:00 – 17:00"
-        pattern = rf'{re.escape(queue_id)}:\s*((?:\d{{1,2}}:\d{{2}}\s*[-–—]\s*\d{{1,2}}:\d{{2}},?\s*)+)'
+    async def fetch_schedules(self) -> List[Dict]:
+        """Отримати всі графіки зі сторінки"""
+        await self._fetch_page()
+        return await self.current_schedules()
+
+    async def current_schedules(self) -> List[Dict]:
+        """Всі графіки вже завантаженої сторінки, без нового запиту до ZOE"""
+        if self._html is None:
+            return []
+
+        if 'all' not in self._parsed:
+            self._parsed['all'] = await self._parse_in_thread(self.parse_page, self._html)
+        return self._parsed['all']
+
+    async def fetch_latest_schedule(self) -> Optional[Dict]:
+        """Отримати найсвіжіший актуальний графік, розбираючи статті лише до першого збігу"""
+        html = await self._fetch_page()
+
+        if 'latest' not in self._parsed:
+            if 'all' in self._parsed:
+                self._parsed['latest'] = self.select_latest_schedule(self._parsed['all'])
+            else:
+                self._parsed['latest'] = await self._parse_in_thread(self.parse_latest_schedule, html)
+        return self._parsed['latest']
+
+    async def get_latest_schedule(self) -> Optional[Dict]:
+        """Отримати найсвіжіший актуальний графік"""
+        return await self.fetch_latest_schedule()
 
-        match = re.search(pattern, content)
-        if match:
-            time_str = match.group(1)
-            # Extract all time ranges from this string
-            time_pattern = r'(\d{1,2}:\d{2})\s*[-–—]\s*(\d{1,2}:\d{2})'
-            times = re.findall(time_pattern, time_str)
+    async def get_queue_schedule(self, queue_id: str) -> Optional[Dict]:
+        """Отримати графік для конкретної черги"""
+        return self.build_queue_schedule(await self.get_latest_schedule(), queue_id)
 
-        return times
+    async def get_all_queues(self) -> List[str]:
+        """Отримати список всіх доступних черг"""
+        return self.list_queues(await self.get_latest_schedule())
+
+
+class ScraperService(BaseScraper):
+    """Синхронна обгортка над AsyncScraperService для CLI скриптів"""
+
+    def fetch_schedules(self) -> List[Dict]:
+        """Отримати всі графіки зі сторінки"""
+        return asyncio.run(self._run('fetch_schedules'))
+
+    def fetch_latest_schedule(self) -> Optional[Dict]:
+        """Отримати найсвіжіший актуальний графік, розбираючи статті лише до першого збігу"""
+        return asyncio.run(self._run('fetch_latest_schedule'))
+
+    def crawl(self, max_pages: int = 1, sources: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Графіки з кількох сторінок пагінації та джерел (див. AsyncScraperService.crawl)"""
+        return asyncio.run(self._run('crawl', max_pages, sources))
+
+    async def _run(self, method: str, *args):
+        scraper = AsyncScraperService(self.html_backend.name)
+        scraper.BASE_URL = self.BASE_URL
+        try:
+            result = await getattr(scraper, method)(*args)
+            self.last_parse_stats = scraper.last_parse_stats
+            return result
+        finally:
+            await scraper.aclose()
+
+    def get_latest_schedule(self) -> Optional[Dict]:
+        """Отримати найсвіжіший актуальний графік"""
+        return self.fetch_latest_schedule()
+
+    def get_queue_schedule(self, queue_id: str) -> Optional[Dict]:
+        """Отримати графік для конкретної черги"""
+        return self.build_queue_schedule(self.get_latest_schedule(), queue_id)
 
     def get_all_queues(self) -> List[str]:
         """Отримати список всіх доступних черг"""
-        latest = self.get_latest_schedule()
-        if latest and latest.get('queues'):
-            return sorted(latest.get('queues', []))
-        return ['1.1', '1.2', '2.1', '2.2', '3.1', '3.2', '4.1', '4.2', '5.1', '5.2', '6.1', '6.2']
+        return self.list_queues(self.get_latest_schedule())
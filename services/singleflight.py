@@ -0,0 +1,72 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Об'єднання одночасних викликів з однаковим ключем в одне виконання"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _key_stats(self, key: str) -> Dict[str, int]:
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = {
+                'calls': 0,
+                'executions': 0,
+                'coalesced': 0,
+                'errors': 0
+            }
+        return stats
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Виконати fn для ключа або приєднатися до вже запущеного виконання.
+        Всі учасники отримують один і той самий результат (або одну й ту саму помилку).
+
+        Args:
+            key: Ключ, за яким об'єднуються виклики
+            fn: Фабрика корутини, яка виконує реальну роботу
+        """
+        stats = self._key_stats(key)
+        stats['calls'] += 1
+
+        task = self._inflight.get(key)
+        if task is not None:
+            stats['coalesced'] += 1
+            logger.debug(f"Coalesced call for key: {key}")
+        else:
+            stats['executions'] += 1
+            # Run as a separate task so that a cancelled caller doesn't cancel the
+            # fetch the other callers are waiting on
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._on_done(key, t))
+
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+        # Retrieve the exception so it isn't reported as "never retrieved"
+        # when every waiter has already gone away
+        if not task.cancelled() and task.exception() is not None:
+            self._stats[key]['errors'] += 1
+
+    def get_stats(self) -> dict:
+        """Лічильники викликів: скільки запитів було об'єднано в одне виконання"""
+        totals = {'calls': 0, 'executions': 0, 'coalesced': 0, 'errors': 0}
+        for stats in self._stats.values():
+            for name, value in stats.items():
+                totals[name] += value
+
+        return {
+            **totals,
+            'in_flight': sorted(self._inflight),
+            'keys': {key: dict(stats) for key, stats in self._stats.items()}
+        }
@@ -0,0 +1,123 @@
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+MINUTES_PER_DAY = 24 * 60
+SLOT_MINUTES = 30
+SLOTS_PER_DAY = MINUTES_PER_DAY // SLOT_MINUTES
+
+
+def to_minutes(value: str) -> int:
+    """'08:30' -> 510, '24:00' -> 1440"""
+    hours, minutes = value.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def format_minutes(minutes: int) -> str:
+    """510 -> '08:30'; час наступного дня загортається (1530 -> '01:30')"""
+    if minutes != MINUTES_PER_DAY:
+        minutes %= MINUTES_PER_DAY
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def merge_intervals(intervals: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Відсортовані проміжки [початок, кінець) в межах доби без перетинів"""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+@dataclass(frozen=True)
+class QueueDay:
+    """
+    Доба черги у компактному вигляді: відсортовані хвилини початків/кінців відключень
+    та 48-бітна маска півгодинних слотів (біт i - відключення в [i*30, i*30+30) хв).
+    Перевірка "чи є світло" - O(1) по масці (якщо всі межі кратні 30 хв), інакше O(log n).
+    """
+
+    starts: Tuple[int, ...]
+    ends: Tuple[int, ...]
+    bitmap: int
+    aligned: bool
+
+    @classmethod
+    def from_outages(cls, outages: Sequence[dict]) -> "QueueDay":
+        """З [{'start': '22:00', 'end': '02:00'}, ...]; проміжок через північ ділиться на два"""
+        intervals = []
+        for outage in outages:
+            start, end = to_minutes(outage['start']), to_minutes(outage['end'])
+            if end > start:
+                intervals.append((start, end))
+            elif end < start:
+                intervals += [(start, MINUTES_PER_DAY), (0, end)]
+
+        merged = [(start, end) for start, end in merge_intervals(intervals) if end > start]
+
+        bitmap = 0
+        aligned = True
+        for start, end in merged:
+            aligned = aligned and start % SLOT_MINUTES == 0 and end % SLOT_MINUTES == 0
+            for slot in range(start // SLOT_MINUTES, -(-end // SLOT_MINUTES)):
+                bitmap |= 1 << slot
+
+        return cls(
+            starts=tuple(start for start, _ in merged),
+            ends=tuple(end for _, end in merged),
+            bitmap=bitmap,
+            aligned=aligned
+        )
+
+    @property
+    def slots(self) -> str:
+        """48 символів, '1' - відключення в цьому півгодинному слоті"""
+        return ''.join('1' if self.bitmap >> slot & 1 else '0' for slot in range(SLOTS_PER_DAY))
+
+    @property
+    def _wraps(self) -> bool:
+        # An outage running to midnight continues with the one starting at 00:00
+        return bool(self.starts) and self.starts[0] == 0 and self.ends[-1] == MINUTES_PER_DAY
+
+    def _index(self, minute: int) -> int:
+        """Індекс проміжку, що містить minute, або -1"""
+        i = bisect_right(self.starts, minute) - 1
+        return i if i >= 0 and minute < self.ends[i] else -1
+
+    def is_off(self, minute: int) -> bool:
+        """Чи діє відключення о цій хвилині доби"""
+        if self.aligned:
+            return bool(self.bitmap >> (minute // SLOT_MINUTES) & 1)
+        return self._index(minute) >= 0
+
+    def current_outage(self, minute: int) -> Optional[Tuple[int, int]]:
+        """(початок, кінець) відключення, що діє зараз; кінець після півночі - більший за 1440"""
+        i = self._index(minute)
+        if i < 0:
+            return None
+
+        start, end = self.starts[i], self.ends[i]
+        if self._wraps and end == MINUTES_PER_DAY and i != 0:
+            end = MINUTES_PER_DAY + self.ends[0]
+        elif self._wraps and i == 0 and len(self.starts) > 1:
+            start = self.starts[-1] - MINUTES_PER_DAY
+        return start, end
+
+    def next_outage(self, minute: int) -> Optional[Tuple[int, int]]:
+        """Наступне відключення, що починається після minute (сьогодні або завтра)"""
+        if not self.starts:
+            return None
+
+        # The 00:00 part of a wrapping outage is not a new outage
+        first = 1 if self._wraps and len(self.starts) > 1 else 0
+        i = max(bisect_right(self.starts, minute), first)
+        day = 0
+        if i >= len(self.starts):
+            i, day = first, MINUTES_PER_DAY
+
+        start, end = self.starts[i], self.ends[i]
+        if self._wraps and end == MINUTES_PER_DAY and len(self.starts) > 1:
+            end += self.ends[0]
+        return start + day, end + day
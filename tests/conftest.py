@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# api.routes creates its cache and history under ./cache at import time - keep them out of the repo
+os.chdir(tempfile.mkdtemp(prefix='zoe-tests-'))
+# No politeness cap towards local stubs
+os.environ.setdefault("UPSTREAM_MAX_RPM", "0")
@@ -0,0 +1,52 @@
+from datetime import date
+
+import pytest
+
+from services.analytics import ScheduleMatrix
+
+pytest.importorskip("numpy")
+
+ROWS = [
+    ("2025-01-19", "1.1", [["22:00", "02:00"]]),
+    ("2025-01-19", "1.2", [["23:00", "01:00"]]),
+    ("2025-01-20", "1.1", [["10:00", "12:00"]]),
+]
+
+
+@pytest.fixture
+def matrix():
+    return ScheduleMatrix.from_rows(ROWS, date(2025, 1, 19), date(2025, 1, 21), slot_minutes=60)
+
+
+def test_outage_minutes_carry_overnight_outage_into_next_day(matrix):
+    summary = matrix.summary()
+
+    assert summary["dates"] == ["2025-01-19", "2025-01-20", "2025-01-21"]
+    # 22:00-24:00 on the 19th, 00:00-02:00 and 10:00-12:00 on the 20th, no schedule on the 21st
+    assert summary["queues"]["1.1"]["outage_minutes"] == [120, 240, None]
+    assert summary["queues"]["1.1"]["days_with_data"] == 2
+    # The 00:00-01:00 tail of 1.2 falls on a day without its schedule
+    assert summary["queues"]["1.2"]["outage_minutes"] == [60, None, None]
+
+
+def test_overlap_and_longest_supply(matrix):
+    summary = matrix.summary(include_slots=True)
+
+    assert summary["overlap_minutes"]["1.1"] == {"1.1": 360, "1.2": 60}
+    longest = summary["queues"]["1.1"]["longest_supply"]
+    assert (longest["start"].hour, longest["end"].hour, longest["minutes"]) == (0, 22, 22 * 60)
+    assert summary["queues"]["1.1"]["slots"][1] == "11" + "0" * 8 + "11" + "0" * 12
+    assert summary["queues"]["1.1"]["slots"][2] == "-" * 24
+
+
+def test_unknown_queue_rows_are_ignored():
+    matrix = ScheduleMatrix.from_rows(ROWS, date(2025, 1, 19), date(2025, 1, 19), slot_minutes=30, queues=["2.2"])
+
+    assert matrix.queues == ["2.2"]
+    assert not matrix.known.any()
+    assert matrix.longest_supply() == [None]
+
+
+def test_slot_size_must_split_the_day():
+    with pytest.raises(ValueError):
+        ScheduleMatrix.from_rows(ROWS, date(2025, 1, 19), date(2025, 1, 20), slot_minutes=7)
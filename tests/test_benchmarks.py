@@ -0,0 +1,43 @@
+import httpx
+
+from benchmarks.bench_pipeline import compare, flatten, time_op
+from benchmarks.harness import StubUpstream, percentile
+
+
+def test_stub_upstream_rotates_pages():
+    stub = StubUpstream("first", pages=["first", "second"], port=0).start()
+    try:
+        assert httpx.get(stub.url).text == "first"
+        stub.rotate = True
+        assert [httpx.get(stub.url).text for _ in range(2)] == ["first", "second"]
+        assert stub.requests == 3
+    finally:
+        stub.stop()
+
+
+def test_percentile():
+    values = list(range(100, 0, -1))
+
+    assert percentile(values, 50) == 51
+    assert percentile(values, 99) == 100
+    assert percentile([], 50) is None
+
+
+def test_time_op_reports_microseconds():
+    result = time_op(lambda: None, min_seconds=0.01, repeat=3)
+
+    assert set(result) == {"us_median", "us_best"}
+    assert 0 <= result["us_best"] <= result["us_median"]
+
+
+def test_compare_prints_relative_change_of_numeric_results(capsys):
+    baseline = {"results": {"http": {"hit": {"rps": 100, "p99_ms": 0, "ok": True}}, "gone": {"x": 1}}}
+    current = {"results": {"http": {"hit": {"rps": 150, "p99_ms": 2, "ok": True}}}}
+
+    assert flatten(current["results"]) == {"http.hit.rps": 150, "http.hit.p99_ms": 2}
+    compare(baseline, current)
+    lines = capsys.readouterr().out.splitlines()
+
+    assert len(lines) == 3
+    assert lines[1].split() == ["http.hit.p99_ms", "0", "2", "-"]
+    assert lines[2].split() == ["http.hit.rps", "100", "150", "+50.0%"]
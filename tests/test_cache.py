@@ -0,0 +1,130 @@
+import json
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.cache import MANIFEST_KEY, CacheService
+from services.cache_backends import get_cache_backend
+
+
+@pytest.fixture(params=["file", "shm"])
+def backend_options(request, tmp_path):
+    if request.param == "file":
+        return lambda: get_cache_backend("file", cache_dir=str(tmp_path))
+    return lambda: get_cache_backend("shm", directory=str(tmp_path / "shm"))
+
+
+def count_reads(cache: CacheService) -> list:
+    reads = []
+    read = cache.backend.read
+    cache.backend.read = lambda key: reads.append(key) or read(key)
+    return reads
+
+
+def test_shared_read_served_from_memory_until_backend_changes(backend_options):
+    leader = CacheService(backend=backend_options())
+    leader.set("latest_schedule", {"title": "v1"})
+    leader.flush()
+
+    follower = CacheService(backend=backend_options())
+    reads = count_reads(follower)
+    first, _ = follower.get_shared("latest_schedule")
+    second, _ = follower.get_shared("latest_schedule")
+    assert second is first
+    assert reads == ["latest_schedule"]
+
+    # Another worker rewrites the entry - the next shared read goes to the backend
+    leader.set("latest_schedule", {"title": "v2"})
+    leader.flush()
+    assert follower.get_shared("latest_schedule")[0] == {"title": "v2"}
+    assert reads == ["latest_schedule", "latest_schedule"]
+
+
+def test_memory_tier_survives_concurrent_threads(tmp_path, monkeypatch):
+    cache = CacheService(backend=get_cache_backend("file", cache_dir=str(tmp_path)), max_entries=4)
+    cached_at = datetime.now() - timedelta(minutes=cache.ttl.total_seconds() / 60 + 1)
+    # Stale entries: get() reads the backend and drops expired ones, while others write and evict
+    monkeypatch.setattr(cache, "_load", lambda key: None)
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    errors = []
+
+    def worker(offset: int) -> None:
+        try:
+            for i in range(3000):
+                key = f"k{(i + offset) % 6}"
+                cache._remember(key, i, cached_at if i % 2 else datetime.now(), version=i)
+                cache.get(key)
+                cache.get_shared(f"k{(i + offset + 1) % 6}")
+                if i % 50 == 0:
+                    cache.clear(key)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert errors == []
+    assert len(cache._memory) <= cache.max_entries
+
+
+def test_manifest_restores_index_and_picks_up_unlisted_entries(tmp_path):
+    cache = CacheService(cache_dir=str(tmp_path))
+    cache.set("latest_schedule", {"title": "v1"})
+    cache.close()
+
+    # Stored by another worker that has not saved its manifest yet
+    body = json.dumps({"cached_at": datetime.now().isoformat(), "data": {"queue": "1.1"}}).encode("utf-8")
+    cache.backend.write("queue:1.1", body, 60)
+
+    restarted = CacheService(cache_dir=str(tmp_path))
+    info = restarted.get_cache_info()
+    assert info["total_files"] == 2
+    assert restarted._index["latest_schedule"].stored_at == cache._index["latest_schedule"].stored_at
+    assert restarted._index["queue:1.1"].size == len(body)
+
+
+def test_corrupt_manifest_is_rebuilt_from_entries(tmp_path):
+    cache = CacheService(cache_dir=str(tmp_path))
+    cache.set("latest_schedule", {"title": "v1"})
+    cache.close()
+    cache.backend.write(MANIFEST_KEY, b"{not json", 60)
+
+    restarted = CacheService(cache_dir=str(tmp_path))
+
+    assert set(restarted._index) == {"latest_schedule"}
+    assert restarted._index_dirty
+
+
+def test_sweep_removes_expired_entries_only(tmp_path):
+    cache = CacheService(cache_dir=str(tmp_path), ttl_minutes=1, max_stale_minutes=1)
+    cache.set("old", {"v": 1}, cached_at=datetime.now() - timedelta(minutes=3))
+    cache.set("stale", {"v": 2}, cached_at=datetime.now() - timedelta(minutes=1, seconds=30))
+    cache.set("fresh", {"v": 3})
+    cache.flush()
+
+    assert cache.sweep() == 1
+    assert set(cache.backend.keys()) - {MANIFEST_KEY} == {"stale", "fresh"}
+    assert set(CacheService(cache_dir=str(tmp_path))._index) == {"stale", "fresh"}
+    assert cache.get_shared("stale")[0] == {"v": 2}
+
+
+def test_sweep_keeps_entry_rewritten_by_another_worker(tmp_path):
+    sweeper = CacheService(cache_dir=str(tmp_path), ttl_minutes=1)
+    sweeper.set("latest_schedule", {"title": "v1"}, cached_at=datetime.now() - timedelta(minutes=5))
+    sweeper.flush()
+
+    writer = CacheService(cache_dir=str(tmp_path), ttl_minutes=1)
+    writer.set("latest_schedule", {"title": "v2"})
+    writer.flush()
+
+    assert sweeper.sweep() == 0
+    assert sweeper._index["latest_schedule"].expires_at > datetime.now()
+    assert sweeper.get_shared("latest_schedule")[0] == {"title": "v2"}
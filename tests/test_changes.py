@@ -0,0 +1,44 @@
+from services.changes import diff_outages, diff_queue, diff_queues
+
+
+def outages(*intervals):
+    return [{'start': start, 'end': end} for start, end in intervals]
+
+
+def test_overlapping_interval_is_a_shift_and_the_rest_added_or_removed():
+    diff = diff_outages(
+        outages(('03:30', '07:30'), ('11:30', '14:30'), ('17:00', '18:00')),
+        outages(('11:30', '14:30'), ('04:00', '07:30'), ('20:00', '22:00'))
+    )
+
+    assert diff == {
+        'added': outages(('20:00', '22:00')),
+        'removed': outages(('17:00', '18:00')),
+        'shifted': [{'before': {'start': '03:30', 'end': '07:30'}, 'after': {'start': '04:00', 'end': '07:30'}}]
+    }
+
+
+def test_shift_of_outage_across_midnight():
+    diff = diff_outages(outages(('22:00', '02:00')), outages(('23:00', '01:00')))
+
+    assert diff['shifted'] == [{'before': {'start': '22:00', 'end': '02:00'}, 'after': {'start': '23:00', 'end': '01:00'}}]
+    assert diff['added'] == diff['removed'] == []
+
+
+def test_unchanged_queue_has_no_diff():
+    queue = {'status': 'active', 'outages': outages(('08:00', '10:00'))}
+
+    assert diff_queue(queue, dict(queue)) is None
+
+
+def test_queues_that_appear_or_disappear():
+    before = {'1.1': {'status': 'active', 'outages': outages(('08:00', '10:00'))}}
+    after = {'2.2': {'status': 'active', 'outages': outages(('12:00', '14:00'))}}
+
+    changes = diff_queues(before, after)
+
+    assert list(changes) == ['1.1', '2.2']
+    assert changes['1.1']['status_after'] is None
+    assert changes['1.1']['removed'] == outages(('08:00', '10:00'))
+    assert changes['2.2']['status_before'] is None
+    assert changes['2.2']['added'] == outages(('12:00', '14:00'))
@@ -0,0 +1,26 @@
+import json
+import os
+
+import pytest
+
+from benchmarks.harness import FIXTURES_DIR, load_fixture_pages
+from services.history import parse_schedule_date
+from services.scraper import BaseScraper
+
+PAGES = load_fixture_pages()
+
+
+@pytest.mark.parametrize("filename", sorted(PAGES))
+def test_fixture_dates_match_titles(filename):
+    for schedule in BaseScraper().parse_page(PAGES[filename]):
+        # Every fixture article is published on the day its title names
+        assert parse_schedule_date(schedule['title'], schedule['date']) == schedule['date'][:10], schedule['title']
+
+
+@pytest.mark.parametrize("filename", sorted(PAGES))
+def test_fixture_queue_times_match_expected(filename):
+    with open(os.path.join(FIXTURES_DIR, filename.replace('.html', '.expected.json')), encoding='utf-8') as f:
+        expected = json.load(f)
+
+    schedules = BaseScraper().parse_page(PAGES[filename])
+    assert [(s['title'], s['queue_times']) for s in schedules] == [(e['title'], e['queue_times']) for e in expected]
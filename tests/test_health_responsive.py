@@ -0,0 +1,121 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from api import routes
+from benchmarks.harness import StubUpstream, load_fixture_pages
+from main import app
+from services.cache import CacheService
+from services.refresher import ScheduleSnapshot
+
+UPSTREAM_DELAY = 1.5
+HEALTH_BOUND = 0.3
+
+
+def test_health_answers_while_upstream_is_slow(monkeypatch):
+    stub = StubUpstream(next(iter(load_fixture_pages().values())), port=0, delay=UPSTREAM_DELAY).start()
+    monkeypatch.setattr(routes.scraper, "BASE_URL", stub.url)
+    # A fresh connection pool bound to this test's event loop
+    monkeypatch.setattr(routes.scraper, "_client", None)
+    # No history backfill crawl after the refresh
+    monkeypatch.setattr(routes.refresher, "history", None)
+
+    async def scenario():
+        refresh = asyncio.create_task(routes.refresher.current(force_refresh=True))
+        await asyncio.sleep(0.1)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            started = time.perf_counter()
+            response = await client.get("/health")
+            elapsed = time.perf_counter() - started
+
+        assert response.status_code == 200
+        assert elapsed < HEALTH_BOUND
+        # The upstream fetch was still in flight the whole time
+        assert not refresh.done()
+
+        snapshot, _ = await refresh
+        assert snapshot.latest is not None
+        await routes.scraper.aclose()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        stub.stop()
+
+
+def test_cache_clear_waiting_for_writer_keeps_loop_free(monkeypatch, tmp_path):
+    cache = CacheService(cache_dir=str(tmp_path))
+    monkeypatch.setattr(routes, "cache", cache)
+
+    async def scenario():
+        # A long sweep already occupies the writer thread
+        cache._writer.submit(time.sleep, UPSTREAM_DELAY)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            clear = asyncio.create_task(client.delete("/api/cache/clear"))
+            await asyncio.sleep(0.1)
+
+            started = time.perf_counter()
+            response = await client.get("/health")
+            assert response.status_code == 200
+            assert time.perf_counter() - started < HEALTH_BOUND
+            assert not clear.done()
+            assert (await clear).status_code == 200
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    """Воркер без лідерства, зі знімком з фікстури, підтвердженим щойно"""
+    page = next(iter(load_fixture_pages().values()))
+    snapshot = ScheduleSnapshot.from_latest(routes.scraper, routes.scraper.parse_latest_schedule(page))
+    monkeypatch.setattr(routes.refresher, "leader", None)
+    monkeypatch.setattr(routes.refresher, "snapshot", snapshot)
+    monkeypatch.setattr(routes.refresher, "verified_at", datetime.now())
+    monkeypatch.setattr(routes.refresher, "consecutive_failures", 0)
+    monkeypatch.setattr(routes.cache, "backend_error_at", None)
+    return routes.refresher
+
+
+def readiness():
+    return TestClient(app).get("/health/ready")
+
+
+def test_ready_with_fresh_snapshot(worker):
+    response = readiness()
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert response.json()["reasons"] == []
+
+
+def test_degraded_when_stale_and_upstream_failing(worker, monkeypatch):
+    monkeypatch.setattr(worker, "verified_at", datetime.now() - timedelta(seconds=worker.stale_after + 120))
+    monkeypatch.setattr(worker, "consecutive_failures", 3)
+
+    response = readiness()
+    body = response.json()
+
+    assert response.status_code == 200
+    assert body["status"] == "degraded" and body["ready"] and body["stale"]
+    assert "3 consecutive upstream failures" in body["reasons"]
+    assert any(reason.startswith("data not confirmed for") for reason in body["reasons"])
+
+
+def test_not_ready_without_usable_snapshot(worker, monkeypatch):
+    monkeypatch.setattr(worker, "snapshot", None)
+    response = readiness()
+    assert response.status_code == 503
+    assert response.json()["reasons"] == ["no snapshot loaded yet"]
+
+    monkeypatch.setattr(worker, "snapshot", ScheduleSnapshot.from_latest(routes.scraper, None))
+    monkeypatch.setattr(worker, "verified_at", datetime.now() - timedelta(seconds=worker.stale_after + worker.max_stale + 60))
+    response = readiness()
+    assert response.status_code == 503
+    assert response.json()["status"] == "not_ready"
@@ -0,0 +1,59 @@
+from datetime import datetime
+
+from services.history import HistoryService, parse_schedule_date
+
+
+def test_schedule_date_rolls_over_to_next_year():
+    assert parse_schedule_date('ГРАФІК ВІДКЛЮЧЕНЬ НА 2 СІЧНЯ', '2024-12-31T21:00:00') == '2025-01-02'
+
+
+def test_schedule_date_rolls_back_to_previous_year():
+    assert parse_schedule_date('ОНОВЛЕНИЙ ГРАФІК НА 31 ГРУДНЯ', '2025-01-01T00:30:00') == '2024-12-31'
+
+
+def test_schedule_date_same_year():
+    assert parse_schedule_date('ГРАФІК ВІДКЛЮЧЕНЬ НА 24 ЛИСТОПАДА', '2024-11-23T20:00:00') == '2024-11-24'
+
+
+def test_cancellation_notices_are_not_recorded(tmp_path):
+    history = HistoryService(db_path=str(tmp_path / 'history.db'))
+    cancelled = {
+        'title': 'УВАГА! ГПВ НА 5 БЕРЕЗНЯ СКАСОВАНО',
+        'date': '2025-03-04T20:00:00',
+        'queue_times': {'1.1': [], '6.2': []},
+    }
+    schedule = {
+        'title': 'ГРАФІК ВІДКЛЮЧЕНЬ НА 6 БЕРЕЗНЯ',
+        'date': '2025-03-05T20:00:00',
+        'queue_times': {'1.1': [['08:00', '10:00']]},
+    }
+
+    assert history.record(cancelled) is False
+    assert history.record_many([cancelled, schedule]) == 1
+    assert {row['date'] for row in history.query()} == {'2025-03-06'}
+
+
+def test_changes_since_cursor_and_queue_filter(tmp_path):
+    history = HistoryService(db_path=str(tmp_path / 'history.db'))
+    first = history.record_change({
+        'detected_at': '2025-03-05T20:00:00',
+        'schedule_date': '2025-03-06',
+        'title': 'ГРАФІК ВІДКЛЮЧЕНЬ НА 6 БЕРЕЗНЯ',
+        'queues': {'1.1': {'added': [{'start': '08:00', 'end': '10:00'}]}},
+    })
+    second = history.record_change({
+        'detected_at': '2025-03-05T22:00:00',
+        'schedule_date': '2025-03-06',
+        'title': 'ОНОВЛЕНИЙ ГРАФІК НА 6 БЕРЕЗНЯ',
+        'correction': True,
+        'queues': {'2.2': {'removed': [{'start': '12:00', 'end': '14:00'}]}},
+    })
+
+    assert [change['id'] for change in history.changes_since()] == [first, second]
+    assert [change['id'] for change in history.changes_since(since_id=first)] == [second]
+    assert history.changes_since(since_id=second) == []
+    assert [change['id'] for change in history.changes_since(since_time=datetime(2025, 3, 5, 21))] == [second]
+
+    only_first_queue = history.changes_since(queue='1.1')
+    assert [change['id'] for change in only_first_queue] == [first]
+    assert history.changes_since(limit=1)[0]['correction'] is True
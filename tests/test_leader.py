@@ -0,0 +1,71 @@
+from services.leader import RedisLeaderElection
+
+
+class StubRedis:
+    """
+    Мінімальний клієнт з інтерфейсом redis-py: SET NX PX, GET та скрипти RedisLeaderElection,
+    виконані атомарно, як це робить Redis. Час керується тестом (now, мс).
+    """
+
+    def __init__(self):
+        self.now = 0
+        self.data = {}
+
+    def _alive(self, key):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] <= self.now:
+            del self.data[key]
+            entry = None
+        return entry
+
+    def get(self, key):
+        entry = self._alive(key)
+        return entry[0] if entry else None
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and self._alive(key):
+            return None
+        self.data[key] = (value, self.now + px)
+        return True
+
+    def eval(self, script, numkeys, key, token, *args):
+        if self.get(key) != token:
+            return 0
+        if script == RedisLeaderElection.RENEW_SCRIPT:
+            self.data[key] = (token, self.now + int(args[0]))
+        elif script == RedisLeaderElection.RELEASE_SCRIPT:
+            del self.data[key]
+        else:
+            raise AssertionError("unexpected script")
+        return 1
+
+
+def test_acquire_renew_steal_and_release():
+    client = StubRedis()
+    first = RedisLeaderElection(client, ttl_seconds=10)
+    second = RedisLeaderElection(client, ttl_seconds=10)
+
+    assert first.try_acquire()
+    assert not second.try_acquire()
+
+    # Renewal pushes the expiry forward
+    client.now = 9_000
+    assert first.try_acquire()
+    client.now = 15_000
+    assert not second.try_acquire()
+    assert client.get("zoe:leader") == first.token
+
+    # The leader stalls past its lease - another worker takes over
+    client.now = 30_000
+    assert second.try_acquire()
+    assert second.is_leader
+
+    # The old leader neither renews nor deletes the stolen lock
+    assert not first.try_acquire()
+    first.release()
+    assert client.get("zoe:leader") == second.token
+    assert not first.is_leader
+
+    second.release()
+    assert client.get("zoe:leader") is None
+    assert first.try_acquire()
@@ -0,0 +1,55 @@
+from fastapi.testclient import TestClient
+
+from api.middleware import REQUESTS, REQUEST_SECONDS
+from main import app
+from services.metrics import MetricsRegistry
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram('latency_seconds', 'Latency', ['route'], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value, '/a')
+
+    lines = registry.render().splitlines()
+
+    assert '# TYPE latency_seconds histogram' in lines
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum{route="/a"} 4.05' in lines
+    assert 'latency_seconds_count{route="/a"} 4' in lines
+
+
+def test_counters_gauges_and_label_escaping():
+    registry = MetricsRegistry()
+    unlabelled = registry.counter('events', 'Events')
+    errors = registry.counter('errors', 'Errors', ['reason'])
+    errors.inc('bad "quote"\n', amount=2)
+    registry.gauge('age_seconds', 'Age', callback=lambda: None)
+    registry.gauge('ratio', 'Ratio', callback=lambda: 0.5)
+
+    # Re-registering returns the existing metric instead of a duplicate
+    assert registry.counter('events', 'Events') is unlabelled
+    lines = registry.render().splitlines()
+
+    assert 'events_total 0' in lines
+    assert 'errors_total{reason="bad \\"quote\\"\\n"} 2' in lines
+    assert not any(line.startswith('age_seconds ') for line in lines)
+    assert 'ratio 0.5' in lines
+
+
+def test_requests_are_counted_by_route_template():
+    client = TestClient(app)
+    before = REQUESTS.value('GET', '/api/schedules/changes', '400')
+    unmatched = REQUESTS.value('GET', 'unmatched', '404')
+
+    client.get('/api/schedules/changes?since=yesterday')
+    client.get('/no/such/path')
+    body = client.get('/metrics').text
+
+    assert REQUESTS.value('GET', '/api/schedules/changes', '400') == before + 1
+    assert REQUESTS.value('GET', 'unmatched', '404') == unmatched + 1
+    assert REQUEST_SECONDS.count('GET', '/api/schedules/changes') >= 1
+    assert '# TYPE zoe_http_request_duration_seconds histogram' in body
+    assert 'zoe_http_requests_total{method="GET",route="/api/schedules/changes",status="400"}' in body
@@ -0,0 +1,114 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from services.polling import SCHEDULE_TZ, AdaptivePollScheduler, HostRateLimiter, RateLimitedError
+
+
+def test_waiting_host_does_not_block_other_hosts():
+    async def scenario():
+        limiter = HostRateLimiter(max_per_minute=1)
+        await limiter.acquire("zoe.test")
+        waiting = asyncio.create_task(limiter.acquire("zoe.test"))
+        await asyncio.sleep(0.01)
+
+        started = time.monotonic()
+        await asyncio.wait_for(limiter.acquire("other.test"), timeout=1)
+        assert time.monotonic() - started < 0.5
+        assert not waiting.done()
+        waiting.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_slot_beyond_timeout_is_rejected_without_reserving():
+    async def scenario():
+        limiter = HostRateLimiter(max_per_minute=2)
+        await limiter.acquire("zoe.test")
+        await limiter.acquire("zoe.test")
+
+        with pytest.raises(RateLimitedError) as error:
+            await limiter.acquire("zoe.test", timeout=5)
+        assert 55 < error.value.retry_after <= 60
+        assert len(limiter._slots["zoe.test"]) == 2
+
+    asyncio.run(scenario())
+
+
+def test_waiters_reserve_consecutive_slots():
+    limiter = HostRateLimiter(max_per_minute=2)
+    waits = [limiter._reserve("zoe.test", None) for _ in range(5)]
+
+    assert waits[:2] == [0.0, 0.0]
+    # Third and fourth wait for the first window, the fifth for the next one
+    assert 59 < waits[2] <= 60 and 59 < waits[3] <= 60
+    assert 119 < waits[4] <= 120
+
+
+def polled_scheduler() -> AdaptivePollScheduler:
+    return AdaptivePollScheduler(base_interval_seconds=600, min_interval_seconds=180, jitter=0)
+
+
+def test_last_modified_stamped_with_current_time_is_not_a_burst():
+    scheduler = polled_scheduler()
+    now = datetime(2025, 1, 25, 12, 0, tzinfo=timezone.utc)
+    for minutes in range(0, 60, 10):
+        moment = now + timedelta(minutes=minutes)
+        # Dynamic page: a new Last-Modified on every fetch, same body
+        scheduler.observe(False, moment, page_changed=False, now=moment)
+
+    assert scheduler.next_interval(now + timedelta(minutes=50)) == 600
+    assert scheduler.decision['reasons'] == ["no publication history yet"]
+
+
+def test_page_change_with_new_last_modified_is_a_burst():
+    scheduler = polled_scheduler()
+    now = datetime(2025, 1, 25, 12, 0, tzinfo=timezone.utc)
+    scheduler.observe(False, now - timedelta(hours=2), now=now - timedelta(minutes=10))
+    scheduler.observe(False, now - timedelta(minutes=5), page_changed=True, now=now)
+
+    assert scheduler.next_interval(now) == 180
+    assert scheduler.decision['reasons'] == ["upstream Last-Modified 5 min ago"]
+
+    # Past the burst window the base interval is back
+    assert scheduler.next_interval(now + timedelta(hours=1)) == 600
+
+
+def test_learned_profile_shortens_busy_hours_and_stretches_quiet_ones():
+    scheduler = AdaptivePollScheduler(base_interval_seconds=600, min_interval_seconds=60, jitter=0, learn_days=28)
+    now = datetime(2025, 1, 25, 20, 0, tzinfo=SCHEDULE_TZ)
+    # Evening publications every other day, plus ones outside the learning window or in the future
+    moments = [datetime(2025, 1, day, 18, 10, tzinfo=SCHEDULE_TZ) for day in (19, 21, 23, 25)]
+    moments += [now - timedelta(days=40), now + timedelta(hours=1)]
+
+    scheduler.learn(moments, now=now)
+    assert (scheduler.learned_days, scheduler.learned_events) == (7, 4)
+    assert scheduler.hourly_rate[18] == pytest.approx(4 / 7)
+
+    # An hour before the usual publication time polling already speeds up
+    busy = scheduler.next_interval(datetime(2025, 1, 26, 17, 30, tzinfo=SCHEDULE_TZ))
+    assert busy == pytest.approx(600 / (1 + 4 * 4 / 7))
+    assert scheduler.decision['reasons'] == ["0.57 publications/day around 17:00"]
+
+    assert scheduler.next_interval(datetime(2025, 1, 26, 3, 0, tzinfo=SCHEDULE_TZ)) == 1500
+    assert scheduler.decision['reasons'] == ["no publications around 03:00 in 7 day(s)"]
+    assert not scheduler.needs_learning()
+
+
+def test_busy_hour_interval_is_clamped_to_minimum():
+    scheduler = polled_scheduler()
+    now = datetime(2025, 1, 25, 20, 0, tzinfo=SCHEDULE_TZ)
+    scheduler.learn([now - timedelta(hours=2, minutes=m) for m in range(5)], now=now)
+
+    assert scheduler.next_interval(now.replace(hour=18)) == 180
+    assert scheduler.decision['reasons'][-1] == "clamped to [180, 1500]s"
+
+
+def test_empty_history_keeps_base_interval():
+    scheduler = polled_scheduler()
+    scheduler.learn([], now=datetime(2025, 1, 25, 20, 0, tzinfo=SCHEDULE_TZ))
+
+    assert scheduler.learned_days == 0
+    assert scheduler.next_interval(datetime(2025, 1, 25, 3, 0, tzinfo=SCHEDULE_TZ)) == 600
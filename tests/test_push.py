@@ -0,0 +1,102 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import routes
+from benchmarks.harness import load_fixture_pages
+from main import app
+from services.broadcaster import ScheduleBroadcaster
+from services.refresher import ScheduleSnapshot
+
+PAGES = list(load_fixture_pages().values())
+
+
+def snapshot_of(page: str, previous=None) -> ScheduleSnapshot:
+    return ScheduleSnapshot.from_latest(routes.scraper, routes.scraper.parse_latest_schedule(page), previous=previous)
+
+
+def test_publish_reaches_only_subscribers_of_changed_queues():
+    async def scenario():
+        broadcaster = ScheduleBroadcaster()
+        first = broadcaster.subscribe(["1.1"])
+        second = broadcaster.subscribe(["2.2", "3.1"])
+
+        broadcaster.publish({"1.1": b"v1"})
+        broadcaster.publish({"1.1": b"v2", "4.1": b"x"})
+        # A slow client only gets the latest version of each queue
+        assert await first.next(0.1) == {"1.1": b"v2"}
+        assert await second.next(0.01) == {}
+
+        # Published from another thread, delivered on the loop
+        threading.Thread(target=broadcaster.publish, args=({"2.2": b"v3"},)).start()
+        assert await second.next(1) == {"2.2": b"v3"}
+
+        broadcaster.unsubscribe(first)
+        broadcaster.unsubscribe(first)
+        assert broadcaster.subscriber_count == 1
+        assert not broadcaster.has_subscribers("1.1")
+        return broadcaster.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert stats['published'] == 4 and stats['delivered'] == 3
+
+
+def test_subscriber_limit():
+    async def scenario():
+        broadcaster = ScheduleBroadcaster(max_subscribers=1)
+        broadcaster.subscribe(["1.1"])
+        with pytest.raises(OverflowError):
+            broadcaster.subscribe(["1.2"])
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def served(monkeypatch):
+    snapshot = snapshot_of(PAGES[0])
+
+    async def current(force_refresh=False):
+        return snapshot, True
+
+    monkeypatch.setattr(routes.refresher, "current", current)
+    monkeypatch.setattr(routes.refresher, "snapshot", snapshot)
+    monkeypatch.setattr(routes, "broadcaster", ScheduleBroadcaster())
+    return snapshot
+
+
+def test_websocket_sends_current_schedule_then_changes(served):
+    with TestClient(app).websocket_connect("/api/schedules/ws?ids=1.1") as websocket:
+        initial = websocket.receive_json()
+        assert initial["queue"] == "1.1"
+        assert initial["queue_data"]["outages"] == served.queues["1.1"]["outages"]
+
+        websocket.send_json({"subscribe": "nope"})
+        assert "error" in websocket.receive_json()
+
+        updated = snapshot_of(PAGES[1], previous=served)
+        routes.publish_changes(served, updated)
+        event = websocket.receive_json()
+        assert event["queue_data"]["outages"] == updated.queues["1.1"]["outages"]
+
+
+def test_websocket_with_bad_ids_is_closed(served):
+    with TestClient(app).websocket_connect("/api/schedules/ws?ids=abc") as websocket:
+        message = websocket.receive()
+    assert message["type"] == "websocket.close"
+    assert message["code"] == 1008
+
+
+def test_sse_stream_starts_with_current_schedule(served):
+    async def first_event():
+        response = await routes.stream_schedules(ids="1.1,2.2")
+        iterator = response.body_iterator
+        chunk = await iterator.__anext__()
+        await iterator.aclose()
+        return chunk
+
+    chunk = asyncio.run(first_event())
+    assert chunk.startswith(b"event: schedule\ndata: ")
+    assert json.loads(chunk.split(b"data: ", 1)[1])["queue"] == "1.1"
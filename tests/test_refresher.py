@@ -0,0 +1,154 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from api.rendering import RenderedResponse
+from benchmarks.harness import load_fixture_pages
+from models.schedule import Schedule, ScheduleResponse
+from services.cache import CacheService
+from services.history import HistoryService
+from services.refresher import RefreshService
+from services.scraper import AsyncScraperService
+
+
+def fixture_scraper() -> AsyncScraperService:
+    page = next(iter(load_fixture_pages().values()))
+    scraper = AsyncScraperService()
+    scraper._client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, text=page)))
+    return scraper
+
+
+def latest_etag(refresher: RefreshService) -> str:
+    snapshot = refresher.snapshot
+    return RenderedResponse.from_model(ScheduleResponse(
+        data=Schedule(**{'created_at': snapshot.fetched_at, **snapshot.latest}),
+        updated_at=snapshot.fetched_at
+    )).etag
+
+
+def test_leader_and_followers_render_identical_etags(tmp_path):
+    leader = RefreshService(fixture_scraper(), CacheService(cache_dir=str(tmp_path)))
+    asyncio.run(leader._refresh())
+    leader.cache.flush()
+
+    follower = RefreshService(AsyncScraperService(), CacheService(cache_dir=str(tmp_path)))
+    follower.sync_from_cache()
+    assert follower.snapshot.fetched_at == leader.snapshot.fetched_at
+    assert latest_etag(follower) == latest_etag(leader)
+
+    # An unchanged page re-stamps the shared entry; a worker starting afterwards still matches
+    asyncio.run(leader._refresh())
+    leader.cache.flush()
+    assert leader.scraper.last_fetch_status == 'unchanged'
+
+    late_follower = RefreshService(AsyncScraperService(), CacheService(cache_dir=str(tmp_path)))
+    late_follower.sync_from_cache()
+    assert late_follower.snapshot.fetched_at == leader.snapshot.fetched_at
+    assert late_follower.verified_at > leader.snapshot.fetched_at
+    assert latest_etag(late_follower) == latest_etag(leader)
+
+
+def test_follower_reads_entries_without_fetched_at(tmp_path):
+    page = next(iter(load_fixture_pages().values()))
+    latest = AsyncScraperService().parse_latest_schedule(page)
+    cache = CacheService(cache_dir=str(tmp_path))
+    cached_at = cache.set(RefreshService.LATEST_CACHE_KEY, latest)
+    cache.flush()
+
+    follower = RefreshService(AsyncScraperService(), CacheService(cache_dir=str(tmp_path)))
+    follower.sync_from_cache()
+    assert follower.snapshot.latest == latest
+    assert follower.snapshot.fetched_at == cached_at
+
+
+def test_concurrent_backfills_share_one_crawl(tmp_path):
+    page = next(iter(load_fixture_pages().values()))
+    requests = []
+
+    async def listing(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, text=page)
+
+    async def scenario():
+        scraper = AsyncScraperService()
+        scraper._client = httpx.AsyncClient(transport=httpx.MockTransport(listing))
+        refresher = RefreshService(scraper, history=HistoryService(db_path=str(tmp_path / "history.db")))
+        return await asyncio.gather(refresher.backfill_history(1), refresher.backfill_history(1))
+
+    first, second = asyncio.run(scenario())
+    assert len(requests) == 1
+    assert first == second and first['added'] > 0
+
+
+def test_modified_page_records_every_new_schedule(tmp_path):
+    pages = list(load_fixture_pages().values())
+    served = [pages[0]]
+
+    scraper = AsyncScraperService()
+    scraper._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, text=served[-1]))
+    )
+    history = HistoryService(db_path=str(tmp_path / "history.db"))
+    refresher = RefreshService(scraper, history=history)
+
+    asyncio.run(refresher._refresh())
+    seeded = history.get_stats()['schedules']
+    assert seeded > 1
+
+    # Once history is seeded, a modified page still adds all of its new articles, not only the latest
+    served.append(pages[1])
+    asyncio.run(refresher._refresh())
+    expected = history.record_many(scraper.parse_page(pages[0]) + scraper.parse_page(pages[1]))
+    assert expected == 0
+    assert history.get_stats()['schedules'] > seeded + 1
+
+
+def stale_refresher(minutes_old: float) -> RefreshService:
+    """Знімок з фікстури, востаннє підтверджений minutes_old хвилин тому (застарілий після 1 хв)"""
+    refresher = RefreshService(fixture_scraper(), stale_after_minutes=1, max_stale_minutes=10, retry_seconds=0)
+    asyncio.run(refresher._refresh())
+    refresher.verified_at = datetime.now() - timedelta(minutes=minutes_old)
+    return refresher
+
+
+def test_stale_snapshot_is_served_while_revalidating():
+    refresher = stale_refresher(minutes_old=5)
+    snapshot = refresher.snapshot
+
+    async def scenario():
+        served, hit = await refresher.current()
+        # Served before the upstream is asked again
+        assert served is snapshot and hit
+        assert refresher.data_age_seconds > 60
+        await refresher._revalidation
+
+    asyncio.run(scenario())
+    assert not refresher.is_stale()
+    assert refresher.scraper.last_fetch_status == 'unchanged'
+
+
+async def unreachable():
+    raise httpx.ConnectError("ZOE is down")
+
+
+def test_stale_snapshot_is_served_when_upstream_fails():
+    refresher = stale_refresher(minutes_old=5)
+    refresher.scraper.fetch_latest_schedule = unreachable
+
+    served, hit = asyncio.run(refresher.current(force_refresh=True))
+
+    assert served is refresher.snapshot and hit
+    assert refresher.last_error == "ZOE is down"
+    assert refresher.consecutive_failures == 1
+
+
+def test_snapshot_older_than_max_stale_is_not_served_on_error():
+    refresher = stale_refresher(minutes_old=12)
+    refresher.scraper.fetch_latest_schedule = unreachable
+
+    assert not refresher.is_usable()
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(refresher.current())
@@ -0,0 +1,60 @@
+import gzip
+from datetime import datetime, timezone
+
+import pytest
+
+from api.formats import compact_queue, fields_key, parse_compact_fields, parse_fields
+from api.rendering import BROTLI_AVAILABLE, RenderedResponse, etag_matches, negotiate_encoding
+from models.schedule import ScheduleResponse
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip;q=0.5, br;q=0.8", "br" if BROTLI_AVAILABLE else "gzip"),
+    ("br;q=0.2, gzip", "gzip"),
+    ("*;q=0.1, gzip;q=0", "br" if BROTLI_AVAILABLE else None),
+    ("gzip;q=abc", None),
+])
+def test_negotiate_encoding_honours_q_values(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+def test_compressed_variant_has_its_own_etag_that_still_revalidates():
+    rendered = RenderedResponse.from_content({"outages": ["08:00"] * 100})
+    gzip_etag = rendered.variant_etag("gzip")
+
+    assert gzip.decompress(rendered.encoded("gzip")) == rendered.body
+    assert rendered.encoded("gzip") is rendered.encoded("gzip")
+    assert gzip_etag != rendered.etag and gzip_etag.endswith('-gzip"')
+    assert etag_matches(gzip_etag, rendered.etag)
+    assert etag_matches(f'"other", W/{rendered.etag}', rendered.etag)
+    assert not etag_matches('"other"', rendered.etag)
+
+
+def test_parse_fields_builds_nested_include():
+    include = parse_fields("updated_at, queue_data.outages,queue_data.queue", ScheduleResponse)
+
+    assert include == {"updated_at": True, "queue_data": {"outages": True, "queue": True}}
+    assert fields_key(include) == "queue_data.outages,queue_data.queue,updated_at"
+    # The whole nested model wins over some of its fields
+    assert parse_fields("queue_data.outages,queue_data", ScheduleResponse) == {"queue_data": True}
+
+
+@pytest.mark.parametrize("fields", ["nope", "queue_data.nope", "updated_at.year", " , "])
+def test_parse_fields_rejects_unknown_fields(fields):
+    with pytest.raises(ValueError):
+        parse_fields(fields, ScheduleResponse)
+
+
+def test_compact_queue_uses_minutes_and_timestamp():
+    compact = compact_queue(
+        {"queue": "1.1", "outages": [{"start": "03:30", "end": "07:30"}, {"start": "22:00", "end": "24:00"}]},
+        datetime(2025, 1, 19, 12, 0, tzinfo=timezone.utc)
+    )
+
+    assert compact == {"queue": "1.1", "status": "active", "outages": [210, 450, 1320, 1440], "updated_at": 1737288000}
+    assert parse_compact_fields("outages,queue,outages") == ("outages", "queue")
+    with pytest.raises(ValueError):
+        parse_compact_fields("outages,times")
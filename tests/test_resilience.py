@@ -0,0 +1,232 @@
+import asyncio
+import time
+from collections import deque
+
+import httpx
+import pytest
+
+from services.polling import HostRateLimiter, RateLimitedError
+from services.refresher import RefreshService
+from services.resilience import CircuitBreaker, CircuitOpenError, RetryBudget, backoff_delay
+from services.scraper import AsyncScraperService
+
+
+def half_open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=0, half_open_max_calls=1)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+
+def scraper_with(handler, **options) -> AsyncScraperService:
+    scraper = AsyncScraperService(**options)
+    scraper._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return scraper
+
+
+async def slow_ok(request: httpx.Request) -> httpx.Response:
+    await asyncio.sleep(10)
+    return httpx.Response(200, text="ok")
+
+
+async def ok(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, text="ok")
+
+
+def test_cancelled_request_releases_half_open_slot():
+    async def scenario():
+        breaker = half_open_breaker()
+        scraper = scraper_with(slow_ok, breaker=breaker)
+
+        task = asyncio.create_task(scraper._get("http://zoe.test/"))
+        await asyncio.sleep(0.01)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # The slot is free again: the next trial goes through and closes the circuit
+        scraper._client = httpx.AsyncClient(transport=httpx.MockTransport(ok))
+        response = await scraper._get("http://zoe.test/")
+        assert response.status_code == 200
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_while_rate_limited_holds_no_slot():
+    async def scenario():
+        breaker = half_open_breaker()
+        limiter = HostRateLimiter(max_per_minute=1)
+        await limiter.acquire("zoe.test")
+        scraper = scraper_with(ok, breaker=breaker, rate_limiter=limiter)
+
+        task = asyncio.create_task(scraper._get("http://zoe.test/"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # Still open for a trial: the waiting call never took the slot
+        scraper.rate_limiter = None
+        assert (await scraper._get("http://zoe.test/")).status_code == 200
+
+    asyncio.run(scenario())
+
+
+def test_unexpected_exception_counts_as_failure():
+    def broken(request: httpx.Request) -> httpx.Response:
+        raise RuntimeError("boom")
+
+    async def scenario():
+        breaker = half_open_breaker()
+        scraper = scraper_with(broken, breaker=breaker)
+        with pytest.raises(RuntimeError):
+            await scraper._get("http://zoe.test/")
+        assert breaker.state == CircuitBreaker.OPEN
+
+    asyncio.run(scenario())
+
+
+def test_rejected_calls_do_not_fill_retry_budget():
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=60)
+        breaker.record_failure()
+        budget = RetryBudget(ratio=0.5, min_retries=0)
+        scraper = scraper_with(ok, breaker=breaker, retry_budget=budget)
+
+        for _ in range(10):
+            with pytest.raises(CircuitOpenError):
+                await scraper._fetch_page()
+        assert len(budget._requests) == 0
+
+        breaker.record_success()
+        await scraper._fetch_page()
+        assert len(budget._requests) == 1
+
+    asyncio.run(scenario())
+
+
+def test_circuit_opening_mid_retry_reports_upstream_error():
+    def failing(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("refused")
+
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=60)
+        scraper = scraper_with(failing, breaker=breaker)
+        with pytest.raises(Exception) as error:
+            await scraper._fetch_page()
+        assert not isinstance(error.value, CircuitOpenError)
+        assert "ConnectError" in str(error.value)
+        assert "1 attempt" in str(error.value)
+
+    asyncio.run(scenario())
+
+
+def test_refresh_records_circuit_rejection_without_counting_failure():
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=60)
+        breaker.record_failure()
+        refresher = RefreshService(scraper_with(ok, breaker=breaker))
+
+        with pytest.raises(CircuitOpenError):
+            await refresher._refresh()
+        assert refresher.consecutive_failures == 0
+        assert "circuit is open" in refresher.last_error
+
+    asyncio.run(scenario())
+
+
+def test_fetch_deadline_covers_rate_limiter_wait():
+    async def scenario():
+        limiter = HostRateLimiter(max_per_minute=1)
+        await limiter.acquire("zoe.test")
+        refresher = RefreshService(scraper_with(ok, rate_limiter=limiter))
+        refresher.scraper.BASE_URL = "http://zoe.test/"
+
+        with pytest.raises(RateLimitedError):
+            await asyncio.wait_for(refresher._refresh(), timeout=1)
+        assert refresher.consecutive_failures == 0
+
+    asyncio.run(scenario())
+
+
+def test_crawl_has_its_own_rate_limit():
+    async def scenario():
+        crawl_limiter = HostRateLimiter(max_per_minute=1)
+        await crawl_limiter.acquire("zoe.test")
+        scraper = scraper_with(ok, rate_limiter=HostRateLimiter(max_per_minute=1), crawl_rate_limiter=crawl_limiter)
+        scraper.BASE_URL = "http://zoe.test/"
+
+        # A crawl waiting for its cap doesn't hold up the live poll
+        crawl = asyncio.create_task(scraper._fetch_listing("http://zoe.test/page/2/"))
+        await asyncio.sleep(0.01)
+        assert await asyncio.wait_for(scraper._fetch_page(), timeout=1) == "ok"
+        assert not crawl.done()
+        crawl.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_tls_verification_follows_setting(monkeypatch):
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **options: options)
+
+    assert AsyncScraperService()._get_client()["verify"] is False
+    assert AsyncScraperService(verify_tls=True)._get_client()["verify"] is True
+
+
+def test_breaker_opens_after_threshold_and_recovers_through_half_open():
+    breaker = CircuitBreaker(failure_threshold=3, recovery_seconds=30, half_open_max_calls=1)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError) as rejected:
+        breaker.before_call()
+    assert 0 < rejected.value.retry_after <= 30
+
+    # Recovery time passed: one trial call goes through, a concurrent one is rejected
+    breaker.opened_at = time.monotonic() - 31
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.info()['consecutive_failures'] == 0
+
+
+def test_failed_trial_call_opens_breaker_again():
+    breaker = CircuitBreaker(failure_threshold=3, recovery_seconds=30)
+    for _ in range(3):
+        breaker.record_failure()
+    breaker.opened_at = time.monotonic() - 31
+    breaker.before_call()
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.retry_after() == pytest.approx(30, abs=1)
+
+
+def test_retry_budget_is_a_share_of_requests_in_window():
+    budget = RetryBudget(ratio=0.5, min_retries=1, window_seconds=60)
+    assert budget.try_retry()
+    assert not budget.try_retry()
+
+    for _ in range(6):
+        budget.record_request()
+    assert [budget.try_retry() for _ in range(3)] == [True, True, False]
+
+    # Retries and requests older than the window no longer count
+    budget._retries = deque(moment - 61 for moment in budget._retries)
+    assert budget.try_retry()
+
+
+def test_backoff_delay_is_capped():
+    assert all(0 <= backoff_delay(attempt) <= 4.0 for attempt in range(1, 10) for _ in range(20))
+    assert all(backoff_delay(1, base=0.5) <= 1.0 for _ in range(20))
@@ -0,0 +1,206 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import routes
+from benchmarks.harness import load_fixture_pages
+from main import app
+from services.refresher import ScheduleSnapshot
+from services.resilience import CircuitBreaker
+
+
+@pytest.fixture
+def open_circuit(monkeypatch):
+    """Розімкнений автомат і жодних даних - ні знімку, ні спільного кешу: відповісти можна лише 503"""
+    for name in ("snapshot", "verified_at", "cache", "leader"):
+        monkeypatch.setattr(routes.refresher, name, None)
+
+    breaker = routes.scraper.breaker
+    breaker.state = CircuitBreaker.OPEN
+    breaker.opened_at = time.monotonic()
+    yield
+    breaker.state = CircuitBreaker.CLOSED
+    breaker.failures = 0
+
+
+@pytest.mark.parametrize("path", ["/api/queues", "/api/schedules/latest", "/api/schedules/queue/1.1"])
+def test_open_circuit_without_data_returns_503(open_circuit, path):
+    response = TestClient(app).get(path)
+
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+class FollowerElection:
+    is_leader = False
+
+
+def test_backfill_on_follower_returns_503(monkeypatch):
+    monkeypatch.setattr(routes.refresher, "leader", FollowerElection())
+    monkeypatch.setattr(routes.refresher, "backfill_history", None)
+
+    response = TestClient(app).post("/api/schedules/history/backfill?pages=2")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+@pytest.fixture
+def cold_start(monkeypatch):
+    """Перша відповідь - щойно завантажений знімок (MISS), наступні - той самий знімок з пам'яті (HIT)"""
+    page = next(iter(load_fixture_pages().values()))
+    snapshot = ScheduleSnapshot.from_latest(routes.scraper, routes.scraper.parse_latest_schedule(page))
+    served = []
+
+    async def current(force_refresh=False):
+        served.append(snapshot)
+        return snapshot, len(served) > 1
+
+    monkeypatch.setattr(routes.refresher, "current", current)
+
+
+@pytest.mark.parametrize("path", [
+    "/api/queues", "/api/schedules/latest", "/api/schedules/queue/1.1", "/api/schedules/queues?ids=all"
+])
+def test_etag_of_fresh_response_revalidates(cold_start, path):
+    client = TestClient(app)
+    first = client.get(path)
+    assert first.status_code == 200
+    assert first.headers["X-Cache"] == "MISS"
+    assert "cache_hit" not in first.json()
+
+    second = client.get(path, headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 304
+    assert second.headers["X-Cache"] == "HIT"
+
+
+@pytest.fixture
+def served(monkeypatch):
+    """Знімок з першої сторінки-фікстури, що віддається з пам'яті"""
+    page = next(iter(load_fixture_pages().values()))
+    snapshot = ScheduleSnapshot.from_latest(routes.scraper, routes.scraper.parse_latest_schedule(page))
+
+    async def current(force_refresh=False):
+        return snapshot, True
+
+    monkeypatch.setattr(routes.refresher, "current", current)
+    return snapshot
+
+
+def test_bulk_queues_match_single_queue_responses(served):
+    client = TestClient(app)
+    body = client.get("/api/schedules/queues?ids=2.2,1.1,2.2").json()
+
+    assert list(body["queues"]) == ["2.2", "1.1"]
+    for queue_id in ("1.1", "2.2"):
+        single = client.get(f"/api/schedules/queue/{queue_id}").json()
+        assert body["queues"][queue_id] == single["queue_data"]
+    assert body["updated_at"] == served.fetched_at.isoformat()
+
+    everything = client.get("/api/schedules/queues?ids=all").json()
+    assert set(everything["queues"]) == set(served.queues)
+
+
+@pytest.mark.parametrize("ids", ["1.1,abc", ",", ",".join(f"{n}.1" for n in range(1, routes.MAX_BULK_QUEUES + 2))])
+def test_bulk_queues_rejects_bad_ids(served, ids):
+    assert TestClient(app).get(f"/api/schedules/queues?ids={ids}").status_code == 400
+
+
+def test_bulk_queues_without_schedule_is_404(monkeypatch):
+    snapshot = ScheduleSnapshot.from_latest(routes.scraper, None)
+
+    async def current(force_refresh=False):
+        return snapshot, True
+
+    monkeypatch.setattr(routes.refresher, "current", current)
+    assert TestClient(app).get("/api/schedules/queues").status_code == 404
+
+
+def test_queue_status_counts_down_across_midnight(served):
+    client = TestClient(app)
+
+    late = client.get("/api/schedules/queue/1.1/status?at=23:50").json()
+    assert late["status"] == "on"
+    assert late["next_outage"] == {"start": "03:30", "end": "07:30"}
+    assert late["minutes_until_next_outage"] == 10 + 210
+
+    during = client.get("/api/schedules/queue/1.1/next?at=2025-01-19T12:00:00%2B02:00").json()
+    assert during["status"] == "off"
+    assert during["current_outage"] == {"start": "11:30", "end": "14:30"}
+    assert during["next_change_at"] == "14:30"
+    assert during["minutes_until_change"] == 150
+
+    assert client.get("/api/schedules/queue/9.9/status?at=10:00").json()["status"] == "no_data"
+
+
+@pytest.mark.parametrize("path", [
+    "/api/schedules/queue/1.1/status?at=25:00",
+    "/api/schedules/queue/1.1/status?at=12:75",
+    "/api/schedules/queue/1.1/status?at=soon",
+    "/api/schedules/queue/abc/status?at=10:00",
+])
+def test_queue_status_rejects_bad_input(served, path):
+    assert TestClient(app).get(path).status_code == 400
+
+
+@pytest.mark.parametrize("query", [
+    "slot_minutes=7",
+    "ids=1.1,x",
+    "from=2025-01-20&to=2025-01-19",
+    "from=2020-01-01&to=2025-01-19",
+])
+def test_analytics_rejects_bad_parameters(query):
+    assert TestClient(app).get(f"/api/schedules/analytics?{query}").status_code == 400
+
+
+@pytest.mark.parametrize("query", ["since=yesterday", "queue=all"])
+def test_changes_rejects_bad_parameters(query):
+    assert TestClient(app).get(f"/api/schedules/changes?{query}").status_code == 400
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br"])
+def test_compressed_response_decodes_to_the_same_body(served, encoding):
+    if encoding == "br":
+        pytest.importorskip("brotli")
+    client = TestClient(app)
+    plain = client.get("/api/schedules/latest", headers={"Accept-Encoding": "identity"})
+    compressed = client.get("/api/schedules/latest", headers={"Accept-Encoding": encoding})
+
+    assert "Content-Encoding" not in plain.headers
+    assert compressed.headers["Content-Encoding"] == encoding
+    assert compressed.headers["Vary"] == "Accept-Encoding"
+    assert compressed.content == plain.content
+    assert compressed.headers["ETag"] == plain.headers["ETag"][:-1] + f'-{encoding}"'
+
+    # Either variant's ETag revalidates the other
+    revalidated = client.get(
+        "/api/schedules/latest", headers={"Accept-Encoding": "identity", "If-None-Match": compressed.headers["ETag"]}
+    )
+    assert revalidated.status_code == 304
+
+
+def test_fields_projection(served):
+    body = TestClient(app).get("/api/schedules/queue/1.1?fields=queue_data.outages,updated_at").json()
+
+    assert body == {
+        "queue_data": {"outages": served.queues["1.1"]["outages"]},
+        "updated_at": served.fetched_at.isoformat()
+    }
+
+
+def test_compact_and_msgpack_formats(served):
+    msgpack = pytest.importorskip("msgpack")
+    client = TestClient(app)
+
+    compact = client.get("/api/schedules/queue/1.1?format=compact")
+    assert compact.json()["outages"] == [210, 450, 690, 870]
+
+    packed = client.get("/api/schedules/queue/1.1?format=msgpack&fields=outages,queue")
+    assert packed.headers["Content-Type"] == "application/msgpack"
+    assert msgpack.unpackb(packed.content) == {"outages": [210, 450, 690, 870], "queue": "1.1"}
+
+
+@pytest.mark.parametrize("query", ["format=xml", "fields=nope", "format=compact&fields=times"])
+def test_unknown_format_or_field_is_rejected(served, query):
+    assert TestClient(app).get(f"/api/schedules/queue/1.1?{query}").status_code == 400
@@ -0,0 +1,129 @@
+import asyncio
+
+import httpx
+import pytest
+
+from benchmarks.harness import load_fixture_pages
+from services.scraper import AsyncScraperService
+
+PAGE = next(iter(load_fixture_pages().values()))
+
+
+def serving(responses: list, seen: list) -> AsyncScraperService:
+    """Скрапер, якому заглушка віддає відповіді зі списку по черзі; заголовки запитів - у seen"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers)
+        return responses.pop(0)
+
+    scraper = AsyncScraperService()
+    scraper.BASE_URL = "http://zoe.test/outage/"
+    scraper._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return scraper
+
+
+def test_not_modified_reuses_parsed_page():
+    seen = []
+    scraper = serving([
+        httpx.Response(200, text=PAGE, headers={"ETag": '"v1"', "Last-Modified": "Sat, 25 Jan 2025 10:00:00 GMT"}),
+        httpx.Response(304),
+    ], seen)
+
+    async def scenario():
+        latest = await scraper.fetch_latest_schedule()
+        assert scraper.last_fetch_status == 'modified'
+        assert await scraper.fetch_latest_schedule() is latest
+        assert scraper.last_fetch_status == 'not_modified'
+
+    asyncio.run(scenario())
+    assert "if-none-match" not in seen[0]
+    assert seen[1]["if-none-match"] == '"v1"'
+    assert seen[1]["if-modified-since"] == "Sat, 25 Jan 2025 10:00:00 GMT"
+
+
+def test_identical_body_without_validators_skips_parse():
+    seen = []
+    scraper = serving([httpx.Response(200, text=PAGE), httpx.Response(200, text=PAGE)], seen)
+
+    async def scenario():
+        latest = await scraper.fetch_latest_schedule()
+        assert await scraper.fetch_latest_schedule() is latest
+        assert scraper.last_fetch_status == 'unchanged'
+
+    asyncio.run(scenario())
+    # Nothing to revalidate against, so no conditional headers
+    assert "if-none-match" not in seen[1] and "if-modified-since" not in seen[1]
+
+
+def test_changed_body_is_parsed_again():
+    pages = list(load_fixture_pages().values())
+    scraper = serving([httpx.Response(200, text=pages[0]), httpx.Response(200, text=pages[1])], [])
+
+    async def scenario():
+        first = await scraper.fetch_latest_schedule()
+        second = await scraper.fetch_latest_schedule()
+        assert scraper.last_fetch_status == 'modified'
+        assert second != first
+
+    asyncio.run(scenario())
+
+
+def test_client_error_is_not_retried():
+    seen = []
+    scraper = serving([httpx.Response(404), httpx.Response(200, text=PAGE)], seen)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(scraper.fetch_latest_schedule())
+    assert len(seen) == 1
+
+
+def crawling(pages: dict, requested: list) -> AsyncScraperService:
+    """Скрапер, що обходить пагінацію заглушки: {номер сторінки: відповідь}"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        number = int(request.url.path.rstrip('/').rsplit('/', 1)[-1]) if '/page/' in request.url.path else 1
+        requested.append(number)
+        return pages.get(number, httpx.Response(404))
+
+    scraper = AsyncScraperService(sources=["http://zoe.test/outage/"])
+    scraper._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return scraper
+
+
+def identity(schedule: dict) -> tuple:
+    return schedule['title'], schedule['date'], schedule['content_text']
+
+
+def test_crawl_fills_elided_pages_and_drops_duplicates():
+    pages = list(load_fixture_pages().values())
+    requested = []
+    # Page 1 links only to the last page (4), as in "1 2 … 4"; page 4 repeats page 1, page 3 fails
+    scraper = crawling({
+        1: httpx.Response(200, text=pages[0].replace('/page/2/', '/page/4/')),
+        2: httpx.Response(200, text=pages[1]),
+        3: httpx.Response(500),
+        4: httpx.Response(200, text=pages[0]),
+    }, requested)
+
+    schedules = asyncio.run(scraper.crawl(max_pages=10))
+
+    first, second = scraper.parse_listing(pages[0]), scraper.parse_listing(pages[1])
+    unique = {identity(s) for s in first + second}
+    assert sorted(requested) == [1, 2, 3, 4]
+    assert [identity(s) for s in schedules[:len(first)]] == [identity(s) for s in first]
+    assert len(schedules) == len(unique)
+    assert [s['index'] for s in schedules] == list(range(len(schedules)))
+
+    stats = scraper.last_crawl_stats
+    assert stats['pages'] == 3
+    assert stats['failed'] == ["http://zoe.test/outage/page/3/"]
+    # All of page 4 plus whatever page 2 shares with page 1
+    assert stats['duplicates'] == len(first) + len(first) + len(second) - len(unique)
+
+def test_crawl_stops_at_max_pages():
+    page = PAGE.replace('/page/2/', '/page/9/')
+    requested = []
+    scraper = crawling({n: httpx.Response(200, text=page) for n in range(1, 10)}, requested)
+
+    asyncio.run(scraper.crawl(max_pages=3))
+
+    assert sorted(requested) == [1, 2, 3]
+    assert scraper.last_crawl_stats['failed'] == []
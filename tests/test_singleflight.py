@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from services.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"title": "graph"}
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("fetch", fetch) for _ in range(5)))
+        return flight, results
+
+    flight, results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    stats = flight.get_stats()
+    assert (stats['calls'], stats['executions'], stats['coalesced'], stats['errors']) == (5, 1, 4, 0)
+    assert stats['in_flight'] == []
+
+
+def test_error_reaches_every_waiter_and_next_call_runs_again():
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("fetch", failing) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        with pytest.raises(RuntimeError):
+            await flight.do("fetch", failing)
+        return flight
+
+    flight = asyncio.run(scenario())
+    assert len(attempts) == 2
+    assert flight.get_stats()['keys']['fetch'] == {'calls': 4, 'executions': 2, 'coalesced': 2, 'errors': 2}
+
+
+def test_cancelled_caller_does_not_cancel_shared_execution():
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        flight = SingleFlight()
+        first = asyncio.create_task(flight.do("fetch", slow))
+        second = asyncio.create_task(flight.do("fetch", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == "done"
+        assert first.cancelled()
+
+    asyncio.run(scenario())
@@ -0,0 +1,59 @@
+import pytest
+
+from services.timeline import QueueDay, format_minutes, to_minutes
+
+# 22:00-02:00 crosses midnight, 10:00-12:00 is a regular daytime outage
+OVERNIGHT = QueueDay.from_outages([
+    {'start': '10:00', 'end': '12:00'},
+    {'start': '22:00', 'end': '02:00'},
+])
+
+
+def test_outage_across_midnight_is_split_into_two_parts():
+    assert OVERNIGHT.starts == (0, 600, 1320)
+    assert OVERNIGHT.ends == (120, 720, 1440)
+    assert OVERNIGHT.aligned
+    assert OVERNIGHT.slots == '1111' + '0' * 16 + '1111' + '0' * 20 + '1111'
+
+
+@pytest.mark.parametrize("at, off", [("00:30", True), ("02:00", False), ("11:59", True), ("21:59", False), ("23:59", True)])
+def test_is_off(at, off):
+    assert OVERNIGHT.is_off(to_minutes(at)) is off
+
+
+def test_current_outage_spans_midnight_from_both_sides():
+    # Before midnight the outage ends tomorrow, after midnight it started yesterday
+    assert OVERNIGHT.current_outage(to_minutes("23:00")) == (1320, 1440 + 120)
+    assert OVERNIGHT.current_outage(to_minutes("01:00")) == (1320 - 1440, 120)
+    assert OVERNIGHT.current_outage(to_minutes("13:00")) is None
+
+
+def test_next_outage_rolls_over_to_tomorrow():
+    assert OVERNIGHT.next_outage(to_minutes("03:00")) == (600, 720)
+    assert OVERNIGHT.next_outage(to_minutes("13:00")) == (1320, 1440 + 120)
+    # The 00:00 part of tonight's outage is not a new one: the next is tomorrow's 10:00
+    assert OVERNIGHT.next_outage(to_minutes("23:00")) == (1440 + 600, 1440 + 720)
+    assert format_minutes(1440 + 120) == "02:00"
+
+
+def test_unaligned_outage_is_checked_by_minute():
+    day = QueueDay.from_outages([{'start': '10:15', 'end': '10:45'}])
+
+    assert not day.aligned
+    assert day.slots[20:22] == '11'
+    assert not day.is_off(to_minutes("10:10"))
+    assert day.is_off(to_minutes("10:15"))
+    assert not day.is_off(to_minutes("10:45"))
+
+
+def test_empty_day():
+    day = QueueDay.from_outages([])
+
+    assert day.bitmap == 0
+    assert day.current_outage(600) is None
+    assert day.next_outage(600) is None
+
+
+def test_bad_time_is_rejected():
+    with pytest.raises(ValueError):
+        QueueDay.from_outages([{'start': 'noon', 'end': '14:00'}])